@@ -1,6 +1,49 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog, simpledialog
+import functools
 import math
+import os
+import sys
+
+import numpy as np
+
+import batch
+from allocation import RoomAllocator, load_inventory
+from analytics import AbsorbingChain
+from calibration import calibrate, load_observed
+from campus import CampusEngine, load_programs
+from checkpoint import load_checkpoint, save_checkpoint
+from downsample import lttb
+from flow_engine import RATE_KEYS, ROOM_CAPACITY, FlowEngine
+from history_store import EXTREMA_BLOCK
+from history_view import VirtualTable
+from montecarlo import MonteCarlo
+from scenarios import ScenarioWorkspace, compare_results, format_delta
+from schedule import load_schedule
+from sensitivity import Sensitivity, tornado
+from profiler import CountingCanvas, Profiler
+from render_scheduler import RenderScheduler
+from worker import SimulationWorker
+
+# Paleta de los años de estudio; se repite cíclicamente en carreras largas
+YEAR_COLORS = ["#06b6d4", "#8b5cf6", "#ec4899", "#f59e0b", "#10b981",
+               "#6366f1", "#14b8a6", "#f43f5e", "#84cc16", "#0ea5e9"]
+ORDINALS = ["1er", "2do", "3er", "4to", "5to", "6to", "7mo", "8vo", "9no", "10mo"]
+# Secciones del panel de análisis, en el orden en que se muestran
+ANALYSIS_SECTIONS = ["intro", "capacity", "allocation", "repeaters", "retention", "graduation", "trend", "agents", "compare",
+                     "steady", "sensitivity"]
+# Años simulados cuya asignación de salas se conserva para el panel de análisis
+ALLOCATION_YEARS = 8
+# Tamaños de bloque (del más grueso al más fino) para reducir ventanas largas del gráfico
+GRAPH_BLOCKS = (EXTREMA_BLOCK, 16)
+
+
+def year_color(i):
+    return YEAR_COLORS[i % len(YEAR_COLORS)]
+
+
+def year_ordinal(i):
+    return ORDINALS[i] if i < len(ORDINALS) else f"{i+1}°"
 
 class StudentFlowSimulator:
     def __init__(self, root):
@@ -9,46 +52,104 @@ class StudentFlowSimulator:
         self.root.geometry("1400x900")
         self.root.configure(bg="#f0f4f8")
         
-        # Parámetros del sistema
-        self.params = {
-            'x': 100,  # Alumnos que entran por año
-            'a1': 60,  # % pasan a segundo del primer año
-            'b1': 20,  # % abandonan del primer año
-            'c1': 20,  # % repiten del primer año
-            'ai': 70,  # % pasan al siguiente del i-ésimo año
-            'bi': 15,  # % abandonan del i-ésimo año
-            'ci': 15,  # % repiten del i-ésimo año
-            'total_years': 5  # Duración de la carrera
-        }
-        
-        # Estado de la simulación
-        self.reset_simulation()
+        # Motor de simulación (sin dependencias de Tk); la interfaz lo observa
+        self.engine = FlowEngine()
+        # Hilo de simulación y última instantánea publicada (None con el motor detenido)
+        self.worker = None
+        self.snapshot = None
+        # Con varias carreras cargadas, engine es una vista (una carrera o el campus)
+        self.campus = None
+        # Cronograma de cambios de parámetros por año (se aplica al reiniciar)
+        self.schedule = None
+        # Asignación de salas con el inventario real (opcional); se resuelve año a año
+        self.allocator = None
+        # Asignaciones de los últimos años simulados, por año (las escribe el hilo de simulación)
+        self.allocations = {}
+        # Escenarios guardados para comparar; sobreviven a los reinicios
+        self.workspace = ScenarioWorkspace()
+        self.compare_vars = {}
+        # Réplicas del dimensionamiento Monte Carlo (None: modo estocástico apagado)
+        self.stochastic_replications = 2000
+        self.chain_version = 0
+        self.update_chain()
+        self.watch_engine()
         self.is_running = False
         self.animation_speed = 500
         self.show_config = False
+        # Instrumentación opcional: se activa desde el encabezado
+        self.profiler = Profiler()
         
         self.create_widgets()
         self.update_display()
         
+    @property
+    def shown(self):
+        """Lo que se dibuja: la última instantánea del hilo de simulación o, detenido, el motor"""
+        return self.snapshot if self.worker is not None and self.snapshot is not None else self.engine
+        
+    # Acceso directo al estado mostrado
+    params = property(lambda self: self.shown.params)
+    year = property(lambda self: self.shown.year)
+    students_per_year = property(lambda self: self.shown.students_per_year)
+    repeaters_per_year = property(lambda self: self.shown.repeaters_per_year)
+    new_students_per_year = property(lambda self: self.shown.new_students_per_year)
+    total_enrolled = property(lambda self: self.shown.total_enrolled)
+    total_graduated = property(lambda self: self.shown.total_graduated)
+    total_dropped = property(lambda self: self.shown.total_dropped)
+    history = property(lambda self: self.shown.history)
+        
+    def watch_engine(self):
+        # Las vistas de campus avanzan el campus entero: el observador va en el motor que da el paso
+        stepper = getattr(self.engine, 'campus', self.engine)
+        if self.allocate_year not in stepper.listeners:
+            stepper.add_listener(self.allocate_year)
+        self.allocations = {}
+        
+    def allocate_year(self, stepper=None):
+        """Re-resuelve la asignación con el año recién simulado (corre en el hilo del motor)"""
+        allocator = self.allocator
+        engine = self.engine
+        if allocator is None or (stepper is not None and getattr(engine, 'campus', engine) is not stepper):
+            # Sin inventario, o un motor que ya fue reemplazado y termina su último año
+            return
+        allocations = self.allocations
+        allocations[engine.year] = allocator.solve(engine.students_per_year)
+        while len(allocations) > ALLOCATION_YEARS:
+            del allocations[next(iter(allocations))]
+        
     def reset_simulation(self):
-        self.year = 0
-        # Inicializar cada año con 0 estudiantes
-        self.students_per_year = [0] * (self.params['total_years'] + 1)  # +1 para graduados
-        self.total_enrolled = 0
-        self.total_graduated = 0
-        self.total_dropped = 0
-        
-        # Nuevas estadísticas para repetidores
-        self.repeaters_per_year = [0] * self.params['total_years']
-        self.new_students_per_year = [0] * self.params['total_years']
-        
-        self.history = {
-            'year': [],
-            'year1': [], 'year2': [], 'year3': [], 'year4': [], 'year5': [],
-            'graduated': [], 'dropped': [], 'total': [],
-            'repeaters1': [], 'repeaters2': [], 'repeaters3': [], 'repeaters4': [], 'repeaters5': [],
-            'new_students1': [], 'new_students2': [], 'new_students3': [], 'new_students4': [], 'new_students5': []
-        }
+        self.engine.reset()
+        self.allocations = {}
+        self.graph_view = None
+        self.update_chain()
+        
+    @property
+    def campus_aggregate(self):
+        return self.campus is not None and self.engine.aggregate
+        
+    def update_chain(self):
+        # Indicadores límite calculados directamente desde los parámetros
+        self.chain_version += 1
+        if self.campus_aggregate:
+            # Las tasas promedio del campus no forman una cadena: se suman las carreras
+            self.chain = self.stochastic = None
+            return
+        try:
+            self.chain = AbsorbingChain(self.params)
+        except ValueError:
+            self.chain = None
+        
+        # Bandas Monte Carlo para dimensionar salas con el percentil 95
+        self.stochastic_horizon = max(20, self.params['total_years'] * 4)
+        if self.stochastic_replications is None:
+            self.stochastic = None
+            return
+        try:
+            self.stochastic = MonteCarlo(self.params, replications=self.stochastic_replications,
+                                         seed=0).run(self.stochastic_horizon)
+        except ValueError:
+            # Probabilidades fuera de [0, 1]: porcentajes inválidos
+            self.stochastic = None
         
     def create_widgets(self):
         # Frame principal con scroll
@@ -56,7 +157,15 @@ class StudentFlowSimulator:
         scrollbar = ttk.Scrollbar(self.root, orient="vertical", command=main_canvas.yview)
         
         main_frame = tk.Frame(main_canvas, bg="#f0f4f8")
-        main_canvas.configure(yscrollcommand=scrollbar.set)
+        
+        # Los paneles se pintan a ritmo de cuadro y sólo si están a la vista
+        self.scheduler = RenderScheduler(self.root, viewport=main_canvas, profiler=self.profiler)
+        
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            self.scheduler.schedule()
+            
+        main_canvas.configure(yscrollcommand=on_scroll)
         
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         main_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=15, pady=15)
@@ -66,6 +175,7 @@ class StudentFlowSimulator:
         def configure_scroll(event):
             main_canvas.configure(scrollregion=main_canvas.bbox("all"))
             main_canvas.itemconfig(canvas_frame, width=event.width)
+            self.scheduler.schedule()
             
         main_frame.bind("<Configure>", configure_scroll)
         main_canvas.bind("<Configure>", configure_scroll)
@@ -114,6 +224,22 @@ class StudentFlowSimulator:
         analysis_frame.pack(fill=tk.X, pady=10)
         self.create_analysis_panel(analysis_frame)
         
+        # Paneles y los datos de los que depende cada uno
+        self.scheduler.register('header', self.update_header, ('state',))
+        self.scheduler.register('alerts', self.check_alerts, ('state', 'params'))
+        self.scheduler.register('general_stats', self.update_general_stats, ('state',), general_stats_frame)
+        self.scheduler.register('year_stats', self.update_year_stats, ('state', 'params'), year_stats_frame)
+        self.scheduler.register('flow', self.update_flow_diagram, ('state', 'params', 'flow_size'), flow_frame)
+        self.scheduler.register('evolution', self.update_evolution_graph,
+                                ('history', 'params', 'graph_size', 'graph_view', 'scenarios'), self.graph_canvas)
+        self.scheduler.register('pie', self.update_pie_chart, ('state', 'params', 'pie_size'), self.pie_canvas)
+        self.scheduler.register('history_table', self.history_table.refresh, ('history',), self.history_table.frame)
+        self.scheduler.register('analysis', self.update_analysis, ('state', 'params', 'history', 'scenarios'), analysis_frame)
+        
+        self.flow_canvas.bind("<Configure>", lambda e: self.scheduler.invalidate('flow_size'))
+        self.graph_canvas.bind("<Configure>", lambda e: self.scheduler.invalidate('graph_size'))
+        self.pie_canvas.bind("<Configure>", lambda e: self.scheduler.invalidate('pie_size'))
+        
     def create_header(self, parent):
         header_frame = tk.Frame(parent, bg="white", relief=tk.RIDGE, bd=2)
         header_frame.pack(fill=tk.X, pady=(0, 10))
@@ -129,9 +255,45 @@ class StudentFlowSimulator:
                            bg="white", fg="#64748b", font=("Arial", 11))
         subtitle.pack(anchor=tk.W)
         
-        self.year_label = tk.Label(title_frame, text="Año Académico: 0", 
+        year_frame = tk.Frame(title_frame, bg="white")
+        year_frame.pack(anchor=tk.W, pady=(5, 0))
+        
+        self.year_label = tk.Label(year_frame, text="Año Académico: 0", 
                                   bg="white", fg="#2563eb", font=("Arial", 13, "bold"))
-        self.year_label.pack(anchor=tk.W, pady=(5, 0))
+        self.year_label.pack(side=tk.LEFT)
+        
+        # Medición de rendimiento: tiempos por fase y conteo de ítems de los canvas
+        self.profiler_button = tk.Button(year_frame, text="⏱ Perfil", command=self.toggle_profiler,
+                                         bg="#e2e8f0", fg="#1e293b", font=("Arial", 8, "bold"),
+                                         padx=6, pady=1, cursor="hand2", relief=tk.FLAT, borderwidth=0)
+        self.profiler_button.pack(side=tk.LEFT, padx=(10, 0))
+        self.profiler_export_button = tk.Button(year_frame, text="💾 Exportar", command=self.export_profile,
+                                                bg="#e2e8f0", fg="#1e293b", font=("Arial", 8, "bold"),
+                                                padx=6, pady=1, cursor="hand2", relief=tk.FLAT, borderwidth=0)
+        self.profiler_label = tk.Label(title_frame, text="", bg="#0f172a", fg="#a7f3d0",
+                                       font=("Courier", 8), justify=tk.LEFT, anchor=tk.W, padx=6, pady=4)
+        self.profiler_after = None
+        
+        # Velocidad de simulación: por debajo de un cuadro se simulan varios años por cuadro
+        speed_frame = tk.Frame(title_frame, bg="white")
+        speed_frame.pack(anchor=tk.W, pady=(5, 0))
+        
+        tk.Label(speed_frame, text="Velocidad (ms por año):", bg="white", fg="#64748b",
+                 font=("Arial", 9, "bold")).pack(side=tk.LEFT)
+        
+        self.speed_scale = tk.Scale(speed_frame, from_=1000, to=1, orient=tk.HORIZONTAL, length=200,
+                                    bg="white", fg="#1e293b", highlightthickness=0, bd=0,
+                                    font=("Arial", 8), command=self.set_animation_speed)
+        self.speed_scale.set(self.animation_speed)
+        self.speed_scale.pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Selector de vista: aparece al cargar varias carreras
+        self.view_frame = tk.Frame(title_frame, bg="white")
+        tk.Label(self.view_frame, text="Vista:", bg="white", fg="#64748b",
+                 font=("Arial", 9, "bold")).pack(side=tk.LEFT)
+        self.view_combo = ttk.Combobox(self.view_frame, state="readonly", width=32, font=("Arial", 9))
+        self.view_combo.pack(side=tk.LEFT, padx=(5, 0))
+        self.view_combo.bind("<<ComboboxSelected>>", lambda e: self.set_view(self.view_combo.current()))
         
         # Botones
         button_frame = tk.Frame(header_frame, bg="white")
@@ -144,6 +306,22 @@ class StudentFlowSimulator:
                                      borderwidth=0)
         self.play_button.pack(side=tk.LEFT, padx=5)
         
+        # Salto directo a un año (sin animar los años intermedios)
+        jump_frame = tk.Frame(button_frame, bg="white")
+        jump_frame.pack(side=tk.LEFT, padx=5)
+        
+        self.jump_entry = tk.Entry(jump_frame, font=("Arial", 11), width=6, relief=tk.SOLID, bd=1,
+                                   bg="#f8fafc", fg="#1e293b", justify=tk.CENTER)
+        self.jump_entry.insert(0, "100")
+        self.jump_entry.pack(side=tk.LEFT, ipady=8)
+        
+        jump_button = tk.Button(jump_frame, text="⏭ Saltar al año", 
+                                command=self.jump_button_click,
+                                bg="#0ea5e9", fg="white", font=("Arial", 11, "bold"),
+                                padx=15, pady=10, cursor="hand2", relief=tk.FLAT,
+                                borderwidth=0)
+        jump_button.pack(side=tk.LEFT)
+        
         reset_button = tk.Button(button_frame, text="↻ Reiniciar", 
                                 command=self.reset_button_click,
                                 bg="#6b7280", fg="white", font=("Arial", 11, "bold"),
@@ -220,32 +398,46 @@ class StudentFlowSimulator:
         self.retention_detail.pack(anchor=tk.W, padx=20, pady=(0, 15))
         
     def create_year_stats(self, parent):
-        container = tk.Frame(parent, bg="#f0f4f8")
-        container.pack(fill=tk.X)
+        self.year_stats_container = tk.Frame(parent, bg="#f0f4f8")
+        self.year_stats_container.pack(fill=tk.X)
         
+        self.year_card_frames = []
         self.year_cards = []
         self.repeater_cards = []
         self.new_student_cards = []
-        colors = ["#06b6d4", "#8b5cf6", "#ec4899", "#f59e0b", "#10b981"]
+        self.rebuild_year_stats()
         
-        for i in range(self.params['total_years']):
+    def rebuild_year_stats(self):
+        # Sólo se crean o destruyen las tarjetas que sobran o faltan
+        total_years = self.params['total_years']
+        
+        while len(self.year_card_frames) > total_years:
+            self.year_card_frames.pop().destroy()
+            self.year_cards.pop()
+            self.repeater_cards.pop()
+            self.new_student_cards.pop()
+        
+        for i in range(len(self.year_card_frames), total_years):
+            color = year_color(i)
+            
             # Frame principal para cada año
-            year_main_frame = tk.Frame(container, bg="#f0f4f8")
+            year_main_frame = tk.Frame(self.year_stats_container, bg="#f0f4f8")
             year_main_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
+            self.year_card_frames.append(year_main_frame)
             
             # Tarjeta principal del año
-            main_frame = tk.Frame(year_main_frame, bg=colors[i], relief=tk.FLAT, bd=0)
+            main_frame = tk.Frame(year_main_frame, bg=color, relief=tk.FLAT, bd=0)
             main_frame.pack(fill=tk.X, pady=2)
             
-            title = tk.Label(main_frame, text=f"📖 Año {i+1}", bg=colors[i], fg="white", 
+            title = tk.Label(main_frame, text=f"📖 Año {i+1}", bg=color, fg="white", 
                            font=("Arial", 11, "bold"))
             title.pack(anchor=tk.W, padx=10, pady=(8, 2))
             
-            value = tk.Label(main_frame, text="0", bg=colors[i], fg="white", 
+            value = tk.Label(main_frame, text="0", bg=color, fg="white", 
                            font=("Arial", 24, "bold"))
             value.pack(anchor=tk.W, padx=10)
             
-            detail = tk.Label(main_frame, text="estudiantes totales", bg=colors[i], fg="white", 
+            detail = tk.Label(main_frame, text="estudiantes totales", bg=color, fg="white", 
                             font=("Arial", 8))
             detail.pack(anchor=tk.W, padx=10, pady=(0, 8))
             
@@ -323,14 +515,81 @@ class StudentFlowSimulator:
                        bg="white", fg="#64748b", font=("Arial", 9, "italic"))
         note.pack(anchor=tk.W, padx=20, pady=(0, 15))
         
+        # Modo por estudiante: distribución de repeticiones y del tiempo hasta el título
+        self.agents_var = tk.BooleanVar(value=False)
+        agents_check = tk.Checkbutton(self.config_frame, text="👤 Simular cada estudiante individualmente (se aplica al reiniciar)",
+                                      variable=self.agents_var, bg="white", fg="#475569",
+                                      activebackground="white", font=("Arial", 9, "bold"))
+        agents_check.pack(anchor=tk.W, padx=20, pady=(0, 10))
+        
+        # Modo estocástico: réplicas Monte Carlo para dimensionar salas al percentil 95
+        stochastic_frame = tk.Frame(self.config_frame, bg="white")
+        stochastic_frame.pack(anchor=tk.W, padx=20, pady=(0, 10))
+        self.stochastic_var = tk.BooleanVar(value=self.stochastic_replications is not None)
+        tk.Checkbutton(stochastic_frame, text="🎲 Dimensionamiento estocástico con", variable=self.stochastic_var,
+                       bg="white", fg="#475569", activebackground="white",
+                       font=("Arial", 9, "bold")).pack(side=tk.LEFT)
+        self.replications_entry = tk.Entry(stochastic_frame, width=8, font=("Arial", 10), relief=tk.SOLID, bd=1,
+                                           bg="#f8fafc", fg="#1e293b")
+        self.replications_entry.insert(0, str(self.stochastic_replications or 2000))
+        self.replications_entry.pack(side=tk.LEFT, padx=(0, 5))
+        tk.Label(stochastic_frame, text="réplicas (se aplica al reiniciar)", bg="white", fg="#475569",
+                 font=("Arial", 9, "bold")).pack(side=tk.LEFT)
+        
+        schedule_frame = tk.Frame(self.config_frame, bg="white")
+        schedule_frame.pack(anchor=tk.W, padx=20, pady=(0, 10))
+        tk.Button(schedule_frame, text="📅 Cargar cronograma (CSV/JSON)…", command=self.load_schedule_click,
+                  bg="#0ea5e9", fg="white", font=("Arial", 10, "bold"),
+                  padx=15, pady=6, cursor="hand2", relief=tk.FLAT, borderwidth=0).pack(side=tk.LEFT)
+        tk.Button(schedule_frame, text="✖ Quitar", command=lambda: self.set_schedule(None, ""),
+                  bg="#e2e8f0", fg="#1e293b", font=("Arial", 10, "bold"),
+                  padx=10, pady=6, cursor="hand2", relief=tk.FLAT, borderwidth=0).pack(side=tk.LEFT, padx=(5, 0))
+        self.schedule_label = tk.Label(schedule_frame, text="Parámetros constantes", bg="white", fg="#64748b",
+                                       font=("Arial", 9, "italic"))
+        self.schedule_label.pack(side=tk.LEFT, padx=(10, 0))
+        
+        inventory_frame = tk.Frame(self.config_frame, bg="white")
+        inventory_frame.pack(anchor=tk.W, padx=20, pady=(0, 10))
+        tk.Button(inventory_frame, text="🚪 Cargar inventario de salas (JSON/CSV)…", command=self.load_inventory_click,
+                  bg="#14b8a6", fg="white", font=("Arial", 10, "bold"),
+                  padx=15, pady=6, cursor="hand2", relief=tk.FLAT, borderwidth=0).pack(side=tk.LEFT)
+        tk.Button(inventory_frame, text="✖ Quitar", command=lambda: self.set_inventory(None, ""),
+                  bg="#e2e8f0", fg="#1e293b", font=("Arial", 10, "bold"),
+                  padx=10, pady=6, cursor="hand2", relief=tk.FLAT, borderwidth=0).pack(side=tk.LEFT, padx=(5, 0))
+        self.inventory_label = tk.Label(inventory_frame, text=f"Salas genéricas de {ROOM_CAPACITY} estudiantes", bg="white",
+                                        fg="#64748b", font=("Arial", 9, "italic"))
+        self.inventory_label.pack(side=tk.LEFT, padx=(10, 0))
+        
+        calibrate_button = tk.Button(self.config_frame, text="📈 Calibrar tasas con datos observados (CSV/JSON)…",
+                                     command=self.calibrate_click,
+                                     bg="#f59e0b", fg="white", font=("Arial", 10, "bold"),
+                                     padx=15, pady=6, cursor="hand2", relief=tk.FLAT, borderwidth=0)
+        calibrate_button.pack(anchor=tk.W, padx=20, pady=(0, 10))
+        
+        campus_button = tk.Button(self.config_frame, text="🏫 Cargar carreras (JSON)…",
+                                  command=self.load_programs_click,
+                                  bg="#6366f1", fg="white", font=("Arial", 10, "bold"),
+                                  padx=15, pady=6, cursor="hand2", relief=tk.FLAT, borderwidth=0)
+        campus_button.pack(anchor=tk.W, padx=20, pady=(0, 10))
+        
+        # Puntos de control: guardan la simulación completa para retomarla más tarde
+        checkpoint_frame = tk.Frame(self.config_frame, bg="white")
+        checkpoint_frame.pack(anchor=tk.W, padx=20, pady=(0, 15))
+        for text, command in (("💾 Guardar estado…", self.save_checkpoint_click),
+                              ("📂 Abrir estado…", self.load_checkpoint_click)):
+            tk.Button(checkpoint_frame, text=text, command=command,
+                      bg="#64748b", fg="white", font=("Arial", 10, "bold"),
+                      padx=15, pady=6, cursor="hand2", relief=tk.FLAT, borderwidth=0).pack(side=tk.LEFT, padx=(0, 5))
+        
     def create_flow_diagram(self, parent):
         title = tk.Label(parent, text="🔄 Diagrama de Flujo de Estudiantes", 
                         bg="white", fg="#1e293b", font=("Arial", 15, "bold"))
         title.pack(anchor=tk.W, padx=20, pady=(15, 10))
         
-        self.flow_canvas = tk.Canvas(parent, bg="#f8fafc", height=300, 
+        self.flow_canvas = CountingCanvas(parent, self.profiler, "canvas.flow", bg="#f8fafc", height=300, 
                                      highlightthickness=1, highlightbackground="#e2e8f0")
         self.flow_canvas.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 15))
+        self.flow_layout = None
         
     def create_graphs_panel(self, parent):
         # Frame para contener ambos gráficos
@@ -342,6 +601,15 @@ class StudentFlowSimulator:
                         bg="white", fg="#1e293b", font=("Arial", 15, "bold"))
         title.pack(anchor=tk.W, padx=20, pady=(15, 10))
         
+        # Escenarios guardados: los marcados se superponen en el gráfico de evolución
+        scenario_bar = tk.Frame(graphs_container, bg="white")
+        scenario_bar.pack(fill=tk.X, padx=20, pady=(0, 10))
+        tk.Button(scenario_bar, text="💾 Guardar escenario", command=self.save_scenario_click,
+                  bg="#8b5cf6", fg="white", font=("Arial", 10, "bold"),
+                  padx=12, pady=4, cursor="hand2", relief=tk.FLAT, borderwidth=0).pack(side=tk.LEFT)
+        self.scenario_checks = tk.Frame(scenario_bar, bg="white")
+        self.scenario_checks.pack(side=tk.LEFT, padx=(10, 0))
+        
         # Frame para los dos gráficos lado a lado
         graphs_frame = tk.Frame(graphs_container, bg="white")
         graphs_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 15))
@@ -354,9 +622,20 @@ class StudentFlowSimulator:
                                  bg="white", fg="#1e293b", font=("Arial", 12, "bold"))
         evolution_title.pack(anchor=tk.W, pady=(0, 10))
         
-        self.graph_canvas = tk.Canvas(left_frame, bg="#f8fafc", height=300, 
+        self.graph_canvas = CountingCanvas(left_frame, self.profiler, "canvas.evolution", bg="#f8fafc", height=300, 
                                       highlightthickness=1, highlightbackground="#e2e8f0")
         self.graph_canvas.pack(fill=tk.BOTH, expand=True)
+        self.graph_layout = None
+        # Ventana visible en años: None es toda la corrida; (ancho, None) sigue el final
+        self.graph_view = None
+        self.graph_drag = None
+        # Rueda: zoom alrededor del cursor; arrastrar: desplazar; doble clic: ver todo
+        self.graph_canvas.bind("<MouseWheel>", lambda e: self.zoom_graph(e.x, 0.8 if e.delta > 0 else 1.25))
+        self.graph_canvas.bind("<Button-4>", lambda e: self.zoom_graph(e.x, 0.8))
+        self.graph_canvas.bind("<Button-5>", lambda e: self.zoom_graph(e.x, 1.25))
+        self.graph_canvas.bind("<ButtonPress-1>", self.start_graph_drag)
+        self.graph_canvas.bind("<B1-Motion>", self.drag_graph)
+        self.graph_canvas.bind("<Double-Button-1>", lambda e: self.set_graph_view(None))
         
         # Gráfico de pastel (derecha)
         right_frame = tk.Frame(graphs_frame, bg="white")
@@ -366,31 +645,53 @@ class StudentFlowSimulator:
                            bg="white", fg="#1e293b", font=("Arial", 12, "bold"))
         pie_title.pack(anchor=tk.W, pady=(0, 10))
         
-        self.pie_canvas = tk.Canvas(right_frame, bg="#f8fafc", height=300, 
+        self.pie_canvas = CountingCanvas(right_frame, self.profiler, "canvas.pie", bg="#f8fafc", height=300, 
                                     highlightthickness=1, highlightbackground="#e2e8f0")
         self.pie_canvas.pack(fill=tk.BOTH, expand=True)
+        self.pie_layout = None
         
     def create_history_table(self, parent):
         title = tk.Label(parent, text="📋 Historial Detallado por Año Académico", 
                         bg="white", fg="#1e293b", font=("Arial", 15, "bold"))
         title.pack(anchor=tk.W, padx=20, pady=(15, 10))
         
-        table_frame = tk.Frame(parent, bg="white")
-        table_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 15))
-        
-        scrollbar = ttk.Scrollbar(table_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.history_text = tk.Text(table_frame, height=10, wrap=tk.NONE, 
-                                   font=("Courier", 9), yscrollcommand=scrollbar.set,
-                                   bg="#f8fafc", relief=tk.FLAT, fg="#1e293b")
-        self.history_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        scrollbar.config(command=self.history_text.yview)
+        # Sólo se formatean las filas visibles, leídas del historial bajo demanda
+        self.history_table = VirtualTable(parent, self.history_row_count, self.history_row_values)
+        self.history_table.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 15))
+        self.history_table.set_columns(self.history_columns())
+        
+    def history_columns(self):
+        total_years = self.params['total_years']
+        columns = [("Año", 60)]
+        columns += [(year_ordinal(i), 60) for i in range(total_years)]
+        columns += [("Grad", 70), ("Desert", 70), ("Total", 70)]
+        columns += [(f"Rep{i+1}", 60) for i in range(total_years)]
+        return columns
+        
+    def history_row_count(self):
+        # Una fila por año simulado: el historial guarda el estado al inicio de cada año
+        if self.year == 0:
+            return 0
+        return len(self.history)
+        
+    def history_row_values(self, index):
+        total_years = self.params['total_years']
+        if index + 1 < len(self.history):
+            row = self.history.rows(index + 1, index + 2)[0]
+            year = row[0]
+            students = row[1:total_years + 1]
+            graduated, dropped, enrolled = row[total_years + 1:total_years + 4]
+            repeaters = row[total_years + 4:2 * total_years + 4]
+        else:
+            # El último año aún no está en el historial: es el estado actual
+            year, students, repeaters = self.year, self.students_per_year, self.repeaters_per_year
+            graduated, dropped, enrolled = self.total_graduated, self.total_dropped, self.total_enrolled
         
-        header = f"{'Año':>4} | {'1er':>5} | {'2do':>5} | {'3er':>5} | {'4to':>5} | {'5to':>5} | {'Grad':>6} | {'Desert':>7} | {'Total':>6} | {'Rep1':>5} | {'Rep2':>5} | {'Rep3':>5} | {'Rep4':>5} | {'Rep5':>5}\n"
-        header += "-" * 120 + "\n"
-        self.history_text.insert(tk.END, header)
+        values = [int(year)]
+        values += [int(students[i]) for i in range(total_years)]
+        values += [int(graduated), int(dropped), int(enrolled)]
+        values += [int(repeaters[i]) for i in range(total_years)]
+        return values
         
     def create_analysis_panel(self, parent):
         title = tk.Label(parent, text="💡 Análisis y Recomendaciones de Planificación", 
@@ -403,316 +704,406 @@ class StudentFlowSimulator:
                                     fg="#334155")
         self.analysis_text.pack(fill=tk.X, padx=20, pady=(0, 15))
         
-    def update_flow_diagram(self):
-        self.flow_canvas.delete("all")
-        
-        width = self.flow_canvas.winfo_width()
-        height = self.flow_canvas.winfo_height()
-        
-        if width <= 1:
-            return
-            
-        # Configuración
-        box_width = 120
+        # Cada sección ocupa el rango entre su marca y la de la siguiente
+        self.analysis_keys = {}
+        for name in ANALYSIS_SECTIONS:
+            self.analysis_text.mark_set(f"{name}_start", "1.0")
+            self.analysis_text.mark_gravity(f"{name}_start", tk.LEFT)
+        
+    def layout_flow_diagram(self, width, height):
+        # Crea los elementos una sola vez por tamaño; update_flow_diagram sólo cambia textos
+        canvas = self.flow_canvas
+        canvas.delete("all")
+        self.flow_layout = (width, height, self.params['total_years'])
+        
+        # Configuración (las cajas se achican en carreras largas)
+        total_years = self.params['total_years']
+        box_width = min(120, (width - 150) / (total_years * 1.4))
         box_height = 80
-        spacing = (width - box_width * self.params['total_years']) / (self.params['total_years'] + 1)
+        spacing = (width - 150 - box_width * total_years) / (total_years + 1)
         y_center = height // 2
         
-        colors = ["#06b6d4", "#8b5cf6", "#ec4899", "#f59e0b", "#10b981"]
-        
         # Dibujar cajas de cada año
-        for i in range(self.params['total_years']):
+        for i in range(total_years):
             x = spacing * (i + 1) + box_width * i
             
             # Caja principal
-            self.flow_canvas.create_rectangle(x, y_center - box_height//2, 
-                                             x + box_width, y_center + box_height//2,
-                                             fill=colors[i], outline=colors[i], width=2)
+            canvas.create_rectangle(x, y_center - box_height//2, 
+                                    x + box_width, y_center + box_height//2,
+                                    fill=year_color(i), outline=year_color(i), width=2)
             
             # Texto
-            self.flow_canvas.create_text(x + box_width//2, y_center - 20,
-                                        text=f"Año {i+1}", fill="white", 
-                                        font=("Arial", 11, "bold"))
+            canvas.create_text(x + box_width//2, y_center - 20,
+                               text=f"Año {i+1}", fill="white", 
+                               font=("Arial", 11, "bold"))
             
-            self.flow_canvas.create_text(x + box_width//2, y_center + 5,
-                                        text=f"{int(self.students_per_year[i])}", 
-                                        fill="white", font=("Arial", 20, "bold"))
+            canvas.create_text(x + box_width//2, y_center + 5, tags=f"count{i}",
+                               fill="white", font=("Arial", 20, "bold"))
             
             # Detalles de repetidores y nuevos
-            repeater_text = f"🔄{int(self.repeaters_per_year[i])}"
-            new_text = f"🆕{int(self.new_students_per_year[i])}"
-            
-            self.flow_canvas.create_text(x + box_width//2, y_center + 25,
-                                        text=f"{repeater_text} {new_text}", 
-                                        fill="white", font=("Arial", 8))
+            canvas.create_text(x + box_width//2, y_center + 25, tags=f"detail{i}",
+                               fill="white", font=("Arial", 8))
             
             # Flechas hacia el siguiente año
-            if i < self.params['total_years'] - 1:
+            if i < total_years - 1:
                 arrow_start_x = x + box_width
                 arrow_end_x = x + box_width + spacing
                 
                 # Flecha de avance
-                self.flow_canvas.create_line(arrow_start_x, y_center - 15,
-                                            arrow_end_x, y_center - 15,
-                                            arrow=tk.LAST, fill="#10b981", width=3)
+                canvas.create_line(arrow_start_x, y_center - 15,
+                                   arrow_end_x, y_center - 15,
+                                   arrow=tk.LAST, fill="#10b981", width=3)
                 
-                percent = self.params['a1'] if i == 0 else self.params['ai']
-                self.flow_canvas.create_text((arrow_start_x + arrow_end_x)//2, 
-                                            y_center - 30,
-                                            text=f"Pasan {percent}%", fill="#10b981", 
-                                            font=("Arial", 8, "bold"))
+                canvas.create_text((arrow_start_x + arrow_end_x)//2, y_center - 30,
+                                   tags=f"pass{i}", fill="#10b981", 
+                                   font=("Arial", 8, "bold"))
                 
                 # Flecha de repetición (curva)
-                self.flow_canvas.create_arc(x + 20, y_center + box_height//2,
-                                           x + box_width - 20, y_center + box_height//2 + 40,
-                                           start=0, extent=180, style=tk.ARC,
-                                           outline="#f59e0b", width=2)
+                canvas.create_arc(x + 20, y_center + box_height//2,
+                                  x + box_width - 20, y_center + box_height//2 + 40,
+                                  start=0, extent=180, style=tk.ARC,
+                                  outline="#f59e0b", width=2)
                 
-                percent_repeat = self.params['c1'] if i == 0 else self.params['ci']
-                self.flow_canvas.create_text(x + box_width//2, y_center + box_height//2 + 50,
-                                            text=f"Repiten {percent_repeat}%", 
-                                            fill="#f59e0b", font=("Arial", 8, "bold"))
+                canvas.create_text(x + box_width//2, y_center + box_height//2 + 50,
+                                   tags=f"repeat{i}", fill="#f59e0b", 
+                                   font=("Arial", 8, "bold"))
                 
                 # Flecha de abandono (hacia abajo)
-                self.flow_canvas.create_line(x + box_width//2, y_center + box_height//2,
-                                            x + box_width//2, height - 30,
-                                            arrow=tk.LAST, fill="#ef4444", width=2)
+                canvas.create_line(x + box_width//2, y_center + box_height//2,
+                                   x + box_width//2, height - 30,
+                                   arrow=tk.LAST, fill="#ef4444", width=2)
                 
-                percent_drop = self.params['b1'] if i == 0 else self.params['bi']
-                self.flow_canvas.create_text(x + box_width//2 + 40, height - 40,
-                                            text=f"Abandonan {percent_drop}%", 
-                                            fill="#ef4444", font=("Arial", 8, "bold"))
+                canvas.create_text(x + box_width//2 + 40, height - 40,
+                                   tags=f"drop{i}", fill="#ef4444", 
+                                   font=("Arial", 8, "bold"))
             else:
                 # Flecha de graduación
                 grad_x = x + box_width + 50
-                self.flow_canvas.create_line(x + box_width, y_center,
-                                            grad_x, y_center,
-                                            arrow=tk.LAST, fill="#10b981", width=4)
+                canvas.create_line(x + box_width, y_center,
+                                   grad_x, y_center,
+                                   arrow=tk.LAST, fill="#10b981", width=4)
                 
-                self.flow_canvas.create_text(grad_x + 50, y_center,
-                                            text=f"🎓\n{int(self.total_graduated)}\nGraduados", 
-                                            fill="#10b981", font=("Arial", 10, "bold"),
-                                            justify=tk.CENTER)
+                canvas.create_text(grad_x + 50, y_center, tags="graduated",
+                                   fill="#10b981", font=("Arial", 10, "bold"),
+                                   justify=tk.CENTER)
         
-    def update_evolution_graph(self):
-        self.graph_canvas.delete("all")
+    def update_flow_diagram(self):
+        canvas = self.flow_canvas
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
         
-        if len(self.history['year']) < 2:
+        if width <= 1:
             return
+        
+        total_years = self.params['total_years']
+        if self.flow_layout != (width, height, total_years):
+            self.layout_flow_diagram(width, height)
+        
+        for i in range(total_years):
+            canvas.itemconfig(f"count{i}", text=f"{int(self.students_per_year[i])}")
+            canvas.itemconfig(f"detail{i}", text=f"🔄{int(self.repeaters_per_year[i])} 🆕{int(self.new_students_per_year[i])}")
             
-        width = self.graph_canvas.winfo_width()
-        height = self.graph_canvas.winfo_height()
+            if i < total_years - 1:
+                first = i == 0
+                canvas.itemconfig(f"pass{i}", text=f"Pasan {self.params['a1' if first else 'ai']}%")
+                canvas.itemconfig(f"repeat{i}", text=f"Repiten {self.params['c1' if first else 'ci']}%")
+                canvas.itemconfig(f"drop{i}", text=f"Abandonan {self.params['b1' if first else 'bi']}%")
         
-        if width <= 1:
-            return
+        canvas.itemconfig("graduated", text=f"🎓\n{int(self.total_graduated)}\nGraduados")
+        
+    def layout_evolution_graph(self, width, height, compared=()):
+        canvas = self.graph_canvas
+        canvas.delete("all")
+        self.graph_layout = (width, height, self.params['total_years'], tuple(compared))
         
         padding = 50
-        graph_width = width - 2 * padding
+        total_years = self.params['total_years']
         graph_height = height - 2 * padding
         
-        years_to_show = min(20, len(self.history['year']))
-        years = self.history['year'][-years_to_show:]
-        
-        # Encontrar valores máximos
-        max_students = max([max(self.history[f'year{i}'][-years_to_show:]) 
-                           for i in range(1, 6)] + [1])
-        
         # Ejes
-        self.graph_canvas.create_line(padding, padding, padding, height - padding,
-                                      fill="#475569", width=2)
-        self.graph_canvas.create_line(padding, height - padding, width - padding,
-                                      height - padding, fill="#475569", width=2)
-        
-        # Líneas para cada año
-        colors = ["#06b6d4", "#8b5cf6", "#ec4899", "#f59e0b", "#10b981"]
-        names = ["1er Año", "2do Año", "3er Año", "4to Año", "5to Año"]
+        canvas.create_line(padding, padding, padding, height - padding,
+                           fill="#475569", width=2, tags="graph")
+        canvas.create_line(padding, height - padding, width - padding,
+                           height - padding, fill="#475569", width=2, tags="graph")
         
+        # Líneas para cada año (sus puntos se actualizan con coords)
         legend_x = width - 150
         legend_y = padding + 20
-        
-        for idx in range(1, 6):
-            data = self.history[f'year{idx}'][-years_to_show:]
-            points = []
-            
-            for i, val in enumerate(data):
-                x = padding + (i / (years_to_show - 1)) * graph_width if years_to_show > 1 else padding
-                y = height - padding - (val / max_students) * graph_height if max_students > 0 else height - padding
-                points.extend([x, y])
-            
-            if len(points) >= 4:
-                self.graph_canvas.create_line(points, fill=colors[idx-1], width=2, smooth=True)
+        legend_step = min(25, graph_height / max(total_years, len(compared) + 1))
+        
+        # Comparación: una línea de matrícula total por escenario y la de la simulación actual
+        series = [(f"scenario{k}", name, year_color(k), 2) for k, name in enumerate(compared)]
+        if compared:
+            series.append(("live_total", "Simulación actual", "#1e293b", 3))
+        for tag, name, color, line_width in series:
+            canvas.create_line(0, 0, 0, 0, fill=color, width=line_width, tags=("graph", tag))
+            canvas.create_line(legend_x, legend_y, legend_x + 30, legend_y, fill=color, width=3, tags="graph")
+            canvas.create_text(legend_x + 35, legend_y, text=name, anchor=tk.W, fill=color,
+                               font=("Arial", 9, "bold"), tags="graph")
+            legend_y += legend_step
+        
+        for idx in range(0 if compared else total_years):
+            canvas.create_line(0, 0, 0, 0, fill=year_color(idx), width=2, smooth=True,
+                               tags=("graph", f"series{idx}"))
             
             # Leyenda
-            self.graph_canvas.create_line(legend_x, legend_y, legend_x + 30, legend_y,
-                                         fill=colors[idx-1], width=3)
-            self.graph_canvas.create_text(legend_x + 35, legend_y, text=names[idx-1],
-                                         anchor=tk.W, fill=colors[idx-1], 
-                                         font=("Arial", 9, "bold"))
-            legend_y += 25
+            canvas.create_line(legend_x, legend_y, legend_x + 30, legend_y,
+                               fill=year_color(idx), width=3, tags="graph")
+            canvas.create_text(legend_x + 35, legend_y, text=f"{year_ordinal(idx)} Año",
+                               anchor=tk.W, fill=year_color(idx), 
+                               font=("Arial", 9, "bold"), tags="graph")
+            legend_y += legend_step
         
         # Etiquetas
-        self.graph_canvas.create_text(padding - 25, padding, text=str(int(max_students)),
-                                      anchor=tk.E, font=("Arial", 9))
-        self.graph_canvas.create_text(padding - 25, height - padding, text="0",
-                                      anchor=tk.E, font=("Arial", 9))
-        
-        if years:
-            self.graph_canvas.create_text(padding, height - padding + 25, 
-                                         text=f"Año {years[0]}",
-                                         anchor=tk.W, font=("Arial", 9))
-            self.graph_canvas.create_text(width - padding, height - padding + 25,
-                                         text=f"Año {years[-1]}",
-                                         anchor=tk.E, font=("Arial", 9))
+        canvas.create_text(padding - 25, padding, anchor=tk.E, font=("Arial", 9),
+                           tags=("graph", "max_label"))
+        canvas.create_text(padding - 25, height - padding, text="0",
+                           anchor=tk.E, font=("Arial", 9), tags="graph")
+        canvas.create_text(padding, height - padding + 25, anchor=tk.W, font=("Arial", 9),
+                           tags=("graph", "first_year"))
+        canvas.create_text(width - padding, height - padding + 25, anchor=tk.E, font=("Arial", 9),
+                           tags=("graph", "last_year"))
         
-    def update_pie_chart(self):
-        self.pie_canvas.delete("all")
+    def update_evolution_graph(self):
+        canvas = self.graph_canvas
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
         
-        width = self.pie_canvas.winfo_width()
-        height = self.pie_canvas.winfo_height()
+        if width <= 1:
+            return
         
-        if width <= 1 or self.total_enrolled == 0:
-            # Mostrar mensaje si no hay datos
-            self.pie_canvas.create_text(width//2, height//2, 
-                                       text="No hay datos\ndisponibles\n\nEjecuta la simulación\npara ver el gráfico",
-                                       fill="#64748b", font=("Arial", 12, "bold"),
-                                       justify=tk.CENTER)
+        total_years = self.params['total_years']
+        compared = self.compared_scenarios()
+        if self.graph_layout != (width, height, total_years, tuple(compared)):
+            self.layout_evolution_graph(width, height, compared)
+        
+        if compared:
+            self.update_comparison_graph(width, height, compared)
             return
         
-        center_x, center_y = width // 2, height // 2
-        radius = min(center_x, center_y) - 40
+        if len(self.history['year']) < 2:
+            canvas.itemconfig("graph", state=tk.HIDDEN)
+            return
+        canvas.itemconfig("graph", state=tk.NORMAL)
         
-        # Calcular porcentajes para cada año
-        percentages = []
-        total = self.total_enrolled
+        padding = 50
+        graph_width = width - 2 * padding
+        graph_height = height - 2 * padding
         
-        for i in range(self.params['total_years']):
-            if total > 0:
-                percentage = (self.students_per_year[i] / total) * 100
+        history = self.history
+        start, stop = self.graph_window()
+        first_year, last_year = float(history['year'][start]), float(history['year'][stop - 1])
+        names = [f'year{i}' for i in range(1, total_years + 1)]
+        
+        # Máximos por bloques guardados en el historial: no se recorre la ventana
+        max_students = max([history.window_extrema(name, start, stop)[1] for name in names] + [1])
+        
+        # Con varios bloques por píxel bastan el mínimo y el máximo de cada uno (también
+        # guardados): el costo depende del ancho del gráfico, no del largo de la ventana
+        rows = np.arange(start, stop)
+        for block in GRAPH_BLOCKS:
+            if (stop - start) // block >= graph_width:
+                extremes = [history.extreme_rows(name, start, stop, block) for name in names]
+                rows = np.unique(np.concatenate(extremes + [[start, stop - 1]]))
+                break
+        
+        # Un punto por píxel como máximo, elegido con LTTB para todas las series a la vez
+        years = history['year'][rows]
+        series = np.vstack([history[name][rows] for name in names])
+        chosen = lttb(years, series, max(3, int(graph_width)))
+        span = max(last_year - first_year, 1)
+        for idx in range(total_years):
+            xs = padding + (years[chosen[idx]] - first_year) / span * graph_width
+            ys = height - padding - series[idx, chosen[idx]] / max_students * graph_height
+            canvas.coords(f"series{idx}", *np.column_stack([xs, ys]).ravel().tolist())
+        
+        canvas.itemconfig("max_label", text=str(int(max_students)))
+        canvas.itemconfig("first_year", text=f"Año {int(first_year)}")
+        canvas.itemconfig("last_year", text=f"Año {int(last_year)}")
+        
+    def graph_window(self):
+        """Filas [start, stop) del historial dentro de la ventana visible (al menos dos)"""
+        years = self.history['year']
+        size = len(years)
+        if self.graph_view is None:
+            return 0, size
+        first, last = self.graph_view
+        if last is None:
+            first, last = years[-1] - first, years[-1]
+        # La columna de años es creciente: búsqueda binaria, sin recorrer el historial
+        start = int(np.searchsorted(years, first, side='left'))
+        stop = int(np.searchsorted(years, last, side='right'))
+        start = min(start, size - 2)
+        return start, max(stop, start + 2)
+        
+    def visible_years(self):
+        years = self.history['year']
+        start, stop = self.graph_window()
+        return float(years[start]), float(years[stop - 1])
+        
+    def set_graph_view(self, first, last=None):
+        years = self.history['year']
+        if first is None or len(years) < 2:
+            self.graph_view = None
+        else:
+            low, high = float(years[0]), float(years[-1])
+            span = min(max(last - first, 2), high - low)
+            first = min(max(first, low), high - span)
+            if span >= high - low:
+                self.graph_view = None
+            elif first + span >= high:
+                # Ventana pegada al final: sigue la simulación con el mismo ancho
+                self.graph_view = (span, None)
             else:
-                percentage = 0
-            percentages.append(percentage)
+                self.graph_view = (first, first + span)
+        self.scheduler.invalidate('graph_view')
         
-        # Colores para cada segmento
-        colors = ["#06b6d4", "#8b5cf6", "#ec4899", "#f59e0b", "#10b981"]
+    def zoom_graph(self, x, factor):
+        if self.compared_scenarios() or len(self.history['year']) < 2:
+            return
+        graph_width = max(self.graph_canvas.winfo_width() - 100, 1)
+        fraction = min(max((x - 50) / graph_width, 0), 1)
+        first, last = self.visible_years()
+        # El año bajo el cursor queda fijo
+        anchor = first + fraction * (last - first)
+        span = (last - first) * factor
+        self.set_graph_view(anchor - fraction * span, anchor + (1 - fraction) * span)
+        
+    def start_graph_drag(self, event):
+        if self.compared_scenarios() or len(self.history['year']) < 2:
+            self.graph_drag = None
+            return
+        self.graph_drag = (event.x, self.visible_years())
         
-        # Dibujar el gráfico de pastel
-        start_angle = 0
-        for i, percentage in enumerate(percentages):
-            if percentage > 0:
-                extent = 360 * (percentage / 100)
-                
-                # Dibujar segmento
-                self.pie_canvas.create_arc(center_x - radius, center_y - radius,
-                                          center_x + radius, center_y + radius,
-                                          start=start_angle, extent=extent,
-                                          fill=colors[i], outline="white", width=2)
-                
-                # Calcular posición para la etiqueta
-                angle_rad = math.radians(start_angle + extent/2)
-                label_x = center_x + (radius * 0.7) * math.cos(angle_rad)
-                label_y = center_y + (radius * 0.7) * math.sin(angle_rad)
-                
-                # Etiqueta con porcentaje
-                self.pie_canvas.create_text(label_x, label_y, 
-                                           text=f"{percentage:.1f}%",
-                                           fill="white", font=("Arial", 9, "bold"))
-                
-                start_angle += extent
+    def drag_graph(self, event):
+        if self.graph_drag is None:
+            return
+        x, (first, last) = self.graph_drag
+        shift = (x - event.x) / max(self.graph_canvas.winfo_width() - 100, 1) * (last - first)
+        self.set_graph_view(first + shift, last + shift)
         
-        # Leyenda
-        legend_x = 20
-        legend_y = height - 120
+    def update_comparison_graph(self, width, height, compared):
+        canvas = self.graph_canvas
+        canvas.itemconfig("graph", state=tk.NORMAL)
+        padding = 50
+        graph_width = width - 2 * padding
+        graph_height = height - 2 * padding
+        
+        # Todos los escenarios desde el año 0 hasta el horizonte de comparación
+        results = self.workspace.results(compared)
+        horizon = self.workspace.horizon
+        # La simulación actual se ubica por su columna de años (tras un salto o al cargar
+        # un punto de control el historial no empieza en el año 0), recortada al horizonte
+        history = self.history
+        years = history['year']
+        start = int(np.searchsorted(years, 0, side='left'))
+        stop = int(np.searchsorted(years, horizon, side='right'))
+        live_years, live = years[start:stop], history['total'][start:stop]
+        max_total = max([result.total.max() for result in results.values()] + [live.max() if len(live) else 0, 1])
+        
+        def points(years, values):
+            xs = padding + np.asarray(years) / horizon * graph_width
+            ys = height - padding - np.asarray(values) / max_total * graph_height
+            return np.column_stack([xs, ys]).ravel().tolist()
+        
+        for k, name in enumerate(compared):
+            total = results[name].total
+            canvas.coords(f"scenario{k}", *points(np.arange(len(total)), total))
+        # La simulación actual necesita al menos dos puntos para dibujarse
+        canvas.coords("live_total", *(points(live_years, live) if len(live) >= 2 else [0, 0, 0, 0]))
+        
+        canvas.itemconfig("max_label", text=str(int(max_total)))
+        canvas.itemconfig("first_year", text="Año 0")
+        canvas.itemconfig("last_year", text=f"Año {horizon}")
+        
+    def layout_pie_chart(self, width, height):
+        canvas = self.pie_canvas
+        canvas.delete("all")
+        self.pie_layout = (width, height, self.params['total_years'])
+        
+        center_x, center_y = width // 2, height // 2
+        radius = min(center_x, center_y) - 40
+        
+        # Mensaje si no hay datos
+        canvas.create_text(center_x, center_y, tags="empty",
+                           text="No hay datos\ndisponibles\n\nEjecuta la simulación\npara ver el gráfico",
+                           fill="#64748b", font=("Arial", 12, "bold"),
+                           justify=tk.CENTER)
         
         for i in range(self.params['total_years']):
-            if percentages[i] > 0:
-                # Cuadro de color
-                self.pie_canvas.create_rectangle(legend_x, legend_y, 
-                                               legend_x + 15, legend_y + 15,
-                                               fill=colors[i], outline="#475569")
-                
-                # Texto de la leyenda
-                self.pie_canvas.create_text(legend_x + 25, legend_y + 7,
-                                           text=f"Año {i+1}: {percentages[i]:.1f}% ({int(self.students_per_year[i])} estudiantes)",
-                                           anchor=tk.W, fill="#1e293b", 
-                                           font=("Arial", 9))
-                legend_y += 20
+            # Segmento y etiqueta con porcentaje
+            canvas.create_arc(center_x - radius, center_y - radius,
+                              center_x + radius, center_y + radius,
+                              start=0, extent=0, fill=year_color(i), outline="white", width=2,
+                              tags=("chart", f"slice{i}"))
+            canvas.create_text(center_x, center_y, fill="white", font=("Arial", 9, "bold"),
+                               tags=("chart", f"slice_label{i}"))
+            
+            # Leyenda: cuadro de color y texto
+            canvas.create_rectangle(0, 0, 15, 15, fill=year_color(i), outline="#475569",
+                                    tags=("chart", f"legend_box{i}"))
+            canvas.create_text(0, 0, anchor=tk.W, fill="#1e293b", font=("Arial", 9),
+                               tags=("chart", f"legend_text{i}"))
         
         # Título del gráfico
-        self.pie_canvas.create_text(center_x, 30, 
-                                   text=f"Distribución Actual - Total: {int(self.total_enrolled)} estudiantes",
-                                   fill="#1e293b", font=("Arial", 11, "bold"))
-        
-    def simulate_year(self):
-        # Guardar estado actual en historial
-        self.history['year'].append(self.year)
-        for i in range(1, 6):
-            self.history[f'year{i}'].append(self.students_per_year[i-1])
-            self.history[f'repeaters{i}'].append(self.repeaters_per_year[i-1])
-            self.history[f'new_students{i}'].append(self.new_students_per_year[i-1])
-            
-        self.history['graduated'].append(self.total_graduated)
-        self.history['dropped'].append(self.total_dropped)
-        self.history['total'].append(self.total_enrolled)
-        
-        # Nuevo arreglo para el próximo año
-        new_students = [0] * self.params['total_years']
-        new_repeaters = [0] * self.params['total_years']
-        new_new_students = [0] * self.params['total_years']
-        
-        # Procesar cada año de estudio
+        canvas.create_text(center_x, 30, fill="#1e293b", font=("Arial", 11, "bold"),
+                           tags=("chart", "title"))
+        
+    def update_pie_chart(self):
+        canvas = self.pie_canvas
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        
+        if width <= 1:
+            return
+        
+        if self.pie_layout != (width, height, self.params['total_years']):
+            self.layout_pie_chart(width, height)
+        
+        if self.total_enrolled == 0:
+            canvas.itemconfig("chart", state=tk.HIDDEN)
+            canvas.itemconfig("empty", state=tk.NORMAL)
+            return
+        canvas.itemconfig("empty", state=tk.HIDDEN)
+        canvas.itemconfig("title", state=tk.NORMAL,
+                          text=f"Distribución Actual - Total: {int(self.total_enrolled)} estudiantes")
+        
+        center_x, center_y = width // 2, height // 2
+        radius = min(center_x, center_y) - 40
+        total = self.total_enrolled
+        
+        start_angle = 0
+        legend_x = 20
+        legend_y = height - 20 * self.params['total_years'] - 20
+        
         for i in range(self.params['total_years']):
-            current = self.students_per_year[i]
+            percentage = (self.students_per_year[i] / total) * 100
+            items = (f"slice{i}", f"slice_label{i}", f"legend_box{i}", f"legend_text{i}")
             
-            if i == 0:  # Primer año
-                # Nuevos ingresos
-                new_students[0] += self.params['x']
-                new_new_students[0] += self.params['x']
-                
-                # Estudiantes del año anterior
-                pass_rate = self.params['a1'] / 100
-                repeat_rate = self.params['c1'] / 100
-                drop_rate = self.params['b1'] / 100
-                
-                if i + 1 < self.params['total_years']:
-                    new_students[i + 1] += current * pass_rate
-                else:
-                    self.total_graduated += current * pass_rate
-                    
-                new_students[i] += current * repeat_rate
-                new_repeaters[i] += current * repeat_rate
-                self.total_dropped += current * drop_rate
-                
-            else:  # Años posteriores
-                pass_rate = self.params['ai'] / 100
-                repeat_rate = self.params['ci'] / 100
-                drop_rate = self.params['bi'] / 100
-                
-                if i + 1 < self.params['total_years']:
-                    new_students[i + 1] += current * pass_rate
-                else:
-                    self.total_graduated += current * pass_rate
-                    
-                new_students[i] += current * repeat_rate
-                new_repeaters[i] += current * repeat_rate
-                self.total_dropped += current * drop_rate
-        
-        # Actualizar estudiantes
-        self.students_per_year = new_students
-        self.repeaters_per_year = new_repeaters
-        self.new_students_per_year = new_new_students
-        self.total_enrolled = sum(new_students)
-        self.year += 1
-        
-        # Agregar fila a la tabla
-        row = f"{self.year:>4} |"
-        for i in range(5):
-            row += f" {int(self.students_per_year[i]):>5} |"
-        row += f" {int(self.total_graduated):>6} | {int(self.total_dropped):>7} | {int(self.total_enrolled):>6} |"
-        for i in range(5):
-            row += f" {int(self.repeaters_per_year[i]):>5} |"
-        row = row.rstrip(" |") + "\n"
-        self.history_text.insert(tk.END, row)
-        self.history_text.see(tk.END)
+            if percentage <= 0:
+                for item in items:
+                    canvas.itemconfig(item, state=tk.HIDDEN)
+                continue
+            for item in items:
+                canvas.itemconfig(item, state=tk.NORMAL)
+            
+            extent = 360 * (percentage / 100)
+            canvas.itemconfig(f"slice{i}", start=start_angle, extent=extent)
+            
+            # Posición de la etiqueta (el eje y del canvas crece hacia abajo)
+            angle_rad = math.radians(start_angle + extent/2)
+            canvas.coords(f"slice_label{i}",
+                          center_x + (radius * 0.7) * math.cos(angle_rad),
+                          center_y - (radius * 0.7) * math.sin(angle_rad))
+            canvas.itemconfig(f"slice_label{i}", text=f"{percentage:.1f}%")
+            start_angle += extent
+            
+            # Leyenda compacta: sólo los años con estudiantes
+            canvas.coords(f"legend_box{i}", legend_x, legend_y, legend_x + 15, legend_y + 15)
+            canvas.coords(f"legend_text{i}", legend_x + 25, legend_y + 7)
+            canvas.itemconfig(f"legend_text{i}",
+                              text=f"Año {i+1}: {percentage:.1f}% ({int(self.students_per_year[i])} estudiantes)")
+            legend_y += 20
         
     def check_alerts(self):
         alerts = []
@@ -725,6 +1116,11 @@ class StudentFlowSimulator:
             # Alerta específica para repetidores
             if self.repeaters_per_year[i] > self.students_per_year[i] * 0.4:
                 alerts.append(f"🔄 ALTO NÚMERO DE REPETIDORES en {i+1}° año: {int(self.repeaters_per_year[i])} ({self.repeaters_per_year[i]/self.students_per_year[i]*100:.1f}%)")
+            
+            # Sobrecapacidad que aparecerá en régimen estable aunque aún no se vea
+            if (self.chain is not None and self.chain.equilibrium[i] > self.params['x'] * 2
+                    and self.students_per_year[i] <= self.params['x'] * 2):
+                alerts.append(f"📐 SOBRECAPACIDAD PROYECTADA en {i+1}° año: {int(self.chain.equilibrium[i])} estudiantes en régimen estable")
         
         # Tasa de deserción alta
         if self.year > 0 and self.total_enrolled > 0:
@@ -744,7 +1140,9 @@ class StudentFlowSimulator:
         else:
             self.alert_frame.pack_forget()
             
-    def create_classroom_design(self, total_rooms, max_students):
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def create_classroom_design(total_rooms, max_students):
         """Crea una representación ASCII art mejorada de un aula con mesas y sillas"""
         
         # Diseño compacto y bonito del aula
@@ -789,7 +1187,7 @@ class StudentFlowSimulator:
         classroom.append("┌─────────────────────────────────────────┐")
         classroom.append("│           📊 ESPECIFICACIONES          │")
         classroom.append("├─────────────────────────────────────────┤")
-        classroom.append(f"│ 🏫 Capacidad: 30 estudiantes/aula      │")
+        classroom.append(f"│ 🏫 Capacidad: {f'{ROOM_CAPACITY} estudiantes/aula':<25}│")
         classroom.append(f"│ 📚 Aulas necesarias: {total_rooms:<15} │")
         classroom.append(f"│ 👥 Máximo por aula: {int(max_students):<14} │")
         classroom.append("│ 🪑 5 filas × 6 mesas = 30 puestos       │")
@@ -798,31 +1196,91 @@ class StudentFlowSimulator:
         return "\n".join(classroom)
             
     def update_analysis(self):
-        self.analysis_text.delete(1.0, tk.END)
+        # Sólo se reescriben las secciones cuyos datos visibles cambiaron
+        total_years = self.params['total_years']
+        started = self.year > 0
+        population = getattr(self.shown, 'population', None)
+        students = tuple(int(s) for s in self.students_per_year[:total_years])
+        # En la vista de campus las salas se cuentan por carrera y luego se suman
+        rooms_per_year = tuple(int(r) for r in self.shown.rooms_per_year())
         
-        if self.year == 0:
-            self.analysis_text.insert(tk.END, 
-                "ℹ️ Presiona 'Iniciar Simulación' para comenzar a proyectar el flujo de estudiantes.\n\n"
-                "Esta herramienta te ayudará a:\n"
-                "• Planificar la cantidad de salas necesarias por año\n"
-                "• Estimar recursos docentes y administrativos\n"
-                "• Proyectar tasas de graduación y deserción\n"
-                "• Optimizar la capacidad de la institución")
-            return
+        total_repeaters = sum(self.repeaters_per_year)
+        repeater_rate = (total_repeaters / self.total_enrolled) * 100 if total_repeaters > 0 else None
         
+        retention_rate = None
+        if self.total_enrolled + self.total_dropped > 0:
+            retention_rate = (self.total_enrolled / (self.total_enrolled + self.total_dropped)) * 100
+        
+        grad_rate = None
+        if self.year >= total_years:
+            grad_rate = (self.total_graduated / (self.params['x'] * (self.year - total_years + 1))) * 100
+        
+        sections = [
+            ("intro", (started,), self.intro_section),
+            ("capacity", (started, students, rooms_per_year),
+             lambda: self.capacity_section(students, rooms_per_year)),
+            ("allocation", (started, students, self.allocator),
+             lambda: self.allocation_section(students)),
+            ("repeaters", (started, int(total_repeaters), repeater_rate and round(repeater_rate, 1)),
+             lambda: self.repeaters_section(total_repeaters, repeater_rate)),
+            ("retention", (started, retention_rate and round(retention_rate, 1)),
+             lambda: self.retention_section(retention_rate)),
+            ("graduation", (started, grad_rate and round(grad_rate, 1)),
+             lambda: self.graduation_section(grad_rate)),
+            ("trend", (started, self.enrollment_trend()), self.trend_section),
+            ("agents", (started, self.year, population is not None), lambda: self.agents_section(population)),
+            ("compare", tuple((name, self.workspace.key(name)) for name in self.compared_scenarios()),
+             self.compare_section),
+            ("steady", (started, self.chain_version),
+             lambda: ([""] if started else []) + self.steady_state_recommendations()),
+            ("sensitivity", (self.chain_version,), self.sensitivity_section),
+        ]
+        
+        for name, key, build in sections:
+            if self.analysis_keys.get(name) != key:
+                self.analysis_keys[name] = key
+                lines = build() if started or name in ("intro", "compare", "steady", "sensitivity") else []
+                self.write_analysis_section(name, "".join(line + "\n" for line in lines))
+        
+    def write_analysis_section(self, name, content):
+        text = self.analysis_text
+        index = ANALYSIS_SECTIONS.index(name)
+        later = ANALYSIS_SECTIONS[index + 1:]
+        end = f"{later[0]}_start" if later else "end-1c"
+        
+        text.delete(f"{name}_start", end)
+        # Las marcas de las secciones siguientes deben quedar detrás del texto insertado
+        for other in later:
+            text.mark_gravity(f"{other}_start", tk.RIGHT)
+        text.insert(f"{name}_start", content, f"section_{name}")
+        for other in later:
+            text.mark_gravity(f"{other}_start", tk.LEFT)
+        
+    def intro_section(self):
+        if self.year > 0:
+            return []
+        return ["ℹ️ Presiona 'Iniciar Simulación' para comenzar a proyectar el flujo de estudiantes.",
+                "",
+                "Esta herramienta te ayudará a:",
+                "• Planificar la cantidad de salas necesarias por año",
+                "• Estimar recursos docentes y administrativos",
+                "• Proyectar tasas de graduación y deserción",
+                "• Optimizar la capacidad de la institución",
+                ""]
+        
+    def capacity_section(self, students, rooms_per_year):
         recommendations = []
         
         # Análisis de capacidad
-        max_students = max(self.students_per_year[:self.params['total_years']])
-        recommendations.append(f"📊 CAPACIDAD MÁXIMA: El año con más estudiantes tiene {int(max_students)} alumnos.")
+        max_students = max(students)
+        recommendations.append(f"📊 CAPACIDAD MÁXIMA: El año con más estudiantes tiene {max_students} alumnos.")
         
-        # Salas necesarias (asumiendo 30 estudiantes por sala)
-        rooms_per_year = [math.ceil(s / 30) for s in self.students_per_year[:self.params['total_years']]]
+        # Salas necesarias (ROOM_CAPACITY estudiantes por sala)
         total_rooms_needed = sum(rooms_per_year)
         
-        # Crear representación visual del aula
+        # Crear representación visual del aula (en caché por sala y máximo)
         classroom_design = self.create_classroom_design(total_rooms_needed, max_students)
-        recommendations.append(f"🏫 SALAS NECESARIAS: Se requieren {total_rooms_needed} salas simultáneas (30 estudiantes/sala)")
+        recommendations.append(f"🏫 SALAS NECESARIAS: Se requieren {total_rooms_needed} salas simultáneas ({ROOM_CAPACITY} estudiantes/sala)")
         recommendations.append("")
         recommendations.append("📐 DISEÑO DE AULA TÍPICA:")
         recommendations.append(classroom_design)
@@ -830,57 +1288,189 @@ class StudentFlowSimulator:
         
         # Detalle de salas por año
         recommendations.append("📋 DISTRIBUCIÓN DE SALAS POR AÑO:")
-        for i in range(self.params['total_years']):
-            students = self.students_per_year[i]
-            rooms = rooms_per_year[i]
-            recommendations.append(f"   Año {i+1}: {int(students):>4} estudiantes → {rooms:>2} sala{'s' if rooms > 1 else ''}")
+        for i, rooms in enumerate(rooms_per_year):
+            recommendations.append(f"   Año {i+1}: {students[i]:>4} estudiantes → {rooms:>2} sala{'s' if rooms > 1 else ''}")
         
         recommendations.append("")
+        return recommendations
+        
+    def allocation_section(self, students):
+        if self.allocator is None:
+            return []
+        # La asignación se resuelve en cada paso; sólo se calcula aquí si el año llegó sin pasos
+        # (reinicio, salto, inventario nuevo) y el motor está detenido
+        allocation = self.allocations.get(self.year)
+        if allocation is None:
+            if self.worker is not None:
+                return []
+            self.allocate_year()
+            allocation = self.allocations[self.year]
+        inventory = self.allocator.inventory
+        lines = [f"🚪 ASIGNACIÓN DE SALAS: {inventory.slots} bloques horarios de {inventory.seats_per_slot} asientos"]
+        for i, count in enumerate(students):
+            line = f"   Año {i+1}: {count:>4} estudiantes → bloque {allocation.slots[i] + 1}: {allocation.describe(i)}"
+            if allocation.unseated[i]:
+                line += f" ⚠️ faltan {allocation.unseated[i]} asientos"
+            lines.append(line)
+        lines.append(f"   Costo total: {allocation.cost:.1f} ({allocation.sections} secciones)")
+        if not allocation.feasible:
+            lines.append(f"🚨 INVENTARIO INSUFICIENTE: {sum(allocation.unseated)} estudiantes sin sala")
+        lines.append("")
+        return lines
+        
+    def repeaters_section(self, total_repeaters, repeater_rate):
+        if repeater_rate is None:
+            return []
+        
+        recommendations = [f"🔄 TASA DE REPETICIÓN: {repeater_rate:.1f}% ({int(total_repeaters)} estudiantes repitiendo)"]
+        if repeater_rate > 20:
+            recommendations.append(f"🚨 ALTA REPETICIÓN: Implementar programas de apoyo académico y tutorías")
+        return recommendations
+        
+    def retention_section(self, retention_rate):
+        if retention_rate is None:
+            return []
+        if retention_rate < 60:
+            return [f"🚨 CRÍTICO: Tasa de retención del {retention_rate:.1f}%. Se requieren programas de apoyo estudiantil urgentes."]
+        if retention_rate < 75:
+            return [f"⚠️ ATENCIÓN: Tasa de retención del {retention_rate:.1f}%. Considere implementar tutorías y seguimiento."]
+        return [f"✅ BUENO: Tasa de retención del {retention_rate:.1f}%. El sistema mantiene a la mayoría de estudiantes."]
+        
+    def graduation_section(self, grad_rate):
+        if grad_rate is None:
+            return []
+        if grad_rate > 50:
+            return [f"🎓 EXCELENTE: Tasa de graduación del {grad_rate:.1f}%. El sistema es efectivo."]
+        return [f"📉 MEJORABLE: Tasa de graduación del {grad_rate:.1f}%. Revisar factores que impiden la graduación."]
+        
+    def enrollment_trend(self):
+        # Promedios de los últimos 5 años contra los 5 anteriores, con sumas acumuladas
+        count = len(self.history)
+        if count <= 5:
+            return None
+        recent_avg = self.history.window_sum('total', -5) / 5
+        old_avg = self.history.window_sum('total', -10, -5) / 5 if count >= 10 else recent_avg
+        
+        if recent_avg > old_avg * 1.1:
+            return "growth"
+        if recent_avg < old_avg * 0.9:
+            return "decline"
+        return None
+        
+    def trend_section(self):
+        trend = self.enrollment_trend()
+        if trend == "growth":
+            return [f"📈 CRECIMIENTO: La matrícula está aumentando. Planificar expansión de infraestructura."]
+        if trend == "decline":
+            return [f"📉 DECRECIMIENTO: La matrícula está disminuyendo. Investigar causas y tomar medidas."]
+        return []
+        
+    def agents_section(self, population):
+        if population is None:
+            return []
+        
+        repeat_counts = population.enrolled_repeat_counts()
+        by_repeats = [f"{k} {'vez' if k == 1 else 'veces'}: {int(n)}" for k, n in enumerate(repeat_counts[:3])]
+        if len(repeat_counts) > 3:
+            by_repeats.append(f"3 o más: {int(repeat_counts[3:].sum())}")
+        lines = [f"👤 MODO POR ESTUDIANTE ({int(repeat_counts.sum())} matriculados, {population.nbytes / 1024:.0f} KB):",
+                 "   Matriculados según repeticiones: " + " | ".join(by_repeats)]
+        median = population.time_to_degree_percentile(50)
+        if median is not None:
+            lines.append(f"   Años hasta el título: mediana {median}, p90 {population.time_to_degree_percentile(90)} "
+                         f"({population.graduated} graduados)")
+        return lines
+        
+    def compare_section(self):
+        compared = self.compared_scenarios()
+        if len(compared) < 2:
+            return []
+        
+        horizon = self.workspace.horizon
+        rows = compare_results(self.workspace.results(compared), horizon)
+        reference = rows[0]
+        lines = [f"⚖️ COMPARACIÓN DE ESCENARIOS (año {horizon}, referencia: {reference[0]}):",
+                 f"   {reference[0]}: matrícula {reference[1]:.0f} | graduados {reference[2]:.0f} | "
+                 f"abandonos {reference[3]:.0f} | salas {reference[4]}"]
+        for name, total, graduated, dropped, rooms in rows[1:]:
+            lines.append(f"   {name}: matrícula {total:.0f} {format_delta(total, reference[1])} | "
+                         f"graduados {graduated:.0f} {format_delta(graduated, reference[2])} | "
+                         f"abandonos {dropped:.0f} {format_delta(dropped, reference[3])} | "
+                         f"salas {rooms} {format_delta(rooms, reference[4])}")
+        lines.append("")
+        return lines
+        
+    def steady_state_recommendations(self):
+        if self.campus_aggregate:
+            return self.campus_recommendations()
+        chain = self.chain
+        if chain is None:
+            return ["🔮 RÉGIMEN ESTABLE: no existe con un 100% de repetición en algún año."]
+        
+        rooms = chain.rooms_per_year()
+        lines = [f"🔮 RÉGIMEN ESTABLE (cálculo analítico, sin simular):"]
+        for i in range(chain.total_years):
+            lines.append(f"   Año {i+1}: {int(chain.equilibrium[i]):>4} estudiantes → {rooms[i]:>2} sala{'s' if rooms[i] > 1 else ''}")
+        lines.append(f"   Matrícula límite: {int(chain.equilibrium_total)} estudiantes en {sum(rooms)} salas simultáneas")
+        lines.append(f"   Graduados por año: {chain.graduates_per_year:.1f} | Abandonos por año: {chain.dropouts_per_year:.1f}")
+        lines.append(f"🎓 PROBABILIDAD DE GRADUACIÓN: {chain.graduation_probability * 100:.1f}% de quienes ingresan")
+        if chain.graduation_probability > 0:
+            lines.append(f"⏱ TIEMPO ESPERADO HASTA EL TÍTULO: {chain.expected_time_to_degree:.2f} años (duración nominal {chain.total_years})")
+        lines.append(f"🔄 REPETICIONES ESPERADAS: {chain.expected_repetitions:.2f} por estudiante "
+                     f"({chain.expected_years_enrolled:.2f} años de permanencia media)")
+        lines.append("")
+        lines.extend(self.stochastic_recommendations())
+        return lines
+        
+    def sensitivity_section(self):
+        if self.chain is None:
+            return []
+        # Derivadas exactas en una sola pasada (sin simulaciones perturbadas)
+        sensitivity = Sensitivity(self.params)
+        lines = ["",
+                 "🌪 SENSIBILIDAD (% de cambio por cada 1% de cambio en el parámetro; cada tasa se varía sola):"]
+        # La demanda pico de salas la fija el año de estudio más numeroso
+        peak, _ = sensitivity.output('peak_year')
+        peak_year = int(np.argmax(self.chain.equilibrium))
+        peak_title = (f"Año más numeroso en régimen estable ({year_ordinal(peak_year)} año: {int(peak)} estudiantes, "
+                      f"{math.ceil(peak / ROOM_CAPACITY)} salas)")
+        for name, title in (('students', "Matrícula total en régimen estable"),
+                            ('peak_year', peak_title),
+                            ('graduates', "Graduados por año en régimen estable")):
+            lines.append(f"   {title}:")
+            lines.extend(tornado(sensitivity, name))
+        lines.append("")
+        return lines
+        
+    def campus_recommendations(self):
+        rooms = self.campus.steady_rooms_per_year()
+        lines = [f"🔮 RÉGIMEN ESTABLE DEL CAMPUS ({len(self.campus.names)} carreras, salas sumadas por año):"]
+        for i, count in enumerate(rooms):
+            lines.append(f"   Año {i+1}: {count:>3} sala{'s' if count != 1 else ''}")
+        lines.append(f"   Salas simultáneas: {rooms.sum()}")
+        return lines
+        
+    def stochastic_recommendations(self):
+        if self.stochastic_replications is None:
+            return []
+        result = self.stochastic
+        if result is None:
+            return ["🎲 DIMENSIONAMIENTO ESTOCÁSTICO: requiere porcentajes entre 0% y 100%."]
+        
+        last = self.stochastic_horizon - 1
+        p50, p95 = result.band(50), result.band(95)
+        lines = [f"🎲 DIMENSIONAMIENTO ESTOCÁSTICO ({self.stochastic_replications} réplicas, año {self.stochastic_horizon}):"]
+        for i in range(self.params['total_years']):
+            lines.append(f"   Año {i+1}: {int(result.enrollment[last, p50, i]):>4} estudiantes (p95: {int(result.enrollment[last, p95, i]):>4})"
+                         f" → {int(result.rooms[last, p95, i]):>2} salas al p95")
+        lines.append(f"   Salas simultáneas: {int(result.total_rooms[last, p50])} en la mediana, "
+                     f"{int(result.total_rooms[last, p95])} para cubrir el 95% de los casos")
+        return lines
         
-        # Análisis de repetidores
-        total_repeaters = sum(self.repeaters_per_year)
-        if total_repeaters > 0:
-            repeater_rate = (total_repeaters / self.total_enrolled) * 100
-            recommendations.append(f"🔄 TASA DE REPETICIÓN: {repeater_rate:.1f}% ({int(total_repeaters)} estudiantes repitiendo)")
-            
-            if repeater_rate > 20:
-                recommendations.append(f"🚨 ALTA REPETICIÓN: Implementar programas de apoyo académico y tutorías")
-        
-        # Análisis de deserción
-        if self.total_enrolled + self.total_dropped > 0:
-            retention_rate = (self.total_enrolled / (self.total_enrolled + self.total_dropped)) * 100
-            if retention_rate < 60:
-                recommendations.append(f"🚨 CRÍTICO: Tasa de retención del {retention_rate:.1f}%. Se requieren programas de apoyo estudiantil urgentes.")
-            elif retention_rate < 75:
-                recommendations.append(f"⚠️ ATENCIÓN: Tasa de retención del {retention_rate:.1f}%. Considere implementar tutorías y seguimiento.")
-            else:
-                recommendations.append(f"✅ BUENO: Tasa de retención del {retention_rate:.1f}%. El sistema mantiene a la mayoría de estudiantes.")
-        
-        # Proyección de graduados
-        if self.year >= self.params['total_years']:
-            grad_rate = (self.total_graduated / (self.params['x'] * (self.year - self.params['total_years'] + 1))) * 100
-            if grad_rate > 50:
-                recommendations.append(f"🎓 EXCELENTE: Tasa de graduación del {grad_rate:.1f}%. El sistema es efectivo.")
-            else:
-                recommendations.append(f"📉 MEJORABLE: Tasa de graduación del {grad_rate:.1f}%. Revisar factores que impiden la graduación.")
-        
-        # Tendencia de crecimiento
-        if len(self.history['total']) > 5:
-            recent_avg = sum(self.history['total'][-5:]) / 5
-            old_avg = sum(self.history['total'][-10:-5]) / 5 if len(self.history['total']) >= 10 else recent_avg
-            
-            if recent_avg > old_avg * 1.1:
-                recommendations.append(f"📈 CRECIMIENTO: La matrícula está aumentando. Planificar expansión de infraestructura.")
-            elif recent_avg < old_avg * 0.9:
-                recommendations.append(f"📉 DECRECIMIENTO: La matrícula está disminuyendo. Investigar causas y tomar medidas.")
-
-        for rec in recommendations:
-            self.analysis_text.insert(tk.END, rec + "\n")
-            
-    def update_display(self):
+    def update_header(self):
         self.year_label.config(text=f"Año Académico: {self.year}")
         
-        # Estadísticas generales
+    def update_general_stats(self):
         self.enrolled_value.config(text=str(int(self.total_enrolled)))
         self.graduated_value.config(text=str(int(self.total_graduated)))
         self.dropped_value.config(text=str(int(self.total_dropped)))
@@ -892,67 +1482,355 @@ class StudentFlowSimulator:
         else:
             self.retention_value.config(text="0%")
         
-        # Estadísticas por año
+    def update_year_stats(self):
         for i in range(min(self.params['total_years'], len(self.year_cards))):
             self.year_cards[i].config(text=str(int(self.students_per_year[i])))
             self.repeater_cards[i].config(text=str(int(self.repeaters_per_year[i])))
             self.new_student_cards[i].config(text=str(int(self.new_students_per_year[i])))
         
-        self.check_alerts()
-        self.update_flow_diagram()
-        self.update_evolution_graph()
-        self.update_pie_chart()
-        self.update_analysis()
+    def update_display(self):
+        # Marca todo como sucio; el planificador pinta en el próximo cuadro
+        self.scheduler.invalidate('state', 'params', 'history')
         
     def toggle_simulation(self):
         self.is_running = not self.is_running
         
         if self.is_running:
             self.play_button.config(text="⏸ Pausar", bg="#f59e0b")
-            self.run_simulation()
+            # Durante un salto la reproducción empieza cuando termina
+            if self.worker is None or self.worker.target is None:
+                self.start_worker()
         else:
             self.play_button.config(text="▶ Iniciar Simulación", bg="#10b981")
+            self.stop_worker()
             
-    def run_simulation(self):
-        if self.is_running:
-            self.simulate_year()
-            self.update_display()
-            self.root.after(self.animation_speed, self.run_simulation)
+    def set_animation_speed(self, value):
+        self.animation_speed = int(value)
+        if self.worker is not None:
+            self.worker.interval = self.animation_speed / 1000
             
+    def start_worker(self, target=None):
+        # El motor avanza en otro hilo; la interfaz sólo lee sus instantáneas
+        self.stop_worker()
+        self.worker = SimulationWorker(self.engine, self.animation_speed / 1000, self.scheduler.frame_ms / 1000,
+                                       target=target, profiler=self.profiler)
+        worker = self.worker
+        worker.start()
+        self.snapshot = worker.latest()
+        self.root.after(self.scheduler.frame_ms, lambda: self.poll_worker(worker))
+        
+    def stop_worker(self):
+        """Detiene el hilo de simulación; devuelve si estaba corriendo"""
+        worker, self.worker = self.worker, None
+        if worker is None:
+            return False
+        worker.stop()
+        self.snapshot = None
+        self.update_display()
+        return True
+        
+    def poll_worker(self, worker):
+        if self.worker is not worker:
+            return
+        # Sólo la instantánea más reciente: las intermedias se descartan
+        snapshot = worker.latest()
+        if snapshot is not None:
+            self.snapshot = snapshot
+            self.scheduler.invalidate('state', 'history')
+        if worker.running:
+            self.root.after(self.scheduler.frame_ms, lambda: self.poll_worker(worker))
+            return
+        
+        # Terminó un salto (o falló un paso): el motor vuelve a la interfaz
+        self.stop_worker()
+        if worker.error is not None:
+            self.is_running = False
+            self.play_button.config(text="▶ Iniciar Simulación", bg="#10b981")
+            messagebox.showerror("Error", f"La simulación se detuvo: {worker.error}")
+        elif self.is_running:
+            self.start_worker()
+            
+    def jump_button_click(self):
+        try:
+            target = int(self.jump_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Por favor ingrese un año válido")
+            return
+            
+        if target <= self.year:
+            messagebox.showwarning("Advertencia", 
+                f"La simulación ya está en el año {self.year}")
+            return
+            
+        # Sólo se simulan los años que muestra el gráfico de evolución; el salto corre en el
+        # hilo de simulación y, si se estaba reproduciendo, la reproducción sigue después
+        self.start_worker(target)
+        
     def reset_button_click(self):
         self.is_running = False
         self.play_button.config(text="▶ Iniciar Simulación", bg="#10b981")
+        self.stop_worker()
         
-        # Actualizar parámetros desde entradas
+        # Leer y validar las entradas aparte: self.params es el diccionario del motor y sólo
+        # se actualiza cuando todo es válido (la vista de campus no tiene parámetros propios)
+        params = dict(self.params)
         try:
-            for key, entry in self.config_entries.items():
+            for key, entry in ({} if self.campus_aggregate else self.config_entries).items():
                 value = entry.get()
-                self.params[key] = float(value) if '.' in value else int(value)
-            
-            # Validar porcentajes
-            if abs((self.params['a1'] + self.params['b1'] + self.params['c1']) - 100) > 0.1:
-                messagebox.showwarning("Advertencia", 
-                    "Los porcentajes del primer año (a1+b1+c1) deben sumar 100%")
+                params[key] = float(value) if '.' in value else int(value)
             
-            if abs((self.params['ai'] + self.params['bi'] + self.params['ci']) - 100) > 0.1:
-                messagebox.showwarning("Advertencia", 
-                    "Los porcentajes de años siguientes (ai+bi+ci) deben sumar 100%")
-                
+            # La duración de la carrera define cuántas columnas y tarjetas hay
+            if params['total_years'] != int(params['total_years']) or params['total_years'] < 1:
+                raise ValueError
+            params['total_years'] = int(params['total_years'])
+            replications = int(self.replications_entry.get())
+            if replications < 1:
+                raise ValueError
         except ValueError:
             messagebox.showerror("Error", "Por favor ingrese valores numéricos válidos")
             return
             
+        # Validar porcentajes
+        if abs((params['a1'] + params['b1'] + params['c1']) - 100) > 0.1:
+            messagebox.showwarning("Advertencia", 
+                "Los porcentajes del primer año (a1+b1+c1) deben sumar 100%")
+        
+        if abs((params['ai'] + params['bi'] + params['ci']) - 100) > 0.1:
+            messagebox.showwarning("Advertencia", 
+                "Los porcentajes de años siguientes (ai+bi+ci) deben sumar 100%")
+        
+        self.params.update(params)
+        self.stochastic_replications = replications if self.stochastic_var.get() else None
+        if self.campus is None:
+            self.engine.agents = self.agents_var.get()
+            self.engine.schedule = self.schedule
         self.reset_simulation()
         
         # Limpiar historial
-        self.history_text.delete(1.0, tk.END)
-        header = f"{'Año':>4} | {'1er':>5} | {'2do':>5} | {'3er':>5} | {'4to':>5} | {'5to':>5} | {'Grad':>6} | {'Desert':>7} | {'Total':>6} | {'Rep1':>5} | {'Rep2':>5} | {'Rep3':>5} | {'Rep4':>5} | {'Rep5':>5}\n"
-        header += "-" * 120 + "\n"
-        self.history_text.insert(tk.END, header)
+        self.history_table.set_columns(self.history_columns())
         
         # Recrear cards si cambia duración de carrera
+        if len(self.year_cards) != self.params['total_years']:
+            self.rebuild_year_stats()
+        self.update_display()
+        
+    def compared_scenarios(self):
+        return [name for name, var in self.compare_vars.items() if var.get()]
+        
+    def save_scenario_click(self):
+        if self.campus_aggregate:
+            messagebox.showwarning("Advertencia", "Seleccione una carrera para guardarla como escenario")
+            return
+        name = simpledialog.askstring("Guardar escenario", "Nombre del escenario:",
+                                      initialvalue=f"Escenario {len(self.workspace) + 1}", parent=self.root)
+        if not name:
+            return
+        
+        # Se guardan los parámetros aplicados (los del último reinicio), no los de las entradas
+        self.workspace.add(name, self.params, getattr(self.engine, 'schedule', None))
+        if name not in self.compare_vars:
+            var = tk.BooleanVar(value=True)
+            check = tk.Checkbutton(self.scenario_checks, text=name, variable=var, bg="white", fg="#475569",
+                                   activebackground="white", font=("Arial", 9, "bold"),
+                                   command=lambda: self.scheduler.invalidate('scenarios'))
+            check.pack(side=tk.LEFT, padx=(0, 8))
+            check.bind("<Button-3>", lambda e: self.remove_scenario(name, check))
+            self.compare_vars[name] = var
+        self.scheduler.invalidate('scenarios')
+        
+    def remove_scenario(self, name, check):
+        if messagebox.askyesno("Eliminar escenario", f"¿Eliminar el escenario '{name}'?"):
+            check.destroy()
+            del self.compare_vars[name]
+            self.workspace.remove(name)
+            self.scheduler.invalidate('scenarios')
+            
+    def load_schedule_click(self):
+        path = filedialog.askopenfilename(title="Cargar cronograma",
+                                          filetypes=[("CSV o JSON", "*.csv *.json"), ("Todos", "*.*")])
+        if not path:
+            return
+        try:
+            schedule = load_schedule(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"No se pudo cargar el cronograma: {e}")
+            return
+        self.set_schedule(schedule, path)
+        
+    def set_schedule(self, schedule, path):
+        self.schedule = schedule
+        if schedule is None:
+            self.schedule_label.config(text="Parámetros constantes (se aplica al reiniciar)")
+        else:
+            self.schedule_label.config(text=f"{os.path.basename(path)}: {len(schedule)} cambios (se aplica al reiniciar)")
+        
+    def load_inventory_click(self):
+        path = filedialog.askopenfilename(title="Cargar inventario de salas",
+                                          filetypes=[("JSON o CSV", "*.json *.csv"), ("Todos", "*.*")])
+        if not path:
+            return
+        try:
+            inventory = load_inventory(path)
+        except (OSError, KeyError, ValueError) as e:
+            messagebox.showerror("Error", f"No se pudo cargar el inventario: {e}")
+            return
+        self.set_inventory(inventory, path)
+        
+    def set_inventory(self, inventory, path):
+        running = self.stop_worker()
+        self.allocator = RoomAllocator(inventory) if inventory is not None else None
+        self.allocations = {}
+        if inventory is None:
+            self.inventory_label.config(text=f"Salas genéricas de {ROOM_CAPACITY} estudiantes")
+        else:
+            self.inventory_label.config(text=f"{os.path.basename(path)}: {len(inventory)} tipos de sala, "
+                                             f"{inventory.slots} bloques")
+        self.scheduler.invalidate('params')
+        if running and self.is_running:
+            self.start_worker()
+        
+    def calibrate_click(self):
+        if self.campus_aggregate:
+            messagebox.showwarning("Advertencia", "Elija una carrera para calibrar sus tasas")
+            return
+        path = filedialog.askopenfilename(title="Datos observados",
+                                          filetypes=[("CSV o JSON", "*.csv *.json"), ("Todos", "*.*")])
+        if not path:
+            return
+        try:
+            observed = load_observed(path)
+            x = float(self.config_entries['x'].get())
+        except (OSError, KeyError, ValueError) as e:
+            messagebox.showerror("Error", f"No se pudieron leer los datos observados: {e}")
+            return
+        try:
+            result = calibrate(observed, {'x': x})
+        except (ValueError, FloatingPointError) as e:
+            # np.linalg.LinAlgError es un ValueError
+            messagebox.showerror("Error", f"No se pudo calibrar con estos datos: {e}")
+            return
+        
+        # Las tasas ajustadas quedan en las entradas; se aplican al reiniciar
+        fitted = {key: round(result.params[key], 2) for key in RATE_KEYS}
+        fitted['total_years'] = observed.total_years
+        for key, value in fitted.items():
+            entry = self.config_entries[key]
+            entry.delete(0, tk.END)
+            entry.insert(0, str(value))
+        summary = "\n".join(f"{key} = {fitted[key]:.2f}%" for key in RATE_KEYS)
+        messagebox.showinfo("Calibración",
+                            f"{len(observed)} años observados, {observed.total_years} años de carrera\n\n{summary}\n\n"
+                            f"Error cuadrático medio: {result.rmse:.2f} estudiantes\n"
+                            "Presione Reiniciar para simular con estas tasas.")
+        
+    def load_programs_click(self):
+        path = filedialog.askopenfilename(title="Cargar carreras", filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            campus = CampusEngine(load_programs(path))
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"No se pudieron cargar las carreras: {e}")
+            return
+        
+        self.campus = campus
+        self.view_combo.config(values=["🏫 Campus (todas las carreras)"] + campus.names)
+        self.view_combo.current(0)
+        self.view_frame.pack(anchor=tk.W, pady=(5, 0))
+        self.set_view(0)
+        
+    def set_view(self, index):
+        # 0 es el campus completo; las carreras siguen avanzando juntas en cualquier vista
+        self.engine = self.campus.view(None if index == 0 else self.campus.names[index - 1])
+        self.engine_changed()
+        
+    def engine_changed(self):
+        # Otro motor (vista de campus o punto de control): entradas, columnas y tarjetas nuevas
+        running = self.stop_worker()
+        self.graph_view = None
+        for key, entry in self.config_entries.items():
+            entry.config(state=tk.NORMAL)
+            entry.delete(0, tk.END)
+            entry.insert(0, str(self.params[key]))
+            if self.campus_aggregate:
+                entry.config(state=tk.DISABLED)
+        
+        self.update_chain()
+        self.watch_engine()
+        self.history_table.set_columns(self.history_columns())
+        if len(self.year_cards) != self.params['total_years']:
+            self.rebuild_year_stats()
         self.update_display()
+        if running and self.is_running:
+            self.start_worker()
+        
+    def save_checkpoint_click(self):
+        if self.campus is not None:
+            messagebox.showwarning("Advertencia", "Los puntos de control guardan una sola carrera")
+            return
+        path = filedialog.asksaveasfilename(title="Guardar estado", defaultextension=".ckpt",
+                                            filetypes=[("Punto de control", "*.ckpt")])
+        if not path:
+            return
+        # El motor no puede cambiar mientras se escribe
+        running = self.stop_worker()
+        try:
+            save_checkpoint(self.engine, path)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo guardar el estado: {e}")
+        if running and self.is_running:
+            self.start_worker()
+            
+    def load_checkpoint_click(self):
+        path = filedialog.askopenfilename(title="Abrir estado", filetypes=[("Punto de control", "*.ckpt")])
+        if not path:
+            return
+        try:
+            engine = load_checkpoint(path)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Error", f"No se pudo abrir el estado: {e}")
+            return
         
+        self.is_running = False
+        self.play_button.config(text="▶ Iniciar Simulación", bg="#10b981")
+        self.campus = None
+        self.view_frame.pack_forget()
+        self.engine = engine
+        self.agents_var.set(engine.agents)
+        self.set_schedule(engine.schedule, "cronograma del punto de control")
+        self.engine_changed()
+        
+    def toggle_profiler(self):
+        self.profiler.enabled = not self.profiler.enabled
+        if self.profiler.enabled:
+            self.profiler.reset()
+            self.profiler_button.config(text="⏱ Ocultar perfil", bg="#a7f3d0")
+            self.profiler_export_button.pack(side=tk.LEFT, padx=(5, 0))
+            self.profiler_label.pack(anchor=tk.W, pady=(5, 0))
+            self.refresh_profiler_overlay()
+        else:
+            self.profiler_button.config(text="⏱ Perfil", bg="#e2e8f0")
+            self.profiler_export_button.pack_forget()
+            self.profiler_label.pack_forget()
+            if self.profiler_after is not None:
+                self.root.after_cancel(self.profiler_after)
+                self.profiler_after = None
+                
+    def refresh_profiler_overlay(self):
+        # Se refresca con su propio temporizador para no medirse a sí mismo
+        self.profiler_label.config(text=self.profiler.summary())
+        self.profiler_after = self.root.after(500, self.refresh_profiler_overlay)
+        
+    def export_profile(self):
+        path = filedialog.asksaveasfilename(title="Exportar perfil", defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            self.profiler.export(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo exportar el perfil: {e}")
+            
     def toggle_config(self):
         if self.show_config:
             self.config_frame.pack_forget()
@@ -964,6 +1842,11 @@ class StudentFlowSimulator:
             self.show_config = True
 
 def main():
+    # Con argumentos se proyecta por lotes, sin abrir la ventana
+    if len(sys.argv) > 1:
+        batch.main()
+        return
+    
     root = tk.Tk()
     app = StudentFlowSimulator(root)
     root.mainloop()
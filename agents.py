@@ -0,0 +1,154 @@
+"""Modo por estudiante: cada alumno es una fila de arreglos NumPy compactos."""
+
+import numpy as np
+
+from transition import year_rates
+
+ENROLLED, GRADUATED, DROPPED = 0, 1, 2
+MAX_REPEATS = np.iinfo(np.int8).max
+
+
+def wrap_year(year):
+    """Año como int16 (módulo 2^16), el tipo de la columna de cohortes"""
+    return np.array(year).astype(np.int16)
+
+
+class StudentAgents:
+    """Población de estudiantes como estructura de arreglos, una fila por alumno.
+
+    Columnas: año de estudio (int8), veces que repitió (int8), cohorte de
+    ingreso (int16, módulo 2^16) y estado (int8). Cada año es una única
+    actualización vectorizada sobre los matriculados. Quienes egresan o
+    abandonan se resumen en histogramas y sus filas se reutilizan al compactar,
+    así que la memoria depende de la matrícula activa y no del total de
+    estudiantes simulados.
+    """
+
+    def __init__(self, params, seed=None, capacity=1024):
+        rates = np.array(year_rates(params))
+        self.total_years = len(rates)
+        if self.total_years > np.iinfo(np.int8).max:
+            raise ValueError("El modo por estudiante admite carreras de hasta 127 años")
+        self.intake = int(round(params['x']))
+        self.set_rates(rates)
+        self.seed = seed
+        self.capacity = capacity
+        self.reset()
+
+    def set_rates(self, rates):
+        """Tasas (pasa, repite, abandona) por año de estudio; cambian con los cronogramas"""
+        rates = np.asarray(rates)
+        self.pass_rates = rates[:, 0]
+        # Un único sorteo uniforme por alumno: < pasa aprueba, < pasa + repite repite
+        self.stay_rates = rates[:, 0] + rates[:, 1]
+
+    def reset(self):
+        self.rng = np.random.default_rng(self.seed)
+        self.year = 0
+        self.size = 0
+        self.exited = 0
+        self.study_year = np.zeros(self.capacity, dtype=np.int8)
+        self.repeats = np.zeros(self.capacity, dtype=np.int8)
+        self.cohort = np.zeros(self.capacity, dtype=np.int16)
+        self.status = np.full(self.capacity, DROPPED, dtype=np.int8)
+
+        self.graduated = 0
+        self.dropped = 0
+        self.repeaters_per_year = np.zeros(self.total_years, dtype=np.int64)
+        self.time_to_degree = np.zeros(self.total_years + 1, dtype=np.int64)
+        self.repeats_at_exit = {GRADUATED: np.zeros(MAX_REPEATS + 1, dtype=np.int64),
+                                DROPPED: np.zeros(MAX_REPEATS + 1, dtype=np.int64)}
+
+    def columns(self):
+        return (self.study_year, self.repeats, self.cohort, self.status)
+
+    def active(self):
+        """Índices de los alumnos matriculados"""
+        return np.flatnonzero(self.status[:self.size] == ENROLLED)
+
+    def _reserve(self, count):
+        """Compacta o agranda los arreglos para que quepan count alumnos más"""
+        if self.exited > self.size // 2:
+            keep = self.status[:self.size] == ENROLLED
+            kept = int(keep.sum())
+            for column in self.columns():
+                column[:kept] = column[:self.size][keep]
+            self.status[kept:self.size] = DROPPED
+            self.size = kept
+            self.exited = 0
+        if self.size + count > len(self.status):
+            capacity = max(2 * len(self.status), self.size + count)
+            for name in ('study_year', 'repeats', 'cohort', 'status'):
+                old = getattr(self, name)
+                grown = np.full(capacity, DROPPED if name == 'status' else 0, dtype=old.dtype)
+                grown[:self.size] = old[:self.size]
+                setattr(self, name, grown)
+
+    def _record_exits(self, rows, status):
+        self.status[rows] = status
+        self.exited += len(rows)
+        self.repeats_at_exit[status] += np.bincount(self.repeats[rows], minlength=MAX_REPEATS + 1)
+
+    def step(self):
+        """Avanza un año: cada matriculado aprueba, repite o abandona según su año de estudio"""
+        rows = self.active()
+        years = self.study_year[rows]
+        draws = self.rng.random(len(rows))
+        passed = draws < self.pass_rates[years]
+        repeated = ~passed & (draws < self.stay_rates[years])
+        dropped = ~(passed | repeated)
+
+        self.repeaters_per_year = np.bincount(years[repeated], minlength=self.total_years)
+        repeaters = rows[repeated]
+        self.repeats[repeaters] += self.repeats[repeaters] < MAX_REPEATS
+
+        promoted = rows[passed]
+        next_year = years[passed] + 1
+        finishing = next_year >= self.total_years
+        self.study_year[promoted[~finishing]] = next_year[~finishing]
+
+        graduates = promoted[finishing]
+        # Años cursados contando el actual; la resta en int16 tolera el desborde de la cohorte
+        enrolled_years = (wrap_year(self.year) - self.cohort[graduates]).astype(np.int64) + 1
+        counts = np.bincount(enrolled_years, minlength=len(self.time_to_degree))
+        if len(counts) > len(self.time_to_degree):
+            counts[:len(self.time_to_degree)] += self.time_to_degree
+            self.time_to_degree = counts
+        else:
+            self.time_to_degree += counts
+        self._record_exits(graduates, GRADUATED)
+        self._record_exits(rows[dropped], DROPPED)
+        self.graduated += len(graduates)
+        self.dropped += int(dropped.sum())
+        self.year += 1
+
+        # Ingresos del año
+        self._reserve(self.intake)
+        new = slice(self.size, self.size + self.intake)
+        self.study_year[new] = 0
+        self.repeats[new] = 0
+        self.cohort[new] = wrap_year(self.year)
+        self.status[new] = ENROLLED
+        self.size += self.intake
+
+    def run(self, years):
+        for _ in range(years):
+            self.step()
+
+    def students_per_year(self):
+        return np.bincount(self.study_year[self.active()], minlength=self.total_years)
+
+    def enrolled_repeat_counts(self):
+        """Matriculados según cuántas veces repitieron (índice = repeticiones)"""
+        return np.bincount(self.repeats[self.active()], minlength=1)
+
+    def time_to_degree_percentile(self, p):
+        """Años hasta el título del percentil p entre los graduados (None si aún no hay)"""
+        if self.graduated == 0:
+            return None
+        cumulative = np.cumsum(self.time_to_degree)
+        return int(np.searchsorted(cumulative, p / 100 * cumulative[-1]))
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns())
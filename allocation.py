@@ -0,0 +1,229 @@
+"""Asignación de salas con un inventario heterogéneo (aulas magnas, laboratorios, seminarios).
+
+Cada año de estudio se dicta en un bloque horario y, dentro de él, se divide
+en secciones que ocupan salas de distintos tipos. Se busca el menor costo
+total sin usar en un bloque más salas de cada tipo que las disponibles.
+
+Ejemplo:
+    python allocation.py inventario.json --horizon 20 --x 150
+
+inventario.json:
+    {"slots": 3, "rooms": [{"name": "Aula magna", "capacity": 120, "count": 2, "cost": 5},
+                           {"name": "Laboratorio", "capacity": 24, "count": 6, "cost": 3},
+                           {"name": "Seminario", "capacity": 40, "count": 8, "cost": 2}]}
+También se acepta un CSV con las columnas name,capacity,count,cost (un bloque horario).
+"""
+
+import argparse
+import csv
+import json
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from flow_engine import DEFAULT_PARAMS, FlowEngine
+
+# Coberturas (estudiantes, salas libres) guardadas por asignador; se descartan las menos usadas
+COVER_CACHE_SIZE = 4096
+
+
+class RoomType:
+    def __init__(self, name, capacity, count, cost=1.0):
+        self.name = name
+        self.capacity = int(capacity)
+        self.count = int(count)
+        self.cost = float(cost)
+        if self.capacity < 1 or self.count < 0:
+            raise ValueError(f"Sala inválida: {name} (capacidad {capacity}, cantidad {count})")
+
+
+class Inventory:
+    """Tipos de sala y cantidad de bloques horarios; cada sala aloja una sección por bloque"""
+
+    def __init__(self, room_types, slots=1):
+        if not room_types:
+            raise ValueError("El inventario no tiene salas")
+        self.room_types = list(room_types)
+        self.slots = int(slots)
+        if self.slots < 1:
+            raise ValueError("Se necesita al menos un bloque horario")
+        self.capacities = np.array([room.capacity for room in self.room_types])
+        self.counts = np.array([room.count for room in self.room_types])
+        self.costs = np.array([room.cost for room in self.room_types])
+
+    def __len__(self):
+        return len(self.room_types)
+
+    @property
+    def seats_per_slot(self):
+        return int(self.capacities @ self.counts)
+
+
+def load_inventory(path, slots=None):
+    """Lee el inventario desde JSON ({"slots", "rooms"}) o CSV (name,capacity,count,cost)"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".json"):
+            data = json.load(f)
+            rooms, file_slots = data['rooms'], data.get('slots', 1)
+        else:
+            rooms, file_slots = list(csv.DictReader(f)), 1
+    return Inventory([RoomType(room['name'], room['capacity'], room['count'], room.get('cost', 1))
+                      for room in rooms], slots or file_slots)
+
+
+def cover(students, capacities, costs, available):
+    """Menor costo para sentar a `students` con a lo sumo available[k] salas de cada tipo.
+
+    Programación dinámica de cobertura acotada sobre los asientos (cada
+    cantidad disponible se descompone en potencias de dos), vectorizada por
+    tipo de sala. Devuelve (costo, salas por tipo) o None si no alcanza.
+    """
+    if students <= 0:
+        return 0.0, np.zeros(len(capacities), dtype=int)
+    # best[s]: menor costo para cubrir al menos s asientos
+    best = np.full(students + 1, np.inf)
+    best[0] = 0.0
+    pieces, taken = [], []
+    for k, (capacity, cost, count) in enumerate(zip(capacities, costs, available)):
+        size = 1
+        while count > 0:
+            units = min(size, count)
+            count -= units
+            size *= 2
+            seats = units * capacity
+            shifted = best[np.maximum(np.arange(students + 1) - seats, 0)] + units * cost
+            take = shifted < best
+            best = np.where(take, shifted, best)
+            pieces.append((k, units, seats))
+            taken.append(take)
+    if not np.isfinite(best[students]):
+        return None
+
+    rooms = np.zeros(len(capacities), dtype=int)
+    s = students
+    for (k, units, seats), take in zip(reversed(pieces), reversed(taken)):
+        if take[s]:
+            rooms[k] += units
+            s = max(s - seats, 0)
+    return float(best[students]), rooms
+
+
+class Allocation:
+    """Resultado de un año: bloque y salas por tipo de cada año de estudio"""
+
+    def __init__(self, inventory, students, slots, rooms, unseated):
+        self.inventory = inventory
+        self.students = list(students)
+        self.slots = slots
+        self.rooms = rooms
+        self.unseated = unseated
+
+    @property
+    def cost(self):
+        return float(sum(rooms @ self.inventory.costs for rooms in self.rooms))
+
+    @property
+    def sections(self):
+        return int(sum(rooms.sum() for rooms in self.rooms))
+
+    @property
+    def feasible(self):
+        return not any(self.unseated)
+
+    def describe(self, index):
+        """Texto de las salas de un año de estudio, p. ej. '1 Aula magna + 2 Seminario'"""
+        parts = [f"{n} {room.name}" for n, room in zip(self.rooms[index], self.inventory.room_types) if n]
+        return " + ".join(parts) if parts else "sin salas"
+
+
+class RoomAllocator:
+    """Resuelve la asignación año a año partiendo de la solución del año anterior.
+
+    Cada año de estudio conserva su bloque horario mientras siga cabiendo, y
+    la cobertura óptima de cada (estudiantes, salas libres) se guarda en
+    caché: con matrículas que cambian poco, la mayoría de los años se
+    resuelven sin recalcular nada.
+    """
+
+    def __init__(self, inventory):
+        self.inventory = inventory
+        self.previous_slots = {}
+        self._covers = OrderedDict()
+
+    def _cover(self, students, available):
+        key = (students, tuple(available))
+        covers = self._covers
+        if key in covers:
+            covers.move_to_end(key)
+            return covers[key]
+        solution = covers[key] = cover(students, self.inventory.capacities, self.inventory.costs, available)
+        # Con crecimiento sostenido casi todas las claves son nuevas: la caché no debe crecer sin límite
+        if len(covers) > COVER_CACHE_SIZE:
+            covers.popitem(last=False)
+        return solution
+
+    def solve(self, students_per_year):
+        inventory = self.inventory
+        demand = [int(math.ceil(s - 1e-9)) for s in students_per_year]
+        free = [inventory.counts.copy() for _ in range(inventory.slots)]
+        slots = [None] * len(demand)
+        rooms = [np.zeros(len(inventory), dtype=int) for _ in demand]
+        unseated = [0] * len(demand)
+
+        # Los años más numerosos primero; cada uno prueba antes su bloque anterior
+        for i in sorted(range(len(demand)), key=lambda i: -demand[i]):
+            previous = self.previous_slots.get(i)
+            order = sorted(range(inventory.slots),
+                           key=lambda slot: (slot != previous, -int(free[slot] @ inventory.capacities)))
+            best = None
+            for slot in order:
+                solution = self._cover(demand[i], free[slot])
+                if solution is not None and (best is None or solution[0] < best[1][0]):
+                    best = (slot, solution)
+                    if slot == previous:
+                        break
+            if best is None:
+                # No cabe en ningún bloque: se usa el más libre y se informa el faltante
+                slot = max(range(inventory.slots), key=lambda s: int(free[s] @ inventory.capacities))
+                used = free[slot].copy()
+                unseated[i] = demand[i] - int(used @ inventory.capacities)
+                best = (slot, (float(used @ inventory.costs), used))
+            slot, (_, chosen) = best
+            free[slot] = free[slot] - chosen
+            slots[i], rooms[i] = slot, chosen
+
+        self.previous_slots = dict(enumerate(slots))
+        return Allocation(inventory, students_per_year, slots, rooms, unseated)
+
+    def plan(self, projection):
+        """Asignación de cada año de una proyección (filas = años, columnas = años de estudio)"""
+        return [self.solve(students) for students in projection]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Asignación de salas sobre una proyección de matrícula")
+    parser.add_argument("inventory", help="inventario de salas (JSON o CSV)")
+    parser.add_argument("--slots", type=int, default=None, help="bloques horarios (sobrescribe el archivo)")
+    parser.add_argument("--horizon", type=int, default=20, help="años proyectados")
+    for key in DEFAULT_PARAMS:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, default=DEFAULT_PARAMS[key],
+                            type=int if key == 'total_years' else float)
+    args = parser.parse_args(argv)
+
+    try:
+        inventory = load_inventory(args.inventory, args.slots)
+    except (OSError, KeyError, ValueError) as e:
+        parser.error(str(e))
+    engine = FlowEngine({key: getattr(args, key) for key in DEFAULT_PARAMS}, vectorized=True)
+    allocator = RoomAllocator(inventory)
+    print(f"{'Año':>4} | {'Matrícula':>9} | {'Secciones':>9} | {'Costo':>8} | {'Sin sala':>8}")
+    for _ in range(args.horizon):
+        engine.step()
+        allocation = allocator.solve(engine.students_per_year)
+        print(f"{engine.year:>4} | {engine.total_enrolled:>9.0f} | {allocation.sections:>9} | "
+              f"{allocation.cost:>8.1f} | {sum(allocation.unseated):>8}")
+
+
+if __name__ == "__main__":
+    main()
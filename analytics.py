@@ -0,0 +1,52 @@
+"""Análisis cerrado del flujo como cadena de Markov absorbente (graduado/abandono)."""
+
+import math
+
+import numpy as np
+
+from flow_engine import ROOM_CAPACITY
+from transition import build_matrix
+
+
+class AbsorbingChain:
+    """Indicadores límite calculados con la matriz fundamental N = (I - Q)^-1"""
+
+    def __init__(self, params):
+        matrix, intake = build_matrix(params)
+        total_years = int(params['total_years'])
+        self.total_years = total_years
+        self.intake = params['x']
+
+        # Q: transiciones entre años de estudio; R: hacia graduados y abandonos
+        transient = matrix[:total_years, :total_years]
+        absorbing = matrix[total_years:, :total_years]
+        self.repeat_rates = np.diagonal(transient).copy()
+        if np.any(self.repeat_rates >= 1):
+            raise ValueError("Con un 100% de repetición la cadena nunca se absorbe")
+
+        # N[j, i]: años esperados en el año j para un estudiante que está en el año i
+        self.fundamental = np.linalg.inv(np.eye(total_years) - transient)
+        absorption = absorbing @ self.fundamental
+        graduation_from = absorption[0]
+
+        # Régimen estable: s* = Q s* + x  =>  s* = N x
+        self.equilibrium = self.fundamental @ intake[:total_years]
+        self.equilibrium_total = float(self.equilibrium.sum())
+        self.graduates_per_year = float(matrix[total_years, total_years - 1] * self.equilibrium[-1])
+        self.dropouts_per_year = float(absorbing[1] @ self.equilibrium)
+
+        # Indicadores de un estudiante que ingresa a primer año
+        visits = self.fundamental[:, 0]
+        self.graduation_probability = float(graduation_from[0])
+        self.dropout_probability = float(absorption[1, 0])
+        self.expected_years_enrolled = float(visits.sum())
+        self.expected_repetitions = float(self.repeat_rates @ visits)
+        if self.graduation_probability > 0:
+            # Tiempo hasta el título condicionado a graduarse (transformada h de Doob)
+            self.expected_time_to_degree = float(visits @ graduation_from / graduation_from[0])
+        else:
+            self.expected_time_to_degree = math.inf
+
+    def rooms_per_year(self, capacity=ROOM_CAPACITY):
+        """Salas necesarias por año en régimen estable"""
+        return [math.ceil(s / capacity) for s in self.equilibrium]
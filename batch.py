@@ -0,0 +1,172 @@
+"""Modo por lotes: proyecta sin interfaz gráfica y emite una fila por año simulado.
+
+Ejemplos:
+    python batch.py --horizon 50 --format csv > proyeccion.csv
+    python batch.py --scenario escenario.json --horizon 200 --format jsonl -o proyeccion.jsonl
+    python batch.py --x 120 --c1 25 --b1 15 --horizon 30 --format parquet -o proyeccion.parquet
+    python batch.py --schedule cronograma.csv --horizon 40 --vectorized
+    python batch.py --horizon 1000000 --format csv -o /dev/null --checkpoint largo.ckpt
+    python batch.py --resume largo.ckpt --horizon 50 > continuacion.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+from checkpoint import load_checkpoint, save_checkpoint
+from flow_engine import DEFAULT_PARAMS, FlowEngine, history_keys
+from schedule import load_schedule
+
+BUFFER_SIZE = 1 << 16
+PARQUET_ROW_GROUP = 8192
+
+
+class CsvRowWriter:
+    def __init__(self, output, columns):
+        self.output = output
+        self.writer = csv.writer(output)
+        self.writer.writerow(columns)
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.output.flush()
+
+
+class JsonlRowWriter:
+    def __init__(self, output, columns):
+        self.output = output
+        self.columns = columns
+
+    def write(self, row):
+        self.output.write(json.dumps(dict(zip(self.columns, row))) + "\n")
+
+    def close(self):
+        self.output.flush()
+
+
+class ParquetRowWriter:
+    """Acumula filas en grupos y escribe cada grupo apenas se completa (requiere pyarrow)"""
+
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("El formato parquet requiere el paquete pyarrow")
+        self.pa = pa
+        self.columns = columns
+        self.schema = pa.schema([(name, pa.int64() if name == 'year' else pa.float64()) for name in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.pending = []
+
+    def write(self, row):
+        self.pending.append(row)
+        if len(self.pending) >= PARQUET_ROW_GROUP:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            data = list(zip(*self.pending))
+            arrays = [self.pa.array(values, field.type) for values, field in zip(data, self.schema)]
+            self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+            self.pending = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def load_scenario(path):
+    """Lee un escenario JSON con cualquier subconjunto de los parámetros"""
+    with open(path, encoding="utf-8") as f:
+        scenario = json.load(f)
+    unknown = set(scenario) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos en el escenario: {', '.join(sorted(unknown))}")
+    return scenario
+
+
+def open_writer(fmt, output, columns):
+    if fmt == "parquet":
+        if output == "-":
+            raise ValueError("El formato parquet necesita un archivo de salida (-o)")
+        return ParquetRowWriter(output, columns), None
+    stream = sys.stdout if output == "-" else open(output, "w", newline="", encoding="utf-8",
+                                                    buffering=BUFFER_SIZE)
+    writer_class = CsvRowWriter if fmt == "csv" else JsonlRowWriter
+    return writer_class(stream, columns), (None if output == "-" else stream)
+
+
+def exit_broken_pipe():
+    """El lector cerró stdout (p. ej. `| head`): se termina sin traza.
+
+    Python vacía stdout al salir; se redirige a /dev/null para que ese último
+    vaciado no vuelva a fallar.
+    """
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    sys.exit(1)
+
+
+def run_batch(params, horizon, writer, vectorized=False, agents=False, seed=None, schedule=None, engine=None):
+    """Simula horizon años escribiendo cada fila en cuanto el motor la produce.
+
+    Con engine se continúa una simulación ya empezada (por ejemplo, restaurada
+    de un punto de control) y se ignoran los demás argumentos del modelo.
+    """
+    if engine is None:
+        engine = FlowEngine(params, vectorized=vectorized, agents=agents, seed=seed, schedule=schedule)
+    engine.add_listener(lambda e: writer.write(e.current_row()))
+    engine.run(horizon)
+    return engine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Proyección por lotes del flujo de estudiantes (sin GUI)")
+    parser.add_argument("--scenario", help="archivo JSON con los parámetros")
+    parser.add_argument("--schedule", help="cronograma CSV o JSON de cambios de parámetros por año")
+    for key in DEFAULT_PARAMS:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key,
+                            type=int if key == 'total_years' else float,
+                            help=f"sobrescribe {key} (por defecto {DEFAULT_PARAMS[key]})")
+    parser.add_argument("--horizon", type=int, required=True, help="años a simular")
+    parser.add_argument("--format", choices=("csv", "jsonl", "parquet"), default="csv")
+    parser.add_argument("-o", "--output", default="-", help="archivo de salida ('-' para stdout)")
+    parser.add_argument("--vectorized", action="store_true", help="usa el modo matricial de NumPy")
+    parser.add_argument("--agents", action="store_true", help="simula cada estudiante individualmente")
+    parser.add_argument("--seed", type=int, default=None, help="semilla del modo por estudiante")
+    parser.add_argument("--resume", help="continúa desde un punto de control (parámetros y modo incluidos)")
+    parser.add_argument("--checkpoint", help="guarda un punto de control al terminar")
+    args = parser.parse_args(argv)
+
+    try:
+        params = dict(DEFAULT_PARAMS)
+        if args.scenario:
+            params.update(load_scenario(args.scenario))
+        params.update({key: getattr(args, key) for key in DEFAULT_PARAMS if getattr(args, key) is not None})
+        schedule = load_schedule(args.schedule) if args.schedule else None
+        engine = load_checkpoint(args.resume) if args.resume else None
+        if engine is not None:
+            params = engine.params
+        writer, stream = open_writer(args.format, args.output, history_keys(int(params['total_years'])))
+    except (OSError, ValueError, RuntimeError) as e:
+        parser.error(str(e))
+
+    try:
+        try:
+            engine = run_batch(params, args.horizon, writer, args.vectorized, args.agents, args.seed, schedule, engine)
+        finally:
+            writer.close()
+            if stream is not None:
+                stream.close()
+    except BrokenPipeError:
+        exit_broken_pipe()
+    if args.checkpoint:
+        save_checkpoint(engine, args.checkpoint)
+
+
+if __name__ == "__main__":
+    main()
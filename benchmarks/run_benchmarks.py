@@ -0,0 +1,190 @@
+"""Benchmarks del núcleo de simulación y del pintado de la interfaz.
+
+Ejemplos:
+    python benchmarks/run_benchmarks.py --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --only stepping memory --quick
+
+No hay una línea base en el repositorio: los tiempos dependen de la máquina.
+Para detectar regresiones, guarde una con --save en la misma máquina (y con
+los mismos --quick/--only) antes del cambio, y compare con --compare después.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from flow_engine import DEFAULT_PARAMS, FlowEngine
+from transition import BatchTransitionModel
+
+# Cada resultado: valor, unidad y si un valor mayor es mejor
+results = {}
+
+
+def record(name, value, unit, higher_is_better):
+    results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+    print(f"  {name:<48} {value:>14.2f} {unit}")
+
+
+def best_time(function, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_stepping(quick):
+    """Años simulados por segundo sin interfaz, por duración de carrera y horizonte"""
+    print("Simulación sin interfaz (años/s):")
+    horizons = (1000,) if quick else (1000, 10000)
+    for vectorized in (False, True):
+        mode = "vectorized" if vectorized else "scalar"
+        for total_years in (3, 5, 7, 10):
+            for horizon in horizons:
+                params = dict(DEFAULT_PARAMS, total_years=total_years)
+                elapsed = best_time(lambda: FlowEngine(params, vectorized=vectorized).run(horizon), 3)
+                record(f"step.{mode}.T{total_years}.H{horizon}", horizon / elapsed, "años/s", True)
+
+
+def bench_jump(quick):
+    print("Salto directo al año N (µs):")
+    for target in (10 ** 3, 10 ** 6):
+        def jump():
+            FlowEngine().jump_to(target, history_tail=20)
+        elapsed = best_time(jump, 5)
+        record(f"jump.N{target}", elapsed * 1e6, "µs", False)
+
+
+def bench_batch(quick):
+    print("Escenarios en lote (escenarios·año/s):")
+    scenarios = 1000 if quick else 10000
+    params_list = [dict(DEFAULT_PARAMS, x=50 + i % 100) for i in range(scenarios)]
+    model = BatchTransitionModel(params_list)
+
+    def run():
+        states = model.initial_state()
+        for _ in range(50):
+            states = model.step(states)
+    elapsed = best_time(run, 3)
+    record(f"batch.S{scenarios}.H50", scenarios * 50 / elapsed, "esc·año/s", True)
+
+
+def bench_memory(quick):
+    """Crecimiento de memoria del historial y de la tabla en 10^5 años"""
+    print("Memoria tras muchos años simulados:")
+    steps = 10 ** 4 if quick else 10 ** 5
+    tracemalloc.start()
+    engine = FlowEngine()
+    engine.run(steps)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    record(f"memory.history.bytes_per_year.N{steps}", engine.history.nbytes / steps, "B/año", False)
+    record(f"memory.engine.peak_MB.N{steps}", peak / 1e6, "MB", False)
+
+
+def bench_render(quick):
+    """Costo de cada panel por cuadro con Tk real (requiere un display, p. ej. Xvfb)"""
+    print("Pintado por panel (ms/cuadro):")
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"  omitido: no hay display disponible ({e})")
+        return
+
+    from Simulacion_de_Facultad import StudentFlowSimulator
+    root.geometry("1400x900+0+0")
+    app = StudentFlowSimulator(root)
+    root.update()
+
+    frames = 50 if quick else 200
+    panels = {name: callback for name, (callback, _, _) in app.scheduler.panels.items()}
+    totals = dict.fromkeys(panels, 0.0)
+    for _ in range(frames):
+        # El hilo de simulación no interviene: se avanza el motor y se pinta cada panel aquí
+        app.engine.step()
+        app.update_display()
+        for name, callback in panels.items():
+            start = time.perf_counter()
+            callback()
+            totals[name] += time.perf_counter() - start
+        root.update_idletasks()
+    for name, total in totals.items():
+        record(f"render.{name}", total / frames * 1000, "ms/cuadro", False)
+
+    # Tabla de historial tras muchos años: el costo no debe crecer con el historial
+    app.engine.run(10 ** 4 if quick else 10 ** 5)
+    elapsed = best_time(app.history_table.refresh, 20)
+    record("render.history_table.after_long_run", elapsed * 1000, "ms", False)
+    root.destroy()
+
+
+BENCHMARKS = {
+    "stepping": bench_stepping,
+    "jump": bench_jump,
+    "batch": bench_batch,
+    "memory": bench_memory,
+    "render": bench_render,
+}
+
+
+def compare(baseline_path, tolerance):
+    """Compara con una línea base guardada; devuelve la cantidad de regresiones"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = 0
+    print(f"\nComparación con {baseline_path} (tolerancia {tolerance:.0%}):")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]["value"]
+        ratio = current["value"] / old if old else float("inf")
+        worse = ratio < 1 - tolerance if current["higher_is_better"] else ratio > 1 + tolerance
+        regressions += worse
+        print(f"  {'REGRESIÓN' if worse else 'ok':<10} {name:<48} {old:>12.2f} → {current['value']:>12.2f} ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del simulador de flujo de estudiantes")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks a ejecutar")
+    parser.add_argument("--quick", action="store_true", help="tamaños reducidos")
+    parser.add_argument("--save", help="guarda los resultados como línea base JSON")
+    parser.add_argument("--compare", help="línea base JSON contra la cual comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="variación aceptada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+    if args.compare and not os.path.exists(args.compare):
+        parser.error(f"no existe la línea base {args.compare}; créela antes del cambio con "
+                     f"--save {args.compare} (en esta máquina y con las mismas opciones)")
+
+    for name in args.only or BENCHMARKS:
+        BENCHMARKS[name](args.quick)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {"python": platform.python_version(), "numpy": np.__version__,
+                         "platform": platform.platform(), "quick": args.quick,
+                         "date": time.strftime("%Y-%m-%d %H:%M:%S")},
+                "results": results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.save}")
+
+    if args.compare and compare(args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
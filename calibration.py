@@ -0,0 +1,256 @@
+"""Calibración de las tasas con datos observados de matrícula y graduación.
+
+Los datos tienen una fila por año con las mismas columnas que el historial
+del simulador (así un CSV exportado por batch.py también sirve):
+
+    year,year1,year2,year3,year4,year5,graduated,new_students1
+    2010,412,250,190,160,140,0,100
+    2011,398,262,...
+
+year1..yearN son obligatorias (la duración de la carrera sale de ellas);
+graduated son los graduados acumulados (o graduates, los del año) y
+new_students1 los ingresos de cada año (si falta se usa x).
+
+Cada tripla (a, b, c) se parametriza como 100·softmax, así que siempre suma
+100 y queda en (0, 100). Gauss-Newton amortiguado sobre muchos puntos de
+partida a la vez: los estados y sus tangentes (con las derivadas de
+sensitivity.matrix_derivatives) avanzan por lotes, un arreglo por punto.
+
+Ejemplo:
+    python calibration.py observados.csv --x 100
+"""
+
+import argparse
+import csv
+import json
+
+import numpy as np
+
+from flow_engine import DEFAULT_PARAMS, RATE_KEYS
+from sensitivity import PARAMETERS, matrix_derivatives
+from transition import build_matrix
+
+# Límites del amortiguamiento de Levenberg-Marquardt
+MIN_DAMPING = 1e-9
+MAX_DAMPING = 1e10
+
+
+class ObservedSeries:
+    """Matrícula por año de estudio, graduados por año e ingresos observados"""
+
+    def __init__(self, students, graduates=None, intake=None):
+        self.students = np.asarray(students, dtype=float)
+        if self.students.ndim != 2 or len(self.students) < 2:
+            raise ValueError("Se necesitan al menos dos años observados")
+        self.graduates = None if graduates is None else np.asarray(graduates, dtype=float)
+        self.intake = None if intake is None else np.asarray(intake, dtype=float)
+
+    def __len__(self):
+        return len(self.students)
+
+    @property
+    def total_years(self):
+        return self.students.shape[1]
+
+
+def load_observed(path):
+    """Lee la serie observada desde CSV o JSON (lista de filas, según la extensión)"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+    if not rows:
+        raise ValueError("El archivo no tiene filas")
+    total_years = 0
+    while f'year{total_years + 1}' in rows[0]:
+        total_years += 1
+    if total_years == 0:
+        raise ValueError("Faltan las columnas year1..yearN de matrícula por año de estudio")
+
+    def column(name):
+        if name not in rows[0]:
+            return None
+        return np.array([float(row[name]) for row in rows])
+
+    students = np.column_stack([column(f'year{i}') for i in range(1, total_years + 1)])
+    graduates = column('graduates')
+    if graduates is None and 'graduated' in rows[0]:
+        # Graduados acumulados (formato del historial): se pasan a graduados por año
+        graduates = np.diff(column('graduated'), prepend=np.nan)
+    return ObservedSeries(students, graduates, column('new_students1'))
+
+
+def softmax_rates(logits):
+    """(k, 4) logits -> (k, 6) tasas en %, con el último logit de cada tripla fijo en 0"""
+    k = len(logits)
+    rates = np.empty((k, 6))
+    jacobian = np.zeros((k, 6, 4))
+    for triple, free in ((slice(0, 3), slice(0, 2)), (slice(3, 6), slice(2, 4))):
+        z = np.concatenate([logits[:, free], np.zeros((k, 1))], axis=1)
+        z -= z.max(axis=1, keepdims=True)
+        p = np.exp(z)
+        p /= p.sum(axis=1, keepdims=True)
+        rates[:, triple] = 100 * p
+        # d p_i / d z_j = p_i (δij - p_j), sólo para los dos logits libres
+        full = 100 * (p[:, :, None] * np.eye(3) - p[:, :, None] * p[:, None, :])
+        jacobian[:, triple, free] = full[:, :, :2]
+    return rates, jacobian
+
+
+def rate_logits(rates):
+    """Inversa de softmax_rates para tasas estrictamente positivas"""
+    rates = np.maximum(np.asarray(rates, dtype=float), 1e-6)
+    return np.log(np.column_stack([rates[:, 0] / rates[:, 2], rates[:, 1] / rates[:, 2],
+                                   rates[:, 3] / rates[:, 5], rates[:, 4] / rates[:, 5]]))
+
+
+def solve_steps(systems, rhs):
+    """Resuelve un sistema 4x4 por punto de partida; los singulares pasan a mínimos cuadrados"""
+    try:
+        return np.linalg.solve(systems, rhs[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        steps = np.full(rhs.shape, np.nan)
+        for k, (system, b) in enumerate(zip(systems, rhs)):
+            if np.isfinite(system).all() and np.isfinite(b).all():
+                steps[k] = np.linalg.lstsq(system, b, rcond=None)[0]
+        return steps
+
+
+class CalibrationResult:
+    def __init__(self, params, rmse, fitted, starts, iterations):
+        self.params = params
+        self.rmse = rmse
+        self.fitted = fitted
+        self.starts = starts
+        self.iterations = iterations
+
+
+class Calibrator:
+    """Ajusta a1/b1/c1/ai/bi/ci por mínimos cuadrados sobre la serie observada"""
+
+    def __init__(self, observed, params=None):
+        self.observed = observed
+        self.params = dict(DEFAULT_PARAMS, **(params or {}))
+        self.params['total_years'] = observed.total_years
+        T = observed.total_years
+        self.size = T + 2
+        d_matrix, _ = matrix_derivatives(self.params)
+        self.d_matrix = d_matrix[[PARAMETERS.index(key) for key in RATE_KEYS]]
+        # Parte de la matriz que no depende de las tasas (estados absorbentes)
+        self.base, _ = build_matrix(dict(self.params, **{key: 0 for key in RATE_KEYS}))
+        years = len(observed) - 1
+        self.intake = observed.intake[1:] if observed.intake is not None else np.full(years, float(self.params['x']))
+        graduates = observed.graduates
+        self.fit_graduates = graduates is not None and np.all(np.isfinite(graduates[1:]))
+
+    def residuals(self, rates):
+        """Residuos (k, R) y su jacobiano respecto de las tasas (k, R, 6), por lotes"""
+        observed = self.observed
+        T = observed.total_years
+        k = len(rates)
+        matrices = self.base + np.einsum('kp,pij->kij', rates, self.d_matrix)
+        state = np.zeros((k, self.size))
+        state[:, :T] = observed.students[0]
+        tangent = np.zeros((k, self.size, 6))
+        previous_graduated, previous_tangent = state[:, T:T + 1], tangent[:, T:T + 1]
+        residuals, jacobians = [], []
+        for t in range(len(observed) - 1):
+            tangent = np.einsum('kij,kjp->kip', matrices, tangent) + np.einsum('pij,kj->kip', self.d_matrix, state)
+            state = np.einsum('kij,kj->ki', matrices, state)
+            state[:, 0] += self.intake[t]
+            residuals.append(state[:, :T] - observed.students[t + 1])
+            jacobians.append(tangent[:, :T])
+            if self.fit_graduates:
+                # Graduados del año: diferencia del acumulado
+                residuals.append(state[:, T:T + 1] - previous_graduated - observed.graduates[t + 1])
+                jacobians.append(tangent[:, T:T + 1] - previous_tangent)
+                previous_graduated, previous_tangent = state[:, T:T + 1], tangent[:, T:T + 1]
+        return np.concatenate(residuals, axis=1), np.concatenate(jacobians, axis=1)
+
+    def fit(self, starts=64, iterations=40, seed=0, tolerance=1e-10):
+        """Gauss-Newton amortiguado (Levenberg-Marquardt) desde starts puntos a la vez.
+
+        El primer punto de partida son los parámetros actuales; los demás se
+        sortean con una distribución de Dirichlet sobre cada tripla.
+        """
+        rng = np.random.default_rng(seed)
+        current = np.array([[self.params[key] for key in RATE_KEYS]], dtype=float)
+        sampled = 100 * np.concatenate([rng.dirichlet((2, 1, 1), starts - 1),
+                                        rng.dirichlet((2, 1, 1), starts - 1)], axis=1)
+        logits = rate_logits(np.vstack([current, sampled]))
+        damping = np.full(len(logits), 1e-3)
+        converged = np.zeros(len(logits), dtype=bool)
+
+        def evaluate(logits):
+            rates, softmax_jacobian = softmax_rates(logits)
+            residual, jacobian = self.residuals(rates)
+            return residual, jacobian @ softmax_jacobian, (residual ** 2).sum(axis=1)
+
+        residual, jacobian, cost = evaluate(logits)
+        for iteration in range(1, iterations + 1):
+            gradient = np.einsum('krp,kr->kp', jacobian, residual)
+            normal = np.einsum('krp,krq->kpq', jacobian, jacobian)
+            diagonal = np.einsum('kpp->kp', normal)
+            # λ·diag escala cada dirección; λ·I mantiene invertible el sistema si una tripla se satura
+            system = normal + (damping[:, None] * (diagonal + 1))[:, :, None] * np.eye(4)
+            step = solve_steps(system, -gradient)
+            # Un punto de partida degenerado se abandona sin detener a los demás
+            converged |= ~np.isfinite(step).all(axis=1)
+            step = np.where(converged[:, None], 0, step)
+            candidate = logits + step
+            new_residual, new_jacobian, new_cost = evaluate(candidate)
+            better = (new_cost < cost) & ~converged
+            # Se acepta el paso donde mejora (y se relaja el amortiguamiento); si no, se amortigua más
+            logits = np.where(better[:, None], candidate, logits)
+            residual = np.where(better[:, None], new_residual, residual)
+            jacobian = np.where(better[:, None, None], new_jacobian, jacobian)
+            converged |= better & (cost - new_cost <= tolerance * (1 + new_cost))
+            cost = np.where(better, new_cost, cost)
+            damping = np.clip(np.where(better, damping / 3, damping * 4), MIN_DAMPING, None)
+            converged |= damping > MAX_DAMPING
+            if converged.all():
+                break
+
+        best = int(np.argmin(np.where(np.isfinite(cost), cost, np.inf)))
+        rates, _ = softmax_rates(logits[best:best + 1])
+        params = dict(self.params, **dict(zip(RATE_KEYS, rates[0].tolist())))
+        rmse = float(np.sqrt(cost[best] / residual.shape[1]))
+        fitted = residual[best] + self._observed_vector()
+        return CalibrationResult(params, rmse, fitted, starts, iteration)
+
+    def _observed_vector(self):
+        observed = self.observed
+        parts = []
+        for t in range(1, len(observed)):
+            parts.append(observed.students[t])
+            if self.fit_graduates:
+                parts.append(observed.graduates[t:t + 1])
+        return np.concatenate(parts)
+
+
+def calibrate(observed, params=None, starts=64):
+    """Atajo: ajusta las tasas a la serie observada con los parámetros dados como base"""
+    return Calibrator(observed, params).fit(starts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibra las tasas con datos observados de matrícula")
+    parser.add_argument("observed", help="serie observada (CSV o JSON)")
+    parser.add_argument("--starts", type=int, default=64, help="puntos de partida simultáneos")
+    parser.add_argument("--x", type=float, default=DEFAULT_PARAMS['x'],
+                        help="ingresos por año si el archivo no trae new_students1")
+    args = parser.parse_args(argv)
+
+    try:
+        observed = load_observed(args.observed)
+    except (OSError, KeyError, ValueError) as e:
+        parser.error(str(e))
+    result = calibrate(observed, {'x': args.x}, args.starts)
+    for key in RATE_KEYS:
+        print(f"{key}: {result.params[key]:.2f}")
+    print(f"RMSE: {result.rmse:.3f} estudiantes ({result.iterations} iteraciones, {result.starts} puntos de partida)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Varias carreras simuladas a la vez sobre un conjunto de salas compartido.
+
+Ejemplos:
+    python campus.py carreras.json --horizon 30 > campus.csv
+    python campus.py carreras.json --horizon 200 --format parquet -o campus.parquet
+
+carreras.json asocia cada carrera con sus parámetros (los que falten toman
+el valor por defecto):
+    {"Ingeniería": {"x": 120, "total_years": 6}, "Derecho": {"x": 80, "ci": 10, "bi": 20}}
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+import batch
+from analytics import AbsorbingChain
+from flow_engine import DEFAULT_PARAMS, RATE_KEYS, ROOM_CAPACITY, history_keys
+from history_store import HistoryStore, HistorySubset
+from transition import BatchTransitionModel
+
+
+def load_programs(path):
+    """Lee {carrera: parámetros} desde JSON, rechazando parámetros desconocidos"""
+    with open(path, encoding="utf-8") as f:
+        programs = json.load(f)
+    if not isinstance(programs, dict) or not programs:
+        raise ValueError("El archivo de carreras debe ser un objeto JSON {carrera: parámetros}")
+    for name, params in programs.items():
+        unknown = set(params) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f"Parámetros desconocidos en {name}: {', '.join(sorted(unknown))}")
+    return programs
+
+
+class CampusEngine:
+    """N carreras avanzadas juntas como un arreglo (carreras x estados).
+
+    Las carreras más cortas se completan con años vacíos hasta la más larga,
+    así que cada año académico es una única operación sobre el arreglo
+    apilado. Las salas se cuentan por carrera y año de estudio (un curso no
+    comparte sala con el de otra carrera) y luego se suman por año.
+    """
+
+    def __init__(self, programs, room_capacity=ROOM_CAPACITY):
+        self.names = list(programs)
+        self.programs = {name: dict(DEFAULT_PARAMS, **programs[name]) for name in self.names}
+        self.room_capacity = room_capacity
+        self.listeners = []
+        self.reset()
+
+    def add_listener(self, callback):
+        """Registra una función que se llama con el motor tras cada año simulado"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def reset(self):
+        for params in self.programs.values():
+            params['total_years'] = int(params['total_years'])
+        self.model = BatchTransitionModel([self.programs[name] for name in self.names], pad=True)
+        self.durations = [self.programs[name]['total_years'] for name in self.names]
+        self.max_years = self.model.total_years
+        self.year = 0
+        self.state = self.model.initial_state()
+        self.repeaters = np.zeros((len(self.names), self.max_years))
+        self.new_students = np.zeros((len(self.names), self.max_years))
+
+        # Fila del historial: año, bloque agregado y un bloque por carrera sin los años de relleno
+        total_years = self.max_years
+        width = 3 * total_years + 4
+        aggregate_keys = history_keys(total_years)[1:] + ['rooms']
+        columns = ['year'] + aggregate_keys
+        gather = []
+        for index, (name, duration) in enumerate(zip(self.names, self.durations)):
+            offset = index * width
+            years = list(range(duration))
+            gather += [offset + i for i in years]
+            gather += [offset + total_years + k for k in range(3)]
+            gather += [offset + total_years + 3 + i for i in years]
+            gather += [offset + 2 * total_years + 3 + i for i in years]
+            gather.append(offset + 3 * total_years + 3)
+            columns += [f"{name}/{key}" for key in history_keys(duration)[1:] + ['rooms']]
+        self._block = np.zeros((len(self.names), width))
+        self._gather = np.array(gather)
+        self.columns = columns
+        self.history = HistoryStore(columns, running_sums=['total'] + [f"{name}/total" for name in self.names])
+
+    def _fill_block(self):
+        total_years = self.max_years
+        block = self._block
+        students = self.state[:, :total_years]
+        block[:, :total_years] = students
+        block[:, total_years:total_years + 2] = self.state[:, total_years:]
+        block[:, total_years + 2] = students.sum(axis=1)
+        block[:, total_years + 3:2 * total_years + 3] = self.repeaters
+        block[:, 2 * total_years + 3:3 * total_years + 3] = self.new_students
+        block[:, 3 * total_years + 3] = np.ceil(students / self.room_capacity).sum(axis=1)
+        return block
+
+    def fill_row(self, row):
+        """Escribe el estado actual en row (columnas en el orden de self.columns)"""
+        block = self._fill_block()
+        width = block.shape[1]
+        row[0] = self.year
+        row[1:width + 1] = block.sum(axis=0)
+        row[width + 1:] = block.ravel()[self._gather]
+
+    def record_history(self):
+        self.fill_row(self.history.next_row())
+
+    def current_row(self):
+        row = np.empty(len(self.columns))
+        self.fill_row(row)
+        return [self.year] + row[1:].tolist()
+
+    def step(self):
+        """Avanza un año académico todas las carreras y notifica a los observadores"""
+        self.record_history()
+        self._advance()
+
+        for callback in self.listeners:
+            callback(self)
+
+    def _advance(self):
+        """Un año sin guardarlo en el historial ni notificar"""
+        self.repeaters = self.model.repeat_rates * self.state[:, :self.max_years]
+        self.state = self.model.step(self.state)
+        self.new_students = self.model.intakes[:, :self.max_years]
+        self.year += 1
+
+    def run(self, years):
+        for _ in range(years):
+            self.step()
+
+    def jump_to(self, year, history_tail=20, cancel=None):
+        """Salta directamente al año indicado; sólo se simulan y guardan los últimos history_tail años
+        (cancel, un threading.Event, interrumpe los años simulados desde otro hilo)"""
+        remaining = year - self.year
+        if remaining <= 0:
+            return
+        history_tail = min(max(history_tail, 1), remaining)
+        skipped = remaining - history_tail
+        if skipped > 0:
+            # Potencia de matriz hasta el año anterior y un paso simulado (repetidores e ingresos)
+            if skipped > 1:
+                self.state = self.model.advance(self.state, skipped - 1)
+                self.year += skipped - 1
+            self._advance()
+        while self.year < year and not (cancel and cancel.is_set()):
+            self.step()
+
+    def rooms(self):
+        """Salas por carrera y año de estudio, forma (carreras, años)"""
+        return np.ceil(self.state[:, :self.max_years] / self.room_capacity).astype(int)
+
+    def rooms_per_year(self):
+        """Salas del campus por año de estudio (suma de las carreras)"""
+        return self.rooms().sum(axis=0)
+
+    def steady_rooms_per_year(self):
+        """Salas por año de estudio en régimen estable, sumando las carreras que lo tienen"""
+        rooms = np.zeros(self.max_years, dtype=int)
+        for name in self.names:
+            try:
+                chain = AbsorbingChain(self.programs[name])
+            except ValueError:
+                continue
+            program_rooms = chain.rooms_per_year(self.room_capacity)
+            rooms[:len(program_rooms)] += program_rooms
+        return rooms
+
+    def view(self, name=None):
+        """Vista con la interfaz de FlowEngine de una carrera, o de todo el campus si name es None"""
+        return CampusView(self, name)
+
+
+class CampusView:
+    """Expone una carrera (o la suma de todas) como si fuera un FlowEngine.
+
+    step, run, jump_to y reset actúan sobre todo el campus: las carreras
+    siempre avanzan juntas.
+    """
+
+    def __init__(self, campus, name=None):
+        self.campus = campus
+        self.name = name
+        self.aggregate = name is None
+        self._history_source = None
+
+    @property
+    def params(self):
+        if not self.aggregate:
+            return self.campus.programs[self.name]
+        # Tasas promedio ponderadas por ingresos: sólo para mostrar
+        programs = list(self.campus.programs.values())
+        intake = sum(p['x'] for p in programs)
+        params = {'x': intake, 'total_years': self.campus.max_years}
+        for key in RATE_KEYS:
+            params[key] = round(sum(p[key] * p['x'] for p in programs) / intake, 1) if intake else 0
+        return params
+
+    @property
+    def _rows(self):
+        if self.aggregate:
+            return slice(None)
+        return self.campus.names.index(self.name)
+
+    @property
+    def total_years(self):
+        return self.campus.max_years if self.aggregate else self.campus.programs[self.name]['total_years']
+
+    def _select(self, array):
+        selected = array[self._rows, :self.total_years]
+        return selected.sum(axis=0) if self.aggregate else selected
+
+    year = property(lambda self: self.campus.year)
+    students_per_year = property(lambda self: self._select(self.campus.state))
+    repeaters_per_year = property(lambda self: self._select(self.campus.repeaters))
+    new_students_per_year = property(lambda self: self._select(self.campus.new_students))
+    total_enrolled = property(lambda self: float(self.students_per_year.sum()))
+
+    @property
+    def total_graduated(self):
+        return float(np.sum(self.campus.state[self._rows, self.campus.max_years]))
+
+    @property
+    def total_dropped(self):
+        return float(np.sum(self.campus.state[self._rows, self.campus.max_years + 1]))
+
+    @property
+    def history(self):
+        # Se reconstruye sólo si el campus creó un historial nuevo (reset)
+        store = self.campus.history
+        if self._history_source is not store:
+            keys = history_keys(self.total_years)
+            prefix = "" if self.aggregate else f"{self.name}/"
+            mapping = {key: key if key == 'year' else prefix + key for key in keys}
+            self._history = HistorySubset(store, mapping)
+            self._history_source = store
+        return self._history
+
+    def rooms_per_year(self):
+        if self.aggregate:
+            return self.campus.rooms_per_year()
+        return self.campus.rooms()[self._rows, :self.total_years]
+
+    def reset(self):
+        self.campus.reset()
+
+    def step(self):
+        self.campus.step()
+
+    def run(self, years):
+        self.campus.run(years)
+
+    def jump_to(self, year, history_tail=20, cancel=None):
+        self.campus.jump_to(year, history_tail, cancel)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Proyección conjunta de varias carreras (sin GUI)")
+    parser.add_argument("programs", help="archivo JSON {carrera: parámetros}")
+    parser.add_argument("--horizon", type=int, required=True, help="años a simular")
+    parser.add_argument("--capacity", type=int, default=ROOM_CAPACITY, help="estudiantes por sala")
+    parser.add_argument("--format", choices=("csv", "jsonl", "parquet"), default="csv")
+    parser.add_argument("-o", "--output", default="-", help="archivo de salida ('-' para stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        campus = CampusEngine(load_programs(args.programs), room_capacity=args.capacity)
+        writer, stream = batch.open_writer(args.format, args.output, campus.columns)
+    except (OSError, ValueError, RuntimeError) as e:
+        parser.error(str(e))
+
+    try:
+        try:
+            campus.add_listener(lambda c: writer.write(c.current_row()))
+            campus.run(args.horizon)
+        finally:
+            writer.close()
+            if stream is not None:
+                stream.close()
+    except BrokenPipeError:
+        batch.exit_broken_pipe()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Puntos de control: guarda el estado completo de un FlowEngine y lo restaura.
+
+Formato (little endian):
+    b"FLOWCKPT" | versión (uint16) | largo del encabezado (uint32) | encabezado JSON
+    | relleno hasta múltiplo de 64 | bloques binarios, cada uno alineado a 64 bytes
+
+El encabezado guarda parámetros, modo, año, vectores de estado, totales, el
+estado del generador aleatorio (modo por estudiante) y la ubicación de cada
+bloque. El historial se guarda por columnas, así que al restaurarlo con
+np.memmap sólo se leen del disco las columnas y filas que se consultan.
+"""
+
+import json
+import struct
+
+import numpy as np
+
+from flow_engine import FlowEngine, history_keys
+from history_store import HistoryStore
+from schedule import ParameterSchedule
+
+MAGIC = b"FLOWCKPT"
+VERSION = 1
+ALIGNMENT = 64
+PREAMBLE = struct.Struct("<HI")
+
+
+def aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def to_list(values):
+    """Vector de estado como lista JSON conservando enteros y flotantes exactos"""
+    return np.asarray(values).tolist()
+
+
+def engine_header(engine):
+    header = {
+        'params': engine.params,
+        'vectorized': engine.vectorized,
+        'agents': engine.agents,
+        'seed': engine.seed,
+        'schedule': [dict(change, year=year) for year, change in engine.schedule.changes] if engine.schedule else None,
+        'year': engine.year,
+        'students_per_year': to_list(engine.students_per_year),
+        'repeaters_per_year': to_list(engine.repeaters_per_year),
+        'new_students_per_year': to_list(engine.new_students_per_year),
+        'total_enrolled': float(engine.total_enrolled),
+        'total_graduated': float(engine.total_graduated),
+        'total_dropped': float(engine.total_dropped),
+        'history_columns': engine.history.keys(),
+    }
+    if engine.vectorized and not engine.agents:
+        header['state'] = to_list(engine.state_vector(None))
+    return header
+
+
+def save_checkpoint(engine, path):
+    """Escribe el estado de engine en path"""
+    header = engine_header(engine)
+    history = engine.history
+    # Por columnas: cada columna del historial queda contigua en el archivo
+    blocks = {'history': np.ascontiguousarray(history.rows().T)}
+    for name, prefix in history.running_sums().items():
+        blocks[f'prefix:{name}'] = prefix
+
+    population = engine.population
+    if population is not None:
+        size = population.size
+        header['population'] = {
+            'year': population.year, 'size': size, 'exited': population.exited,
+            'graduated': population.graduated, 'dropped': population.dropped,
+            'intake': population.intake, 'rng': population.rng.bit_generator.state,
+        }
+        blocks.update({
+            'agents:study_year': population.study_year[:size], 'agents:repeats': population.repeats[:size],
+            'agents:cohort': population.cohort[:size], 'agents:status': population.status[:size],
+            'agents:repeaters_per_year': population.repeaters_per_year,
+            'agents:time_to_degree': population.time_to_degree,
+        })
+        for status, counts in population.repeats_at_exit.items():
+            blocks[f'agents:repeats_at_exit:{status}'] = counts
+
+    offset = 0
+    header['blocks'] = {}
+    for name, block in blocks.items():
+        header['blocks'][name] = {'dtype': block.dtype.str, 'shape': list(block.shape), 'offset': offset}
+        offset = aligned(offset + block.nbytes)
+    encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+
+    with open(path, "wb") as f:
+        f.write(MAGIC + PREAMBLE.pack(VERSION, len(encoded)) + encoded)
+        data_start = aligned(f.tell())
+        for name, block in blocks.items():
+            f.seek(data_start + header['blocks'][name]['offset'])
+            f.write(np.ascontiguousarray(block).tobytes())
+        f.truncate(data_start + offset)
+
+
+def read_header(path):
+    """Encabezado JSON y posición donde empiezan los bloques"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} no es un punto de control del simulador")
+        version, length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+        if version != VERSION:
+            raise ValueError(f"Versión de punto de control no soportada: {version}")
+        header = json.loads(f.read(length).decode("utf-8"))
+    return header, aligned(len(MAGIC) + PREAMBLE.size + length)
+
+
+def read_block(path, header, data_start, name, mmap=True):
+    spec = header['blocks'][name]
+    dtype, shape = np.dtype(spec['dtype']), tuple(spec['shape'])
+    if 0 in shape:
+        return np.zeros(shape, dtype)
+    offset = data_start + spec['offset']
+    if mmap:
+        # Copia al escribir: el archivo nunca se modifica
+        return np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=shape)
+    return np.fromfile(path, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+
+
+def load_checkpoint(path, mmap=True):
+    """Restaura un FlowEngine; con mmap el historial se lee del disco bajo demanda"""
+    header, data_start = read_header(path)
+    schedule = ParameterSchedule(header['schedule']) if header['schedule'] else None
+    engine = FlowEngine(header['params'], vectorized=header['vectorized'], agents=header['agents'],
+                        seed=header['seed'], schedule=schedule)
+    total_years = int(engine.params['total_years'])
+    if header['history_columns'] != history_keys(total_years):
+        raise ValueError("Las columnas del historial no coinciden con la duración de la carrera")
+
+    def block(name, lazy=False):
+        return read_block(path, header, data_start, name, mmap and lazy)
+
+    columns = header['history_columns']
+    running_sums = {name[len('prefix:'):]: block(name) for name in header['blocks'] if name.startswith('prefix:')}
+    engine.history = HistoryStore.from_array(columns, block('history', lazy=True).T, running_sums)
+
+    engine.year = header['year']
+    population = engine.population
+    if population is not None:
+        saved = header['population']
+        size = saved['size']
+        population._reserve(size)
+        for name in ('study_year', 'repeats', 'cohort', 'status'):
+            getattr(population, name)[:size] = block(f'agents:{name}')
+        for key in ('year', 'size', 'exited', 'graduated', 'dropped', 'intake'):
+            setattr(population, key, saved[key])
+        population.repeaters_per_year = block('agents:repeaters_per_year')
+        population.time_to_degree = block('agents:time_to_degree')
+        for status in population.repeats_at_exit:
+            population.repeats_at_exit[status] = block(f'agents:repeats_at_exit:{status}')
+        population.rng.bit_generator.state = saved['rng']
+        engine._sync_agents()
+    elif 'state' in header:
+        engine.set_state(np.array(header['state']))
+        engine.repeaters_per_year = np.array(header['repeaters_per_year'])
+        engine.new_students_per_year = np.array(header['new_students_per_year'])
+    else:
+        engine.students_per_year = header['students_per_year']
+        engine.repeaters_per_year = header['repeaters_per_year']
+        engine.new_students_per_year = header['new_students_per_year']
+        engine.total_enrolled = header['total_enrolled']
+        engine.total_graduated = header['total_graduated']
+        engine.total_dropped = header['total_dropped']
+    return engine
@@ -0,0 +1,42 @@
+"""Reducción de series largas para dibujarlas: largest-triangle-three-buckets (LTTB)."""
+
+import numpy as np
+
+
+def lttb(x, series, threshold):
+    """Índices de los puntos que conserva LTTB, uno por fila de series.
+
+    Se conservan el primero y el último; el resto se divide en threshold - 2
+    cubetas y de cada una se elige el punto que forma el triángulo más grande
+    con el punto elegido en la cubeta anterior y el promedio de la siguiente.
+    Todas las series comparten x y se procesan juntas: el bucle es por
+    cubeta (del orden de los píxeles), nunca por punto.
+    """
+    x = np.asarray(x, dtype=float)
+    series = np.atleast_2d(np.asarray(series, dtype=float))
+    count, n = series.shape
+    if threshold >= n or threshold < 3:
+        return np.tile(np.arange(n), (count, 1))
+
+    buckets = threshold - 2
+    edges = np.linspace(1, n - 1, buckets + 1).astype(int)
+    sizes = np.diff(edges)
+    # Promedio de cada cubeta; la "siguiente" de la última es el punto final
+    x_means = np.append(np.add.reduceat(x[:n - 1], edges[:-1]) / sizes, x[-1])
+    y_means = np.column_stack([np.add.reduceat(series[:, :n - 1], edges[:-1], axis=1) / sizes, series[:, -1]])
+
+    selected = np.empty((count, threshold), dtype=int)
+    selected[:, 0] = 0
+    selected[:, -1] = n - 1
+    rows = np.arange(count)
+    ax, ay = np.full(count, x[0]), series[:, 0].copy()
+    for b in range(buckets):
+        lo, hi = edges[b], edges[b + 1]
+        cx, cy = x_means[b + 1], y_means[:, b + 1]
+        bx, by = x[lo:hi], series[:, lo:hi]
+        # Doble del área del triángulo (a, punto, c) para cada punto de la cubeta
+        area = np.abs((ax - cx)[:, None] * (by - ay[:, None]) - (ax[:, None] - bx) * (cy - ay)[:, None])
+        chosen = lo + np.argmax(area, axis=1)
+        selected[:, b + 1] = chosen
+        ax, ay = x[chosen], series[rows, chosen]
+    return selected
@@ -0,0 +1,261 @@
+"""Motor de simulación del flujo de estudiantes, independiente de la interfaz gráfica."""
+
+import math
+
+from agents import StudentAgents
+from history_store import HistoryStore
+from schedule import ParameterSchedule
+
+
+DEFAULT_PARAMS = {
+    'x': 100,  # Alumnos que entran por año
+    'a1': 60,  # % pasan a segundo del primer año
+    'b1': 20,  # % abandonan del primer año
+    'c1': 20,  # % repiten del primer año
+    'ai': 70,  # % pasan al siguiente del i-ésimo año
+    'bi': 15,  # % abandonan del i-ésimo año
+    'ci': 15,  # % repiten del i-ésimo año
+    'total_years': 5  # Duración de la carrera
+}
+# Tasas de transición (en %) del primer año y de los siguientes
+RATE_KEYS = ('a1', 'b1', 'c1', 'ai', 'bi', 'ci')
+# Estudiantes por sala
+ROOM_CAPACITY = 30
+
+
+def history_keys(total_years):
+    """Devuelve las columnas del historial para una carrera de total_years años"""
+    keys = ['year']
+    keys += [f'year{i}' for i in range(1, total_years + 1)]
+    keys += ['graduated', 'dropped', 'total']
+    keys += [f'repeaters{i}' for i in range(1, total_years + 1)]
+    keys += [f'new_students{i}' for i in range(1, total_years + 1)]
+    return keys
+
+
+class FlowEngine:
+    """Estado, parámetros e historial de una simulación; avanza año a año sin Tk"""
+
+    def __init__(self, params=None, vectorized=False, agents=False, seed=None, schedule=None):
+        self.params = dict(DEFAULT_PARAMS)
+        if params:
+            self.params.update(params)
+        # En modo vectorizado cada año es un producto matriz-vector
+        self.vectorized = vectorized
+        # En modo por estudiante cada alumno se sortea individualmente (con semilla reproducible)
+        self.agents = agents
+        self.seed = seed
+        # Cambios de parámetros por año (ParameterSchedule); se compilan al reiniciar
+        self.schedule = schedule
+        self.listeners = []
+        self.reset()
+
+    def add_listener(self, callback):
+        """Registra una función que se llama con el motor tras cada año simulado"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def reset(self):
+        total_years = int(self.params['total_years'])
+        self.year = 0
+        # Inicializar cada año con 0 estudiantes
+        self.students_per_year = [0] * (total_years + 1)  # +1 para graduados
+        self.total_enrolled = 0
+        self.total_graduated = 0
+        self.total_dropped = 0
+
+        # Estadísticas de repetidores y nuevos ingresos
+        self.repeaters_per_year = [0] * total_years
+        self.new_students_per_year = [0] * total_years
+
+        self.history = HistoryStore(history_keys(total_years), running_sums=('total',))
+        self._plan = (self.schedule or ParameterSchedule()).compile(self.params)
+        self._model = self._plan.model(0) if self.vectorized else None
+        self._state = self._model.initial_state() if self.vectorized else None
+        self._agents = StudentAgents(self.params, self.seed) if self.agents else None
+        self._enter_segment(0)
+
+    def _enter_segment(self, index):
+        """Carga las tasas e ingresos del tramo del cronograma que contiene al año actual"""
+        plan = self._plan
+        self._segment_start, self._segment_end = plan.starts[index], plan.ends[index]
+        self._segment_intake, self._segment_growth = plan.intakes[index], plan.growth[index]
+        self._rates = plan.rates[index]
+        if self._model is not None:
+            self._model = plan.model(index)
+        if self._agents is not None:
+            self._agents.set_rates(self._rates)
+
+    def _year_intake(self):
+        """Ingresos del año actual (cambia de tramo si hace falta)"""
+        if not self._segment_start <= self.year < self._segment_end:
+            self._enter_segment(self._plan.segment_at(self.year))
+        return self._segment_intake * self._segment_growth ** (self.year - self._segment_start)
+
+    def record_history(self):
+        """Guarda el estado actual en el historial (columnas en el orden de history_keys)"""
+        total_years = len(self._rates)
+        row = self.history.next_row()
+        row[0] = self.year
+        row[1:total_years + 1] = self.students_per_year[:total_years]
+        row[total_years + 1] = self.total_graduated
+        row[total_years + 2] = self.total_dropped
+        row[total_years + 3] = self.total_enrolled
+        row[total_years + 4:2 * total_years + 4] = self.repeaters_per_year
+        row[2 * total_years + 4:] = self.new_students_per_year
+
+    def current_row(self):
+        """Estado actual como lista (año entero y métricas float) en el orden de history_keys"""
+        total_years = len(self._rates)
+        row = [self.year]
+        row += [float(v) for v in self.students_per_year[:total_years]]
+        row += [float(self.total_graduated), float(self.total_dropped), float(self.total_enrolled)]
+        row += [float(v) for v in self.repeaters_per_year]
+        row += [float(v) for v in self.new_students_per_year]
+        return row
+
+    def rooms_per_year(self, capacity=ROOM_CAPACITY):
+        """Salas necesarias por año de estudio con el estado actual"""
+        return [math.ceil(s / capacity) for s in self.students_per_year[:len(self._rates)]]
+
+    def step(self):
+        """Avanza un año académico y notifica a los observadores"""
+        self.record_history()
+        self._advance()
+
+        for callback in self.listeners:
+            callback(self)
+
+    def _advance(self):
+        """Un año sin guardarlo en el historial ni notificar"""
+        intake = self._year_intake()
+        if self._agents is not None:
+            self._agents.intake = int(round(intake))
+            self._agents.step()
+            self._sync_agents()
+        elif self._model is not None:
+            self._step_vectorized(intake)
+        else:
+            self._step_scalar(intake)
+        self.year += 1
+
+    def _step_scalar(self, intake):
+        total_years = len(self._rates)
+        new_students = [0] * total_years
+        new_repeaters = [0] * total_years
+        new_new_students = [0] * total_years
+
+        # Nuevos ingresos a primer año
+        new_students[0] += intake
+        new_new_students[0] += intake
+
+        # Procesar cada año de estudio
+        for i, (pass_rate, repeat_rate, drop_rate) in enumerate(self._rates):
+            current = self.students_per_year[i]
+
+            if i + 1 < total_years:
+                new_students[i + 1] += current * pass_rate
+            else:
+                self.total_graduated += current * pass_rate
+
+            new_students[i] += current * repeat_rate
+            new_repeaters[i] += current * repeat_rate
+            self.total_dropped += current * drop_rate
+
+        self.students_per_year = new_students
+        self.repeaters_per_year = new_repeaters
+        self.new_students_per_year = new_new_students
+        self.total_enrolled = sum(new_students)
+
+    def _step_vectorized(self, intake):
+        model = self._model
+        students, _, _ = model.split(self._state)
+        self.repeaters_per_year = model.repeat_rates * students
+        self._state = model.step(self._state, intake)
+        self.set_state(self._state)
+        self.new_students_per_year[0] = intake
+
+    @property
+    def population(self):
+        """Población del modo por estudiante (None en los modos agregados)"""
+        return self._agents
+
+    def _sync_agents(self):
+        agents = self._agents
+        self.students_per_year = agents.students_per_year()
+        self.repeaters_per_year = agents.repeaters_per_year
+        self.new_students_per_year = [agents.intake] + [0] * (agents.total_years - 1)
+        self.total_graduated = agents.graduated
+        self.total_dropped = agents.dropped
+        self.total_enrolled = int(self.students_per_year.sum())
+
+    def set_state(self, state, model=None):
+        """Carga un vector de estado (estudiantes por año, graduados, abandonos)"""
+        model = model or self._model
+        students, graduated, dropped = model.split(state)
+        intake = model.intake[:model.total_years].copy()
+        if self._model is not None:
+            self._state = state
+            self.students_per_year = students
+            self.new_students_per_year = intake
+        else:
+            self.students_per_year = students.tolist()
+            self.new_students_per_year = intake.tolist()
+        self.total_graduated = float(graduated)
+        self.total_dropped = float(dropped)
+        self.total_enrolled = float(students.sum())
+
+    def state_vector(self, model):
+        """Estado actual como vector (estudiantes por año, graduados, abandonos)"""
+        if self._model is not None:
+            return self._state
+        state = model.initial_state()
+        state[:model.total_years] = self.students_per_year[:model.total_years]
+        state[model.total_years] = self.total_graduated
+        state[model.total_years + 1] = self.total_dropped
+        return state
+
+    def jump_to(self, year, history_tail=20, cancel=None):
+        """Salta directamente al año indicado; sólo se simulan y guardan los últimos history_tail años.
+
+        cancel (un threading.Event) permite interrumpir el salto desde otro hilo
+        entre año y año; el motor queda en el último año completado.
+        """
+        remaining = year - self.year
+        if remaining <= 0:
+            return
+        history_tail = min(max(history_tail, 1), remaining)
+        skipped = remaining - history_tail
+        target = self.year + skipped
+        if skipped > 0 and self._agents is not None:
+            # Sin forma cerrada: se sortean todos los años, pero sin guardarlos
+            while self.year < target and not (cancel and cancel.is_set()):
+                self._agents.intake = int(round(self._year_intake()))
+                self._agents.step()
+                self.year += 1
+            self._sync_agents()
+        elif skipped > 0:
+            # Una potencia de matriz por tramo del cronograma hasta el año anterior; el último
+            # año se simula para que repetidores e ingresos queden como en un paso normal
+            plan = self._plan
+            state = None
+            while self.year < target - 1:
+                index = plan.segment_at(self.year)
+                model = plan.model(index)
+                if state is None:
+                    state = self.state_vector(model)
+                years = min(plan.ends[index], target - 1) - self.year
+                state = model.advance(state, years, plan.intake_at(self.year), plan.growth[index])
+                self.year += years
+            if state is not None:
+                self.set_state(state, model)
+            self._advance()
+        while self.year < year and not (cancel and cancel.is_set()):
+            self.step()
+
+    def run(self, years):
+        """Simula varios años seguidos"""
+        for _ in range(years):
+            self.step()
@@ -0,0 +1,204 @@
+"""Historial columnar preasignado para la simulación."""
+
+from array import array
+
+import numpy as np
+
+# Filas por bloque en los mínimos y máximos guardados para consultas por ventana
+EXTREMA_BLOCK = 256
+
+
+class HistoryStore:
+    """Tabla (años simulados x métricas) sobre un arreglo que crece geométricamente.
+
+    history['total'] devuelve una vista sin copia de la columna con las filas ya
+    escritas, así que el rebanado (history['total'][-20:]) tampoco copia datos.
+    """
+
+    def __init__(self, columns, capacity=64, running_sums=()):
+        self.columns = list(columns)
+        self._index = {name: i for i, name in enumerate(self.columns)}
+        self._data = np.zeros((capacity, len(self.columns)))
+        self._size = 0
+        # Sumas acumuladas de algunas columnas para promedios móviles en O(1)
+        self._prefix = {name: array('d', [0.0]) for name in running_sums}
+        # Mínimo y máximo (con sus filas) de cada bloque completo, por columna y tamaño de bloque
+        self._extrema = {}
+
+    @classmethod
+    def from_array(cls, columns, data, running_sums=None):
+        """Historial sobre filas ya escritas (p. ej. un np.memmap, que se lee bajo demanda).
+
+        running_sums: {columna: sumas acumuladas guardadas}; al agregar la primera
+        fila nueva los datos se copian a memoria.
+        """
+        store = cls(columns, capacity=0)
+        store._data = data
+        store._size = len(data)
+        store._prefix = {name: array('d', prefix) for name, prefix in (running_sums or {}).items()}
+        return store
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, name):
+        return self._data[:self._size, self._index[name]]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def keys(self):
+        return list(self.columns)
+
+    def column_index(self, name):
+        return self._index[name]
+
+    def next_row(self):
+        """Reserva la siguiente fila y devuelve una vista escribible sobre ella"""
+        if self._size == len(self._data):
+            grown = np.zeros((max(64, len(self._data) * 2), len(self.columns)))
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        row = self._data[self._size]
+        self._size += 1
+        return row
+
+    def append(self, values):
+        self.next_row()[:] = values
+
+    def rows(self, start=0, stop=None):
+        """Vista de las filas [start, stop) con todas las columnas"""
+        return self._data[:self._size][start:stop]
+
+    def window_sum(self, name, start, stop=None):
+        """Suma de la columna en las filas [start, stop) (admite índices negativos)"""
+        prefix = self._prefix[name]
+        column = self._index[name]
+        start, stop, _ = slice(start, stop).indices(self._size)
+        # Las filas se escriben después de reservarse, así que se acumulan al consultar
+        # (sólo hasta la ventana pedida: otro hilo puede estar escribiendo las siguientes)
+        for row in range(len(prefix) - 1, max(stop, start)):
+            prefix.append(prefix[-1] + float(self._data[row, column]))
+        return prefix[max(stop, start)] - prefix[start]
+
+    def _blocks(self, name, stop, block=EXTREMA_BLOCK):
+        """Mínimo, máximo y sus filas de cada bloque completo de block filas antes de stop.
+
+        Se agregan a medida que el historial crece (al consultar, como las sumas
+        acumuladas) y sólo hasta stop: otro hilo puede estar escribiendo las siguientes.
+        """
+        mins, maxs, argmins, argmaxs = self._extrema.setdefault(
+            (name, block), (array('d'), array('d'), array('q'), array('q')))
+        complete = stop // block
+        if len(mins) < complete:
+            first = len(mins)
+            blocks = self[name][first * block:complete * block].reshape(-1, block)
+            offsets = np.arange(first, complete) * block
+            mins.extend(blocks.min(axis=1).tolist())
+            maxs.extend(blocks.max(axis=1).tolist())
+            argmins.extend((offsets + blocks.argmin(axis=1)).tolist())
+            argmaxs.extend((offsets + blocks.argmax(axis=1)).tolist())
+        return mins, maxs, argmins, argmaxs
+
+    def window_extrema(self, name, start, stop=None):
+        """(mínimo, máximo) de la columna en las filas [start, stop) sin recorrer la ventana.
+
+        Se combinan los extremos guardados de cada bloque completo de
+        EXTREMA_BLOCK filas; de la ventana sólo se recorren fila a fila los
+        bordes que no llenan un bloque.
+        """
+        column = self[name]
+        start, stop, _ = slice(start, stop).indices(self._size)
+        if stop <= start:
+            raise ValueError("Ventana vacía")
+        mins, maxs, _, _ = self._blocks(name, stop)
+        first, last = -(-start // EXTREMA_BLOCK), stop // EXTREMA_BLOCK
+        if first >= last:
+            window = column[start:stop]
+            return float(window.min()), float(window.max())
+        edges = np.concatenate([column[start:first * EXTREMA_BLOCK], column[last * EXTREMA_BLOCK:stop]])
+        low, high = min(mins[first:last]), max(maxs[first:last])
+        if len(edges):
+            low, high = min(low, float(edges.min())), max(high, float(edges.max()))
+        return low, high
+
+    def extreme_rows(self, name, start, stop=None, block=EXTREMA_BLOCK):
+        """Filas de [start, stop) que conservan la forma de la columna al dibujarla.
+
+        De cada bloque completo de block filas, las de su mínimo y su máximo
+        (guardadas como en window_extrema); de los bordes que no llenan un
+        bloque, todas. Si cada bloque cae en un píxel, el trazo no cambia.
+        """
+        start, stop, _ = slice(start, stop).indices(self._size)
+        stop = max(stop, start)
+        _, _, argmins, argmaxs = self._blocks(name, stop, block)
+        first, last = -(-start // block), stop // block
+        if first >= last:
+            return np.arange(start, stop)
+        extremes = np.column_stack([np.frombuffer(argmins[first:last], dtype=np.int64),
+                                    np.frombuffer(argmaxs[first:last], dtype=np.int64)])
+        # min y max de cada bloque en el orden en que aparecen
+        extremes.sort(axis=1)
+        return np.concatenate([np.arange(start, first * block), extremes.ravel(),
+                               np.arange(last * block, stop)])
+
+    def running_sums(self):
+        """Sumas acumuladas al día de las columnas con promedios móviles"""
+        for name in self._prefix:
+            self.window_sum(name, 0)
+        return {name: np.array(prefix, dtype=np.float64) for name, prefix in self._prefix.items()}
+
+    def clear(self):
+        self._size = 0
+        for prefix in self._prefix.values():
+            del prefix[1:]
+        self._extrema.clear()
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+
+class HistorySubset:
+    """Vista de sólo lectura de algunas columnas de un HistoryStore con otros nombres.
+
+    mapping asocia cada nombre local con una columna del almacén; rows()
+    devuelve las columnas en el orden de mapping.
+    """
+
+    def __init__(self, store, mapping):
+        self.store = store
+        self.mapping = dict(mapping)
+        self.columns = list(self.mapping)
+        self._indices = [store.column_index(name) for name in self.mapping.values()]
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, name):
+        return self.store[self.mapping[name]]
+
+    def __contains__(self, name):
+        return name in self.mapping
+
+    def keys(self):
+        return list(self.columns)
+
+    def column_index(self, name):
+        return self.columns.index(name)
+
+    def rows(self, start=0, stop=None):
+        return self.store.rows(start, stop)[:, self._indices]
+
+    def window_sum(self, name, start, stop=None):
+        return self.store.window_sum(self.mapping[name], start, stop)
+
+    def window_extrema(self, name, start, stop=None):
+        return self.store.window_extrema(self.mapping[name], start, stop)
+
+    def extreme_rows(self, name, start, stop=None, block=EXTREMA_BLOCK):
+        return self.store.extreme_rows(self.mapping[name], start, stop, block)
+
+    @property
+    def nbytes(self):
+        return self.store.nbytes
@@ -0,0 +1,90 @@
+"""Tabla virtualizada: sólo existen (y se formatean) las filas visibles."""
+
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTable:
+    """ttk.Treeview con un número fijo de filas que se rellenan desde una fuente de datos.
+
+    row_count() devuelve cuántas filas hay y row_values(i) los textos de la fila i;
+    sólo se llama a row_values para las filas que entran en la ventana visible.
+    """
+
+    def __init__(self, parent, row_count, row_values, height=10):
+        self.row_count = row_count
+        self.row_values = row_values
+        self.height = height
+        self.offset = 0
+        self.follow_tail = True
+
+        self.frame = tk.Frame(parent, bg="white")
+        self.scrollbar = ttk.Scrollbar(self.frame, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        style = ttk.Style(self.frame)
+        style.configure("History.Treeview", font=("Courier", 9), rowheight=18,
+                        background="#f8fafc", fieldbackground="#f8fafc", foreground="#1e293b")
+        style.configure("History.Treeview.Heading", font=("Courier", 9, "bold"))
+        self.tree = ttk.Treeview(self.frame, show="headings", height=height,
+                                 style="History.Treeview", selectmode="none")
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_mouse_wheel)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def set_columns(self, columns):
+        """columns: lista de (encabezado, ancho en píxeles)"""
+        ids = [f"c{i}" for i in range(len(columns))]
+        self.tree.delete(*self.tree.get_children())
+        self.tree.configure(columns=ids)
+        for column_id, (heading, width) in zip(ids, columns):
+            self.tree.heading(column_id, text=heading, anchor=tk.E)
+            self.tree.column(column_id, width=width, minwidth=width, anchor=tk.E, stretch=False)
+        # Las filas de la ventana se crean una vez y luego sólo cambian sus valores
+        self.rows = [self.tree.insert("", tk.END, values=()) for _ in range(self.height)]
+        self.offset = 0
+        self.follow_tail = True
+        self.refresh()
+
+    def max_offset(self):
+        return max(0, self.row_count() - self.height)
+
+    def refresh(self):
+        """Vuelve a leer las filas visibles desde la fuente de datos"""
+        total = self.row_count()
+        if self.follow_tail:
+            self.offset = self.max_offset()
+        self.offset = min(self.offset, self.max_offset())
+
+        for slot, item in enumerate(self.rows):
+            index = self.offset + slot
+            self.tree.item(item, values=self.row_values(index) if index < total else ())
+
+        if total <= self.height:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.height) / total)
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(int(offset), self.max_offset()))
+        self.follow_tail = self.offset >= self.max_offset()
+        self.refresh()
+
+    def yview(self, *args):
+        # Protocolo de ttk.Scrollbar: ("moveto", fracción) o ("scroll", n, "units"/"pages")
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.row_count())
+        elif args[0] == "scroll":
+            step = self.height if args[2] == "pages" else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def on_mouse_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.offset - 3)
+        else:
+            self.scroll_to(self.offset + 3)
+        return "break"
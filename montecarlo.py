@@ -0,0 +1,117 @@
+"""Modo estocástico: réplicas Monte Carlo con sorteos multinomiales vectorizados.
+
+Ejemplo:
+    python montecarlo.py --replications 100000 --horizon 30
+"""
+
+import argparse
+
+import numpy as np
+
+from flow_engine import DEFAULT_PARAMS, ROOM_CAPACITY
+from transition import year_rates
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+
+class MonteCarloResult:
+    """Bandas de percentiles por año simulado (forma: años x percentiles [x años de estudio])"""
+
+    def __init__(self, percentiles, enrollment, total_enrolled, rooms, total_rooms, graduated, dropped):
+        self.percentiles = tuple(percentiles)
+        self.enrollment = enrollment
+        self.total_enrolled = total_enrolled
+        self.rooms = rooms
+        self.total_rooms = total_rooms
+        self.graduated = graduated
+        self.dropped = dropped
+
+    def band(self, percentile):
+        """Índice de un percentil dentro de las bandas"""
+        return self.percentiles.index(percentile)
+
+
+class MonteCarlo:
+    """R réplicas enteras del flujo avanzadas como un único lote de arreglos (R x años)"""
+
+    def __init__(self, params, replications=1000, seed=None):
+        self.params = dict(params)
+        self.replications = replications
+        self.rng = np.random.default_rng(seed)
+        rates = np.array(year_rates(self.params))
+        self.pass_rates = rates[:, 0]
+        # Entre quienes no pasan, probabilidad de repetir (el resto abandona)
+        stay = rates[:, 1] + rates[:, 2]
+        self.repeat_given_fail = np.divide(rates[:, 1], stay, out=np.zeros_like(stay), where=stay > 0)
+        self.reset()
+
+    def reset(self):
+        total_years = len(self.pass_rates)
+        self.year = 0
+        self.students = np.zeros((self.replications, total_years), dtype=np.int64)
+        self.repeaters = np.zeros_like(self.students)
+        self.graduated = np.zeros(self.replications, dtype=np.int64)
+        self.dropped = np.zeros(self.replications, dtype=np.int64)
+
+    def step(self):
+        """Avanza un año en todas las réplicas: pasa ~ Bin(n, a), repite ~ Bin(n - pasa, c / (b + c))"""
+        students = self.students
+        passed = self.rng.binomial(students, self.pass_rates)
+        failed = students - passed
+        repeated = self.rng.binomial(failed, self.repeat_given_fail)
+
+        new_students = repeated.copy()
+        new_students[:, 0] += int(round(self.params['x']))
+        new_students[:, 1:] += passed[:, :-1]
+
+        self.graduated += passed[:, -1]
+        self.dropped += (failed - repeated).sum(axis=1)
+        self.students = new_students
+        self.repeaters = repeated
+        self.year += 1
+
+    def run(self, horizon, percentiles=DEFAULT_PERCENTILES):
+        """Simula horizon años y devuelve las bandas de percentiles de cada año"""
+        total_years = self.students.shape[1]
+        enrollment = np.empty((horizon, len(percentiles), total_years))
+        rooms = np.empty_like(enrollment)
+        total_rooms = np.empty((horizon, len(percentiles)))
+        total_enrolled = np.empty_like(total_rooms)
+        graduated = np.empty_like(total_rooms)
+        dropped = np.empty_like(total_rooms)
+
+        for t in range(horizon):
+            self.step()
+            room_draws = -(-self.students // ROOM_CAPACITY)  # ceil entero
+            enrollment[t] = np.percentile(self.students, percentiles, axis=0)
+            total_enrolled[t] = np.percentile(self.students.sum(axis=1), percentiles)
+            # Salas enteras: el percentil se redondea hacia la réplica de arriba, nunca por debajo
+            rooms[t] = np.percentile(room_draws, percentiles, axis=0, method='higher')
+            total_rooms[t] = np.percentile(room_draws.sum(axis=1), percentiles, method='higher')
+            graduated[t] = np.percentile(self.graduated, percentiles)
+            dropped[t] = np.percentile(self.dropped, percentiles)
+
+        return MonteCarloResult(percentiles, enrollment, total_enrolled, rooms, total_rooms, graduated, dropped)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación Monte Carlo del flujo de estudiantes")
+    for key, value in DEFAULT_PARAMS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, default=value,
+                            type=int if key == 'total_years' else float)
+    parser.add_argument("--replications", type=int, default=10000, help="réplicas simuladas")
+    parser.add_argument("--horizon", type=int, default=30, help="años simulados")
+    parser.add_argument("--seed", type=int, default=None, help="semilla del generador aleatorio")
+    args = parser.parse_args(argv)
+
+    params = {key: getattr(args, key) for key in DEFAULT_PARAMS}
+    result = MonteCarlo(params, args.replications, args.seed).run(args.horizon)
+    p50, p95 = result.band(50), result.band(95)
+    print(f"{'Año':>4} | {'Matr. p50':>9} | {'Matr. p95':>9} | {'Salas p50':>9} | {'Salas p95':>9}")
+    for t in range(args.horizon):
+        print(f"{t + 1:>4} | {result.total_enrolled[t, p50]:>9.0f} | {result.total_enrolled[t, p95]:>9.0f} | "
+              f"{result.total_rooms[t, p50]:>9.0f} | {result.total_rooms[t, p95]:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
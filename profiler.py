@@ -0,0 +1,107 @@
+"""Instrumentación opcional del ciclo de simulación y pintado."""
+
+import json
+import time
+import tkinter as tk
+from collections import deque
+from contextlib import contextmanager
+
+
+class Profiler:
+    """Cronometra fases con nombre y lleva contadores; desactivado no mide nada.
+
+    Cada fase guarda sus últimas `window` duraciones para calcular p50/p99
+    móviles, de modo que las estadísticas reflejan el comportamiento reciente
+    y no todo el historial de la sesión.
+    """
+
+    def __init__(self, window=256, enabled=False):
+        self.window = window
+        self.enabled = enabled
+        self.samples = {}
+        self.counters = {}
+
+    def reset(self):
+        self.samples.clear()
+        self.counters.clear()
+
+    def record(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @staticmethod
+    def percentile(ordered, p):
+        # Rango más cercano: sin interpolar, siempre una muestra real
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def stats(self):
+        """{fase: {'n', 'last_ms', 'p50_ms', 'p99_ms'}} sobre la ventana móvil"""
+        result = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[name] = {
+                'n': len(samples),
+                'last_ms': samples[-1] * 1000,
+                'p50_ms': self.percentile(ordered, 50) * 1000,
+                'p99_ms': self.percentile(ordered, 99) * 1000,
+            }
+        return result
+
+    def summary(self):
+        """Texto de una fase por línea, de la más lenta (p99) a la más rápida"""
+        stats = self.stats()
+        lines = [f"{'fase':<22}{'p50 ms':>9}{'p99 ms':>9}"]
+        for name, s in sorted(stats.items(), key=lambda item: -item[1]['p99_ms']):
+            lines.append(f"{name:<22}{s['p50_ms']:>9.2f}{s['p99_ms']:>9.2f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<22}{value:>18}")
+        return "\n".join(lines)
+
+    def export(self, path):
+        """Guarda estadísticas, contadores y muestras crudas en JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+                'window': self.window,
+                'stats': self.stats(),
+                'counters': self.counters,
+                'samples_ms': {name: [s * 1000 for s in samples] for name, samples in self.samples.items()},
+            }, f, indent=2, ensure_ascii=False)
+
+
+class CountingCanvas(tk.Canvas):
+    """Canvas que cuenta los ítems creados y borrados en un Profiler"""
+
+    def __init__(self, parent, profiler, name="canvas", **kwargs):
+        super().__init__(parent, **kwargs)
+        self.profiler = profiler
+        self.counter_name = name
+
+    def _create(self, itemType, args, kw):
+        self.profiler.count(f"{self.counter_name}.created")
+        return super()._create(itemType, args, kw)
+
+    def delete(self, *args):
+        if self.profiler.enabled:
+            items = set()
+            for tag in args:
+                items.update(self.find_withtag(tag))
+            self.profiler.count(f"{self.counter_name}.deleted", len(items))
+        super().delete(*args)
@@ -0,0 +1,62 @@
+"""Planificador de redibujado: separa la velocidad de simulación de la de pintado."""
+
+
+class RenderScheduler:
+    """Redibuja sólo los paneles sucios y visibles, como mucho una vez por cuadro.
+
+    Cada panel declara de qué datos depende ('state', 'params', 'history', ...);
+    invalidate() marca sucios los paneles afectados y agenda un único cuadro con
+    root.after. Los paneles fuera de la zona visible quedan sucios hasta que el
+    usuario se desplaza hasta ellos. Con un Profiler activo cada panel se
+    cronometra como la fase 'render.<nombre>'.
+    """
+
+    def __init__(self, root, viewport=None, frame_ms=33, profiler=None):
+        self.root = root
+        self.viewport = viewport
+        self.frame_ms = frame_ms
+        self.profiler = profiler
+        self.panels = {}
+        self.dirty = set()
+        self._pending = None
+
+    def register(self, name, callback, depends_on, widget=None):
+        """widget es el contenedor del panel para saber si está a la vista (None = siempre)"""
+        self.panels[name] = (callback, frozenset(depends_on), widget)
+        self.dirty.add(name)
+
+    def invalidate(self, *keys):
+        for name, (_, depends_on, _) in self.panels.items():
+            if depends_on.intersection(keys):
+                self.dirty.add(name)
+        self.schedule()
+
+    def schedule(self):
+        if self._pending is None and self.dirty:
+            self._pending = self.root.after(self.frame_ms, self.flush)
+
+    def flush(self):
+        """Pinta ahora los paneles sucios que estén a la vista"""
+        if self._pending is not None:
+            self.root.after_cancel(self._pending)
+            self._pending = None
+        for name, (callback, _, widget) in self.panels.items():
+            if name in self.dirty and self.is_visible(widget):
+                self.dirty.discard(name)
+                if self.profiler is not None and self.profiler.enabled:
+                    with self.profiler.phase(f"render.{name}"):
+                        callback()
+                else:
+                    callback()
+
+    def is_visible(self, widget):
+        if widget is None:
+            return True
+        if not widget.winfo_ismapped():
+            return False
+        if self.viewport is None:
+            return True
+        top = self.viewport.winfo_rooty()
+        bottom = top + self.viewport.winfo_height()
+        widget_top = widget.winfo_rooty()
+        return widget_top < bottom and widget_top + widget.winfo_height() > top
@@ -0,0 +1,130 @@
+"""Escenarios con nombre simulados juntos y guardados en caché para compararlos."""
+
+import hashlib
+import json
+import math
+
+import numpy as np
+
+from flow_engine import DEFAULT_PARAMS, ROOM_CAPACITY, FlowEngine
+from transition import BatchTransitionModel
+
+
+def scenario_key(params, schedule=None, horizon=None):
+    """Huella de los parámetros (y el cronograma): escenarios iguales comparten resultado"""
+    payload = {
+        'params': {key: float(params[key]) for key in sorted(DEFAULT_PARAMS)},
+        'schedule': schedule.changes if schedule else None,
+        'horizon': horizon,
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ScenarioResult:
+    """Trayectoria completa de un escenario, años 0..horizonte (una fila por año)"""
+
+    def __init__(self, students, graduated, dropped, room_capacity=ROOM_CAPACITY):
+        self.students = students
+        self.graduated = graduated
+        self.dropped = dropped
+        self.total = students.sum(axis=1)
+        self.rooms = np.ceil(students / room_capacity).sum(axis=1).astype(int)
+
+    @property
+    def horizon(self):
+        return len(self.total) - 1
+
+
+class ScenarioWorkspace:
+    """Escenarios con nombre que conviven en memoria.
+
+    results() simula en una sola pasada por lotes todos los escenarios que no
+    están en caché (los que tienen cronograma se simulan aparte); la caché se
+    indexa por huella de parámetros, así que renombrar, ocultar o volver a
+    mostrar un escenario nunca vuelve a simularlo.
+    """
+
+    def __init__(self, horizon=50):
+        self.horizon = horizon
+        self.scenarios = {}
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.scenarios)
+
+    def __contains__(self, name):
+        return name in self.scenarios
+
+    def names(self):
+        return list(self.scenarios)
+
+    def add(self, name, params, schedule=None):
+        params = dict(DEFAULT_PARAMS, **params)
+        params['total_years'] = int(params['total_years'])
+        self.scenarios[name] = (params, schedule, scenario_key(params, schedule, self.horizon))
+
+    def remove(self, name):
+        del self.scenarios[name]
+
+    def key(self, name):
+        return self.scenarios[name][2]
+
+    def results(self, names=None):
+        """{nombre: ScenarioResult} de los escenarios pedidos (todos por defecto)"""
+        names = self.names() if names is None else list(names)
+        pending = {}
+        for name in names:
+            params, schedule, key = self.scenarios[name]
+            if key not in self.cache:
+                pending[key] = (params, schedule)
+
+        plain = [(key, params) for key, (params, schedule) in pending.items() if schedule is None]
+        if plain:
+            self._simulate_batch(plain)
+        for key, (params, schedule) in pending.items():
+            if schedule is not None:
+                self.cache[key] = self._simulate_schedule(params, schedule)
+        return {name: self.cache[self.key(name)] for name in names}
+
+    def _simulate_batch(self, entries):
+        model = BatchTransitionModel([params for _, params in entries], pad=True)
+        total_years = model.total_years
+        states = model.initial_state()
+        trajectory = np.empty((self.horizon + 1,) + states.shape)
+        trajectory[0] = states
+        for t in range(self.horizon):
+            states = model.step(states)
+            trajectory[t + 1] = states
+        for index, (key, params) in enumerate(entries):
+            self.cache[key] = ScenarioResult(trajectory[:, index, :params['total_years']].copy(),
+                                             trajectory[:, index, total_years].copy(),
+                                             trajectory[:, index, total_years + 1].copy())
+
+    def _simulate_schedule(self, params, schedule):
+        engine = FlowEngine(params, vectorized=True, schedule=schedule)
+        engine.run(self.horizon)
+        total_years = params['total_years']
+        rows = engine.history.rows()
+        students = np.vstack([rows[:, 1:total_years + 1], engine.students_per_year])
+        graduated = np.append(engine.history['graduated'], engine.total_graduated)
+        dropped = np.append(engine.history['dropped'], engine.total_dropped)
+        return ScenarioResult(students, graduated, dropped)
+
+
+def compare_results(results, year):
+    """Filas (nombre, matrícula, graduados, abandonos, salas) en el año indicado, con el
+    primer escenario como referencia para las diferencias"""
+    rows = []
+    for name, result in results.items():
+        t = min(year, result.horizon)
+        rows.append((name, float(result.total[t]), float(result.graduated[t]),
+                     float(result.dropped[t]), int(result.rooms[t])))
+    return rows
+
+
+def format_delta(value, reference):
+    """Diferencia con signo y porcentaje respecto de la referencia"""
+    delta = value - reference
+    if reference == 0 or math.isclose(delta, 0, abs_tol=0.5):
+        return f"{delta:+.0f}"
+    return f"{delta:+.0f} ({delta / reference * 100:+.1f}%)"
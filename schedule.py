@@ -0,0 +1,109 @@
+"""Parámetros que cambian con los años: cronogramas leídos desde CSV o JSON.
+
+Cada fila (o elemento de la lista JSON) es un cambio que rige desde su año
+en adelante; los parámetros que no menciona conservan su valor anterior.
+x_growth es el crecimiento anual de los ingresos en %, compuesto año a año.
+
+    year,x,x_growth,b1,c1
+    0,100,3,,
+    5,,,12,28
+
+    [{"year": 0, "x": 100, "x_growth": 3}, {"year": 5, "b1": 12, "c1": 28}]
+"""
+
+import bisect
+import csv
+import json
+
+from transition import TransitionModel, year_rates
+
+# La duración de la carrera no puede cambiar: define la forma del estado
+SCHEDULE_KEYS = ('x', 'a1', 'b1', 'c1', 'ai', 'bi', 'ci', 'x_growth')
+
+
+def load_schedule(path):
+    """Lee un cronograma CSV o JSON (según la extensión)"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".json"):
+            changes = json.load(f)
+            if not isinstance(changes, list):
+                raise ValueError("El cronograma JSON debe ser una lista de cambios")
+        else:
+            # Las celdas vacías no cambian el parámetro
+            changes = [{key: value for key, value in row.items() if value not in ("", None)}
+                       for row in csv.DictReader(f)]
+    return ParameterSchedule(changes)
+
+
+class ParameterSchedule:
+    """Lista de cambios de parámetros, cada uno vigente desde su año"""
+
+    def __init__(self, changes=()):
+        self.changes = []
+        for change in changes:
+            change = dict(change)
+            try:
+                year = int(change.pop('year'))
+            except KeyError:
+                raise ValueError("Cada cambio del cronograma necesita la columna 'year'")
+            unknown = set(change) - set(SCHEDULE_KEYS)
+            if unknown:
+                raise ValueError(f"Parámetros desconocidos en el cronograma: {', '.join(sorted(unknown))}")
+            if year < 0:
+                raise ValueError("Los años del cronograma no pueden ser negativos")
+            self.changes.append((year, {key: float(value) for key, value in change.items()}))
+        self.changes.sort(key=lambda change: change[0])
+
+    def __len__(self):
+        return len(self.changes)
+
+    def compile(self, params):
+        """Tramos constantes a partir de los parámetros base (vigentes en el año 0)"""
+        return CompiledSchedule(params, self.changes)
+
+
+class CompiledSchedule:
+    """Cronograma resuelto en tramos: dentro de cada tramo las tasas son constantes
+    y los ingresos crecen geométricamente, así que un tramo entero se puede
+    saltar con una sola potencia de matriz.
+
+    starts[k] es el primer año del tramo k y ends[k] el primero del siguiente;
+    rates[k], intakes[k] (ingresos en el año starts[k]) y growth[k] (factor
+    anual) se consultan por índice, sin diccionarios en cada paso.
+    """
+
+    def __init__(self, params, changes):
+        current = dict(params, x_growth=0.0)
+        self.starts, self.params, self.intakes = [], [], []
+        for year, change in [(0, {})] + list(changes):
+            if self.starts:
+                # Ingresos al comienzo del tramo, continuando el crecimiento del anterior
+                current['x'] = self.intakes[-1] * (1 + current['x_growth'] / 100) ** (year - self.starts[-1])
+            current.update(change)
+            if self.starts and self.starts[-1] == year:
+                self.starts.pop()
+                self.params.pop()
+                self.intakes.pop()
+            self.starts.append(year)
+            self.params.append(dict(current))
+            self.intakes.append(current['x'])
+        self.ends = self.starts[1:] + [float('inf')]
+        self.rates = [year_rates(params) for params in self.params]
+        self.growth = [1 + params['x_growth'] / 100 for params in self.params]
+        self._models = [None] * len(self.starts)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def segment_at(self, year):
+        return bisect.bisect_right(self.starts, year) - 1
+
+    def intake_at(self, year):
+        index = self.segment_at(year)
+        return self.intakes[index] * self.growth[index] ** (year - self.starts[index])
+
+    def model(self, index):
+        """Modelo de transición del tramo (se construye la primera vez que se usa)"""
+        if self._models[index] is None:
+            self._models[index] = TransitionModel(self.params[index])
+        return self._models[index]
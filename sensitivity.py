@@ -0,0 +1,168 @@
+"""Sensibilidad analítica de los resultados respecto de cada parámetro.
+
+El flujo es lineal en las tasas: estado' = M(θ) estado + x e0, con M afín en
+a1, b1, c1, ai, bi, ci. Las derivadas exactas salen de propagar tangentes
+junto con el estado (horizonte finito) o de un solo sistema lineal con una
+columna por parámetro (régimen estable), sin volver a simular con
+parámetros perturbados.
+
+Ejemplo:
+    python sensitivity.py --horizon 30 --b1 25 --c1 15
+"""
+
+import argparse
+
+import numpy as np
+
+from flow_engine import DEFAULT_PARAMS
+from transition import build_matrix
+
+PARAMETERS = ('x', 'a1', 'b1', 'c1', 'ai', 'bi', 'ci')
+
+OUTPUT_LABELS = {
+    'students': "Matrícula total",
+    'peak_year': "Año de estudio más numeroso",
+    'graduates': "Graduados por año",
+    'dropouts': "Abandonos por año",
+    'graduation_probability': "Probabilidad de graduación",
+    'peak_students': "Matrícula máxima del horizonte",
+    'graduated': "Graduados acumulados",
+    'dropped': "Abandonos acumulados",
+}
+
+
+def matrix_derivatives(params):
+    """Derivadas de la matriz (P, n, n) y de los ingresos (P, n) respecto de PARAMETERS.
+
+    La matriz es afín en las tasas, así que cada derivada es constante: la
+    parte que aporta un parámetro en 100% (sin los demás) dividida por 100.
+    """
+    empty = dict(params, **{key: 0 for key in PARAMETERS})
+    base, _ = build_matrix(empty)
+    size = len(base)
+    d_matrix = np.zeros((len(PARAMETERS), size, size))
+    d_intake = np.zeros((len(PARAMETERS), size))
+    d_intake[0, 0] = 1
+    for p, key in enumerate(PARAMETERS[1:], start=1):
+        matrix, _ = build_matrix(dict(empty, **{key: 100}))
+        d_matrix[p] = (matrix - base) / 100
+    return d_matrix, d_intake
+
+
+class Sensitivity:
+    """Valor y gradiente (uno por parámetro de PARAMETERS) de cada resultado.
+
+    steady: régimen estable (matrícula, año más numeroso, graduados y
+    abandonos por año, probabilidad de graduación). horizon: simulación de
+    horizon años desde cero (matrícula final y máxima, graduados y abandonos
+    acumulados).
+    """
+
+    def __init__(self, params, horizon=None):
+        self.params = dict(DEFAULT_PARAMS, **params)
+        self.total_years = int(self.params['total_years'])
+        self.matrix, self.intake = build_matrix(self.params)
+        self.d_matrix, self.d_intake = matrix_derivatives(self.params)
+        self.steady = self._steady_state()
+        self.horizon = horizon
+        self.transient = self._propagate(horizon) if horizon else {}
+
+    def _steady_state(self):
+        T = self.total_years
+        transient = self.matrix[:T, :T]
+        system = np.eye(T) - transient
+        if np.any(np.diagonal(transient) >= 1):
+            return {}
+        # s* = (I - Q)^-1 x e0  =>  ds* = (I - Q)^-1 (dQ s* + dx e0): un solo sistema con P columnas
+        equilibrium = np.linalg.solve(system, self.intake[:T])
+        rhs = self.d_matrix[:, :T, :T] @ equilibrium + self.d_intake[:, :T]
+        d_equilibrium = np.linalg.solve(system, rhs.T)
+
+        graduated_row, dropped_row = self.matrix[T, :T], self.matrix[T + 1, :T]
+        d_graduated_row, d_dropped_row = self.d_matrix[:, T, :T], self.d_matrix[:, T + 1, :T]
+        graduates = graduated_row @ equilibrium
+        d_graduates = d_graduated_row @ equilibrium + graduated_row @ d_equilibrium
+        peak = int(np.argmax(equilibrium))
+        outputs = {
+            'students': (equilibrium.sum(), d_equilibrium.sum(axis=0)),
+            'peak_year': (equilibrium[peak], d_equilibrium[peak]),
+            'graduates': (graduates, d_graduates),
+            'dropouts': (dropped_row @ equilibrium, d_dropped_row @ equilibrium + dropped_row @ d_equilibrium),
+        }
+        x = self.params['x']
+        if x > 0:
+            # P(graduarse) = graduados por año / ingresos
+            outputs['graduation_probability'] = (graduates / x, (d_graduates - graduates / x * self.d_intake[:, 0]) / x)
+        return {name: (float(value), np.asarray(gradient, dtype=float)) for name, (value, gradient) in outputs.items()}
+
+    def _propagate(self, horizon):
+        """Propagación hacia adelante: el estado y sus P tangentes avanzan juntos"""
+        T = self.total_years
+        state = np.zeros(len(self.intake))
+        tangent = np.zeros((len(self.intake), len(PARAMETERS)))
+        peak, d_peak = 0.0, np.zeros(len(PARAMETERS))
+        for _ in range(horizon):
+            tangent = self.matrix @ tangent + (self.d_matrix @ state).T + self.d_intake.T
+            state = self.matrix @ state + self.intake
+            total = state[:T].sum()
+            if total > peak:
+                peak, d_peak = total, tangent[:T].sum(axis=0)
+        outputs = {
+            'students': (state[:T].sum(), tangent[:T].sum(axis=0)),
+            'peak_students': (peak, d_peak),
+            'graduated': (state[T], tangent[T]),
+            'dropped': (state[T + 1], tangent[T + 1]),
+        }
+        return {name: (float(value), np.asarray(gradient, dtype=float)) for name, (value, gradient) in outputs.items()}
+
+    def output(self, name, steady=True):
+        outputs = self.steady if steady else self.transient
+        return outputs[name]
+
+    def elasticities(self, name, steady=True):
+        """Cambio porcentual del resultado por cada 1% de cambio en el parámetro"""
+        value, gradient = self.output(name, steady)
+        if value == 0:
+            return np.zeros(len(PARAMETERS))
+        return gradient * np.array([self.params[key] for key in PARAMETERS]) / value
+
+    def ranking(self, name, steady=True):
+        """[(parámetro, derivada, elasticidad)] de mayor a menor efecto"""
+        _, gradient = self.output(name, steady)
+        elasticities = self.elasticities(name, steady)
+        order = np.argsort(-np.abs(elasticities), kind='stable')
+        return [(PARAMETERS[p], float(gradient[p]), float(elasticities[p])) for p in order]
+
+
+def tornado(sensitivity, name, steady=True, width=14):
+    """Diagrama de tornado en texto: barras por elasticidad, de la más larga a la más corta"""
+    ranking = sensitivity.ranking(name, steady)
+    largest = max(abs(elasticity) for _, _, elasticity in ranking) or 1
+    lines = []
+    for key, derivative, elasticity in ranking:
+        bar = "█" * round(abs(elasticity) / largest * width)
+        left, right = (bar, "") if elasticity < 0 else ("", bar)
+        unit = "alumno" if key == 'x' else "punto"
+        lines.append(f"   {key:>2} {left:>{width}}│{right:<{width}} {elasticity:+.2f}%  ({derivative:+.2f} por {unit})")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sensibilidad de los resultados respecto de cada parámetro")
+    parser.add_argument("--horizon", type=int, default=None, help="años simulados (además del régimen estable)")
+    for key in DEFAULT_PARAMS:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, default=DEFAULT_PARAMS[key],
+                            type=int if key == 'total_years' else float)
+    args = parser.parse_args(argv)
+
+    sensitivity = Sensitivity({key: getattr(args, key) for key in DEFAULT_PARAMS}, args.horizon)
+    for steady, outputs in ((True, sensitivity.steady), (False, sensitivity.transient)):
+        for name, (value, _) in outputs.items():
+            where = "régimen estable" if steady else f"año {args.horizon}"
+            print(f"{OUTPUT_LABELS[name]} ({where}): {value:.4g}")
+            print("\n".join(tornado(sensitivity, name, steady)))
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Barrido de parámetros en paralelo sobre un pool de procesos.
+
+Ejemplo:
+    python sweep.py --a1 50:70:5 --c1 10:30:5 --x 80,100,120 --horizon 30 -o barrido.csv
+"""
+
+import argparse
+import csv
+import itertools
+import math
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from flow_engine import DEFAULT_PARAMS, ROOM_CAPACITY
+from transition import BatchTransitionModel
+
+PARAM_KEYS = ['x', 'a1', 'b1', 'c1', 'ai', 'bi', 'ci', 'total_years']
+RESULT_KEYS = PARAM_KEYS + ['peak_rooms', 'graduated', 'dropped', 'enrolled', 'retention']
+
+
+def parse_values(text):
+    """Convierte '50:70:5' (inclusive) o '80,100,120' en una lista de valores"""
+    if ':' in text:
+        start, stop, step = (float(part) for part in text.split(':'))
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        values = [start + i * step for i in range(count)]
+    else:
+        values = [float(part) for part in text.split(',')]
+    return [int(v) if float(v).is_integer() else v for v in values]
+
+
+def is_valid(params):
+    """Los porcentajes a1+b1+c1 y ai+bi+ci deben sumar 100%"""
+    return (abs(params['a1'] + params['b1'] + params['c1'] - 100) <= 0.1
+            and abs(params['ai'] + params['bi'] + params['ci'] - 100) <= 0.1)
+
+
+def grid_size(grid):
+    """Combinaciones del producto cartesiano, válidas o no"""
+    return math.prod(len(values) for values in grid.values())
+
+
+def expand_grid(grid, base=None):
+    """Producto cartesiano de los valores de grid sobre los parámetros base (sólo las válidas)"""
+    base = dict(base or DEFAULT_PARAMS)
+    keys = list(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        params = dict(base)
+        params.update(zip(keys, values))
+        if is_valid(params):
+            yield params
+
+
+def evaluate_chunk(params_list, horizon):
+    """Simula un bloque de escenarios (agrupados por duración) y devuelve sus resultados"""
+    groups = {}
+    for params in params_list:
+        groups.setdefault(int(params['total_years']), []).append(params)
+
+    rows = []
+    for total_years, group in groups.items():
+        model = BatchTransitionModel(group)
+        states = model.initial_state()
+        peak_rooms = np.zeros(len(group), dtype=int)
+        for _ in range(horizon):
+            states = model.step(states)
+            rooms = np.ceil(states[:, :total_years] / ROOM_CAPACITY).sum(axis=1)
+            np.maximum(peak_rooms, rooms.astype(int), out=peak_rooms)
+
+        enrolled = states[:, :total_years].sum(axis=1)
+        graduated = states[:, total_years]
+        dropped = states[:, total_years + 1]
+        # Retención: % de los ingresados que no abandonó (siguen inscriptos o se graduaron)
+        entered = enrolled + graduated + dropped
+        with np.errstate(invalid='ignore', divide='ignore'):
+            retention = np.where(entered > 0, (enrolled + graduated) / entered * 100, 0.0)
+
+        for i, params in enumerate(group):
+            row = {key: params[key] for key in PARAM_KEYS}
+            row.update(peak_rooms=int(peak_rooms[i]), graduated=float(graduated[i]),
+                       dropped=float(dropped[i]), enrolled=float(enrolled[i]),
+                       retention=float(retention[i]))
+            rows.append(row)
+    return rows
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_sweep(grid, horizon, output, base=None, workers=None, chunk_size=512):
+    """Reparte el barrido en bloques entre procesos y escribe cada resultado al terminar.
+
+    output es un archivo de texto abierto; devuelve la cantidad de escenarios simulados.
+    """
+    writer = csv.DictWriter(output, fieldnames=RESULT_KEYS)
+    writer.writeheader()
+    written = 0
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Sólo unos pocos bloques en vuelo para no materializar toda la grilla
+        pending = set()
+        for chunk in chunked(expand_grid(grid, base), chunk_size):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                written += write_rows(writer, output, done)
+            pending.add(executor.submit(evaluate_chunk, chunk, horizon))
+        written += write_rows(writer, output, wait(pending).done)
+    return written
+
+
+def write_rows(writer, output, futures):
+    written = 0
+    for future in futures:
+        rows = future.result()
+        writer.writerows(rows)
+        written += len(rows)
+    output.flush()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Barrido de parámetros del simulador de flujo de estudiantes. "
+                    "Cada parámetro acepta 'inicio:fin:paso' o una lista 'v1,v2,...'; "
+                    "se descartan las combinaciones cuyos porcentajes no suman 100%.")
+    for key in PARAM_KEYS:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=parse_values,
+                            help=f"valores de {key} (por defecto {DEFAULT_PARAMS[key]})")
+    parser.add_argument("--horizon", type=int, default=30, help="años simulados por escenario")
+    parser.add_argument("-o", "--output", default="-", help="archivo CSV de salida ('-' para stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="procesos en paralelo")
+    parser.add_argument("--chunk-size", type=int, default=512, help="escenarios por bloque")
+    args = parser.parse_args(argv)
+
+    grid = {key: getattr(args, key) for key in PARAM_KEYS if getattr(args, key) is not None}
+    if next(expand_grid(grid), None) is None:
+        parser.error("ninguna combinación tiene porcentajes a1+b1+c1 y ai+bi+ci que sumen 100%; "
+                     "barra también las tasas hermanas (p. ej. --a1 50:70:5 --c1 30:10:-5)")
+    if args.output == "-":
+        count = run_sweep(grid, args.horizon, sys.stdout, workers=args.workers, chunk_size=args.chunk_size)
+    else:
+        with open(args.output, "w", newline="", encoding="utf-8") as output:
+            count = run_sweep(grid, args.horizon, output, workers=args.workers, chunk_size=args.chunk_size)
+    print(f"{count} escenarios simulados", file=sys.stderr)
+    skipped = grid_size(grid) - count
+    if skipped:
+        print(f"{skipped} combinaciones descartadas porque sus porcentajes no suman 100%", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
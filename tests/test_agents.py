@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from agents import ENROLLED, StudentAgents
+from flow_engine import DEFAULT_PARAMS, FlowEngine
+
+
+def test_headcounts_add_up():
+    agents = StudentAgents(dict(DEFAULT_PARAMS, x=250), seed=1)
+    for year in range(1, 61):
+        agents.step()
+        enrolled = int(agents.students_per_year().sum())
+        assert enrolled == len(agents.active())
+        assert enrolled + agents.graduated + agents.dropped == year * 250
+        assert agents.time_to_degree.sum() == agents.graduated
+        assert agents.enrolled_repeat_counts().sum() == enrolled
+
+
+def test_repeaters_and_exits_are_consistent():
+    agents = StudentAgents(dict(DEFAULT_PARAMS, x=400), seed=2)
+    agents.run(80)
+    exits = sum(counts.sum() for counts in agents.repeats_at_exit.values())
+    assert exits == agents.graduated + agents.dropped
+    # Nadie se gradúa antes de cursar la carrera completa
+    assert agents.time_to_degree[:agents.total_years].sum() == 0
+    active = agents.active()
+    assert np.all(agents.status[active] == ENROLLED)
+    assert np.all(agents.study_year[active] < agents.total_years)
+
+
+def test_memory_follows_active_enrollment():
+    agents = StudentAgents(dict(DEFAULT_PARAMS, x=1000), seed=3)
+    agents.run(300)
+    # 300 000 ingresados; los arreglos sólo alojan a los matriculados (más la holgura del crecimiento)
+    assert len(agents.status) < 8 * len(agents.active())
+
+
+def test_same_seed_replays_identically():
+    first = FlowEngine(agents=True, seed=11)
+    second = FlowEngine(agents=True, seed=11)
+    first.run(40)
+    second.run(40)
+    np.testing.assert_array_equal(first.history.rows(), second.history.rows())
+    np.testing.assert_array_equal(first.population.repeats[:first.population.size],
+                                  second.population.repeats[:second.population.size])
+    other = FlowEngine(agents=True, seed=12)
+    other.run(40)
+    assert not np.array_equal(first.history.rows(), other.history.rows())
+
+
+def test_reset_replays_the_seed():
+    engine = FlowEngine(agents=True, seed=5)
+    engine.run(25)
+    rows = engine.history.rows().copy()
+    engine.reset()
+    engine.run(25)
+    np.testing.assert_array_equal(engine.history.rows(), rows)
+
+
+def test_mean_follows_deterministic_model():
+    agents = FlowEngine({'x': 5000}, agents=True, seed=4)
+    deterministic = FlowEngine({'x': 5000}, vectorized=True)
+    agents.run(30)
+    deterministic.run(30)
+    np.testing.assert_allclose(agents.students_per_year, deterministic.students_per_year[:5], rtol=0.05)
+    assert agents.total_graduated == pytest.approx(deterministic.total_graduated, rel=0.05)
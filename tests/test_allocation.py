@@ -0,0 +1,70 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import allocation
+from allocation import Inventory, RoomAllocator, RoomType, cover
+
+
+def brute_force(students, capacities, costs, available):
+    best = None
+    for rooms in itertools.product(*(range(count + 1) for count in available)):
+        rooms = np.array(rooms)
+        if rooms @ capacities >= students:
+            cost = float(rooms @ costs)
+            best = cost if best is None else min(best, cost)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_cover_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    kinds = rng.integers(1, 4)
+    capacities = rng.integers(5, 60, kinds)
+    costs = rng.integers(1, 10, kinds).astype(float)
+    available = rng.integers(0, 6, kinds)
+    for students in range(0, int(capacities @ available) + 20, 7):
+        expected = brute_force(students, capacities, costs, available)
+        solution = cover(students, capacities, costs, available)
+        if expected is None:
+            assert solution is None
+            continue
+        cost, rooms = solution
+        assert cost == pytest.approx(expected)
+        assert np.all(rooms <= available)
+        assert rooms @ capacities >= students
+        assert float(rooms @ costs) == pytest.approx(cost)
+
+
+def inventory(slots=2):
+    return Inventory([RoomType("Aula magna", 120, 2, 5), RoomType("Laboratorio", 24, 6, 3),
+                      RoomType("Seminario", 40, 8, 2)], slots)
+
+
+def test_solve_respects_slot_inventory():
+    allocator = RoomAllocator(inventory())
+    result = allocator.solve([300, 200, 150, 120, 90])
+    assert result.feasible
+    for slot in range(2):
+        used = sum(rooms for rooms, s in zip(result.rooms, result.slots) if s == slot)
+        assert np.all(used <= allocator.inventory.counts)
+    for students, rooms in zip(result.students, result.rooms):
+        assert rooms @ allocator.inventory.capacities >= students
+
+
+def test_warm_start_keeps_slots_and_reports_shortfall():
+    allocator = RoomAllocator(inventory())
+    first = allocator.solve([300, 200, 150, 120, 90])
+    second = allocator.solve([305, 198, 152, 118, 91])
+    assert second.slots == first.slots
+    overflow = allocator.solve([900, 200, 150, 120, 90])
+    assert not overflow.feasible and overflow.unseated[0] > 0
+
+
+def test_cover_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(allocation, 'COVER_CACHE_SIZE', 16)
+    allocator = RoomAllocator(inventory(slots=1))
+    for students in range(100, 400, 3):
+        allocator.solve([students])
+    assert len(allocator._covers) <= 16
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from analytics import AbsorbingChain
+from flow_engine import FlowEngine
+from schedule import ParameterSchedule
+
+PARAMS = [
+    {},
+    {'x': 120, 'a1': 50, 'b1': 30, 'c1': 20, 'ai': 75, 'bi': 10, 'ci': 15, 'total_years': 6},
+]
+
+
+@pytest.mark.parametrize("params", PARAMS, ids=["default", "six-years"])
+def test_equilibrium_matches_long_run(params):
+    chain = AbsorbingChain(dict(FlowEngine(params).params))
+    engine = FlowEngine(params, vectorized=True)
+    engine.run(400)
+    np.testing.assert_allclose(engine.students_per_year[:chain.total_years], chain.equilibrium, rtol=1e-9)
+    before = engine.total_graduated, engine.total_dropped
+    engine.step()
+    assert engine.total_graduated - before[0] == pytest.approx(chain.graduates_per_year)
+    assert engine.total_dropped - before[1] == pytest.approx(chain.dropouts_per_year)
+    assert chain.rooms_per_year() == engine.rooms_per_year()
+
+
+@pytest.mark.parametrize("params", PARAMS, ids=["default", "six-years"])
+def test_single_cohort_matches_per_student_indicators(params):
+    # Un solo ingreso en el año 0: la cohorte recorre la carrera hasta absorberse
+    engine = FlowEngine(params, vectorized=True, schedule=ParameterSchedule([{'year': 1, 'x': 0}]))
+    chain = AbsorbingChain(dict(engine.params))
+    intake = engine.params['x']
+    engine.run(400)
+    assert engine.total_graduated / intake == pytest.approx(chain.graduation_probability)
+    assert engine.total_dropped / intake == pytest.approx(chain.dropout_probability)
+    # Años-alumno de la cohorte: la suma de la matrícula de cada año
+    years_enrolled = engine.history['total'].sum() / intake
+    assert years_enrolled == pytest.approx(chain.expected_years_enrolled)
+    repeats = engine.history.rows()[:, [engine.history.column_index(f'repeaters{i}')
+                                         for i in range(1, chain.total_years + 1)]].sum() / intake
+    assert repeats == pytest.approx(chain.expected_repetitions, rel=1e-6)
+
+
+def test_time_to_degree_matches_agents():
+    params = {'x': 2000, 'total_years': 4}
+    chain = AbsorbingChain(dict(FlowEngine(params).params))
+    engine = FlowEngine(params, agents=True, seed=3, schedule=ParameterSchedule([{'year': 1, 'x': 0}]))
+    engine.run(200)
+    population = engine.population
+    years = np.arange(len(population.time_to_degree))
+    mean = (years * population.time_to_degree).sum() / population.graduated
+    assert mean == pytest.approx(chain.expected_time_to_degree, rel=0.03)
+
+
+def test_full_repetition_has_no_chain():
+    with pytest.raises(ValueError):
+        AbsorbingChain(dict(FlowEngine().params, ai=0, bi=0, ci=100))
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from calibration import ObservedSeries, calibrate
+from flow_engine import DEFAULT_PARAMS, RATE_KEYS, FlowEngine
+
+
+def observed_window(start, stop, noise=0.0):
+    """Serie observada tomada del historial de una corrida por defecto"""
+    engine = FlowEngine(vectorized=True)
+    engine.run(stop + 1)
+    history = engine.history
+    students = np.column_stack([history[f'year{i}'][start:stop] for i in range(1, 6)])
+    if noise:
+        students = students * (1 + np.random.default_rng(0).normal(0, noise, students.shape))
+    graduates = np.diff(history['graduated'][start:stop], prepend=np.nan)
+    return ObservedSeries(students, graduates, history['new_students1'][start:stop])
+
+
+@pytest.mark.parametrize("start, stop", [(10, 25), (25, 40), (40, 55)])
+def test_near_steady_state_recovers_rates(start, stop):
+    result = calibrate(observed_window(start, stop))
+    for key in RATE_KEYS:
+        assert result.params[key] == pytest.approx(DEFAULT_PARAMS[key], abs=1e-3)
+
+
+def test_noisy_near_steady_state_does_not_raise():
+    result = calibrate(observed_window(30, 45, noise=0.03))
+    assert np.isfinite(result.rmse)
+    for triple in (RATE_KEYS[:3], RATE_KEYS[3:]):
+        assert sum(result.params[key] for key in triple) == pytest.approx(100)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from flow_engine import FlowEngine
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {'x': 137, 'a1': 55, 'b1': 25, 'c1': 20, 'ai': 80, 'bi': 5, 'ci': 15, 'total_years': 3},
+    {'x': 90, 'a1': 70, 'b1': 10, 'c1': 20, 'ai': 65, 'bi': 20, 'ci': 15, 'total_years': 8},
+], ids=["default", "short", "long"])
+def test_vectorized_matches_scalar(params):
+    scalar = FlowEngine(params)
+    vectorized = FlowEngine(params, vectorized=True)
+    scalar.run(60)
+    vectorized.run(60)
+    assert scalar.history.keys() == vectorized.history.keys()
+    np.testing.assert_allclose(vectorized.history.rows(), scalar.history.rows(), rtol=1e-9, atol=1e-9)
+    total_years = scalar.params['total_years']
+    np.testing.assert_allclose(vectorized.students_per_year[:total_years], scalar.students_per_year[:total_years])
+    assert vectorized.total_graduated == pytest.approx(scalar.total_graduated)
+    assert vectorized.total_dropped == pytest.approx(scalar.total_dropped)
+
+
+def test_students_are_conserved():
+    engine = FlowEngine(vectorized=True)
+    engine.run(40)
+    assert engine.total_enrolled + engine.total_graduated + engine.total_dropped == pytest.approx(40 * 100)
+
+
+def test_listeners_see_every_year():
+    engine = FlowEngine()
+    seen = []
+    engine.add_listener(lambda e: seen.append(e.year))
+    engine.run(5)
+    assert seen == [1, 2, 3, 4, 5]
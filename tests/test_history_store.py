@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from history_store import EXTREMA_BLOCK, HistoryStore
+
+
+def random_store(size, seed=0):
+    store = HistoryStore(['year', 'total'])
+    values = np.random.default_rng(seed).normal(size=size).cumsum()
+    for year, value in enumerate(values):
+        store.append((year, value))
+    return store
+
+
+@pytest.mark.parametrize("start, stop", [(0, 5000), (100, 4000), (EXTREMA_BLOCK, 3 * EXTREMA_BLOCK), (10, 200)])
+def test_window_extrema_matches_scan(start, stop):
+    store = random_store(5000)
+    window = store['total'][start:stop]
+    assert store.window_extrema('total', start, stop) == (window.min(), window.max())
+
+
+@pytest.mark.parametrize("block", [16, EXTREMA_BLOCK])
+@pytest.mark.parametrize("start, stop", [(0, 5000), (37, 4001), (300, 310)])
+def test_extreme_rows_keep_each_block_extrema(block, start, stop):
+    store = random_store(5000)
+    rows = store.extreme_rows('total', start, stop, block)
+    column = store['total']
+    assert rows[0] >= start and rows[-1] < stop
+    assert np.all(np.diff(rows) >= 0)
+    chosen = set(rows.tolist())
+    for first in range(start, stop, block):
+        # Cada bloque (alineado o de borde) conserva su mínimo y su máximo
+        lo, hi = first - first % block, min(first - first % block + block, stop)
+        lo = max(lo, start)
+        window = column[lo:hi]
+        assert lo + int(np.argmin(window)) in chosen
+        assert lo + int(np.argmax(window)) in chosen
+
+
+def test_extreme_rows_follow_growth():
+    store = random_store(1000)
+    store.extreme_rows('total', 0, None, 16)
+    for year in range(1000, 1100):
+        store.append((year, 1e6 if year == 1050 else 0.0))
+    assert 1050 in store.extreme_rows('total', 0, None, 16)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from campus import CampusEngine
+from flow_engine import FlowEngine
+from schedule import ParameterSchedule
+
+
+def growth_schedule():
+    return ParameterSchedule([{'year': 0, 'x_growth': 3}, {'year': 30, 'b1': 25, 'c1': 15}])
+
+
+def assert_tail_matches(jumped, stepped):
+    """Cada columna del historial saltado coincide con las mismas filas de una corrida completa"""
+    rows = jumped.history.rows()
+    first = int(rows[0, 0])
+    expected = stepped.history.rows(first, first + len(rows))
+    for index, name in enumerate(jumped.history.keys()):
+        np.testing.assert_allclose(rows[:, index], expected[:, index], rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+@pytest.mark.parametrize("schedule", [None, growth_schedule()], ids=["constant", "growth"])
+def test_jump_tail_matches_stepped_run(vectorized, schedule):
+    jumped = FlowEngine(vectorized=vectorized, schedule=schedule)
+    jumped.jump_to(50, history_tail=5)
+    stepped = FlowEngine(vectorized=vectorized, schedule=schedule)
+    stepped.run(50)
+    assert jumped.year == stepped.year
+    assert_tail_matches(jumped, stepped)
+    np.testing.assert_allclose(jumped.repeaters_per_year, stepped.repeaters_per_year)
+    np.testing.assert_allclose(jumped.new_students_per_year, stepped.new_students_per_year)
+
+
+def test_jump_by_one_skipped_year():
+    jumped = FlowEngine(vectorized=True)
+    jumped.jump_to(6, history_tail=5)
+    stepped = FlowEngine(vectorized=True)
+    stepped.run(6)
+    assert_tail_matches(jumped, stepped)
+
+
+def test_campus_jump_tail_matches_stepped_run():
+    programs = {'A': {'x': 100}, 'B': {'x': 50, 'total_years': 4, 'b1': 30, 'c1': 10}}
+    jumped = CampusEngine(programs)
+    jumped.jump_to(40, history_tail=5)
+    stepped = CampusEngine(programs)
+    stepped.run(40)
+    assert_tail_matches(jumped, stepped)
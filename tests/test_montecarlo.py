@@ -0,0 +1,25 @@
+import numpy as np
+
+from flow_engine import ROOM_CAPACITY
+from montecarlo import MonteCarlo
+
+
+def test_room_bands_are_whole_rooms_that_cover_the_draws():
+    model = MonteCarlo({'x': 95, 'a1': 60, 'b1': 20, 'c1': 20, 'ai': 70, 'bi': 15, 'ci': 15, 'total_years': 5},
+                       replications=4000, seed=1)
+    result = model.run(12, percentiles=(50, 95))
+    p95 = result.band(95)
+    assert np.array_equal(result.rooms, np.round(result.rooms))
+    assert np.array_equal(result.total_rooms, np.round(result.total_rooms))
+    # A lo sumo el 5% de las réplicas del último año necesita más salas que la banda p95
+    draws = -(-model.students // ROOM_CAPACITY)
+    assert np.all((draws > result.rooms[-1, p95]).mean(axis=0) <= 0.05)
+    assert (draws.sum(axis=1) > result.total_rooms[-1, p95]).mean() <= 0.05
+
+
+def test_same_seed_replays():
+    params = {'x': 100, 'a1': 60, 'b1': 20, 'c1': 20, 'ai': 70, 'bi': 15, 'ci': 15, 'total_years': 4}
+    first = MonteCarlo(params, replications=500, seed=7).run(10)
+    second = MonteCarlo(params, replications=500, seed=7).run(10)
+    np.testing.assert_array_equal(first.enrollment, second.enrollment)
+    np.testing.assert_array_equal(first.rooms, second.rooms)
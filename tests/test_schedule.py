@@ -0,0 +1,83 @@
+import json
+
+import numpy as np
+import pytest
+
+from flow_engine import DEFAULT_PARAMS, FlowEngine
+from schedule import ParameterSchedule, load_schedule
+from transition import TransitionModel
+
+CHANGES = [{'year': 0, 'x_growth': 3}, {'year': 10, 'b1': 10, 'c1': 30}, {'year': 20, 'x': 200, 'x_growth': 0}]
+
+
+def expected_intake(year):
+    return 100 * 1.03 ** year if year < 20 else 200.0
+
+
+def expected_states(years):
+    """Referencia año a año: tasas por defecto hasta el año 10, tutorías desde entonces"""
+    before = TransitionModel(DEFAULT_PARAMS)
+    after = TransitionModel(dict(DEFAULT_PARAMS, b1=10, c1=30))
+    state = before.initial_state()
+    states = []
+    for year in range(years):
+        state = (before if year < 10 else after).step(state, expected_intake(year))
+        states.append(state)
+    return states
+
+
+def test_compiled_segments():
+    plan = ParameterSchedule(CHANGES).compile(DEFAULT_PARAMS)
+    assert plan.starts == [0, 10, 20]
+    assert [plan.segment_at(year) for year in (0, 9, 10, 19, 20, 500)] == [0, 0, 1, 1, 2, 2]
+    for year in (0, 9, 10, 19, 20, 35):
+        assert plan.intake_at(year) == pytest.approx(expected_intake(year))
+    # Los parámetros que un cambio no menciona conservan su valor anterior
+    assert plan.params[2]['b1'] == 10 and plan.params[2]['c1'] == 30
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_rates_and_intake_switch_at_segment_boundaries(vectorized):
+    engine = FlowEngine(vectorized=vectorized, schedule=ParameterSchedule(CHANGES))
+    total_years = engine.params['total_years']
+    for year, state in enumerate(expected_states(30), start=1):
+        engine.step()
+        np.testing.assert_allclose(engine.students_per_year[:total_years], state[:total_years], rtol=1e-12)
+        assert engine.total_graduated == pytest.approx(state[total_years], rel=1e-12, abs=1e-12)
+        assert engine.total_dropped == pytest.approx(state[total_years + 1], rel=1e-12, abs=1e-12)
+        assert engine.new_students_per_year[0] == pytest.approx(expected_intake(year - 1))
+
+
+def test_jump_crosses_segments():
+    jumped = FlowEngine(vectorized=True, schedule=ParameterSchedule(CHANGES))
+    jumped.jump_to(30, history_tail=3)
+    state = expected_states(30)[-1]
+    np.testing.assert_allclose(jumped.students_per_year, state[:5], rtol=1e-9)
+    assert jumped.total_graduated == pytest.approx(state[5])
+
+
+def test_reset_recompiles_the_base_params():
+    engine = FlowEngine(schedule=ParameterSchedule([{'year': 5, 'x': 50}]))
+    engine.run(8)
+    engine.params['x'] = 80
+    engine.reset()
+    engine.run(8)
+    assert list(engine.history['new_students1'][1:]) == [80] * 5 + [50] * 2
+
+
+def test_load_schedule_csv_and_json(tmp_path):
+    csv_path = tmp_path / "cronograma.csv"
+    csv_path.write_text("year,x,x_growth,b1,c1\n0,100,3,,\n10,,,10,30\n20,200,0,,\n", encoding="utf-8")
+    json_path = tmp_path / "cronograma.json"
+    json_path.write_text(json.dumps(CHANGES), encoding="utf-8")
+    for path in (csv_path, json_path):
+        plan = load_schedule(str(path)).compile(DEFAULT_PARAMS)
+        assert plan.starts == [0, 10, 20]
+        assert plan.intake_at(25) == pytest.approx(200)
+
+
+@pytest.mark.parametrize("changes", [[{'x': 100}], [{'year': 3, 'total_years': 6}], [{'year': -1, 'x': 10}]],
+                         ids=["no-year", "unknown-key", "negative-year"])
+def test_invalid_changes_are_rejected(changes):
+    with pytest.raises(ValueError):
+        ParameterSchedule(changes)
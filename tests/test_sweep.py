@@ -0,0 +1,24 @@
+import pytest
+
+from sweep import evaluate_chunk, expand_grid, grid_size, main
+
+
+def test_expand_grid_keeps_only_rates_summing_to_100():
+    grid = {'a1': [50, 55, 60, 65, 70], 'c1': [30, 25, 20, 15, 10]}
+    params = list(expand_grid(grid))
+    assert grid_size(grid) == 25
+    assert [(p['a1'], p['c1']) for p in params] == [(50, 30), (55, 25), (60, 20), (65, 15), (70, 10)]
+
+
+def test_retention_counts_graduates_as_retained():
+    row, = evaluate_chunk(list(expand_grid({'a1': [60]})), horizon=40)
+    entered = row['enrolled'] + row['graduated'] + row['dropped']
+    assert row['retention'] == pytest.approx((row['enrolled'] + row['graduated']) / entered * 100)
+    assert row['retention'] > row['graduated'] / entered * 100
+
+
+def test_main_fails_when_no_combination_is_valid(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(['--a1', '50,55', '--workers', '1'])
+    assert exit_info.value.code == 2
+    assert "ninguna combinación" in capsys.readouterr().err
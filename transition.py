@@ -0,0 +1,117 @@
+"""Matriz de transición (pasa/repite/abandona) del flujo de estudiantes con NumPy."""
+
+import numpy as np
+
+
+def year_rates(params):
+    """Tasas (pasa, repite, abandona) de cada año de estudio, ya divididas por 100"""
+    first = (params['a1'] / 100, params['c1'] / 100, params['b1'] / 100)
+    other = (params['ai'] / 100, params['ci'] / 100, params['bi'] / 100)
+    return [first] + [other] * (int(params['total_years']) - 1)
+
+
+def build_matrix(params, padded_years=None):
+    """Construye la matriz de transición de tamaño (años + 2) y el vector de ingresos.
+
+    Las filas 0..T-1 son los años de estudio; las filas T y T+1 son los
+    estados absorbentes de graduados y abandonos (acumulados). Con
+    padded_years se agregan años vacíos hasta esa duración, para apilar
+    carreras de distinta duración en un mismo arreglo.
+    """
+    rates = year_rates(params)
+    total_years = len(rates)
+    size = max(total_years, padded_years or 0)
+    graduated, dropped = size, size + 1
+
+    matrix = np.zeros((size + 2, size + 2))
+    for i, (pass_rate, repeat_rate, drop_rate) in enumerate(rates):
+        matrix[i, i] = repeat_rate
+        matrix[i + 1 if i + 1 < total_years else graduated, i] = pass_rate
+        matrix[dropped, i] = drop_rate
+    matrix[graduated, graduated] = 1
+    matrix[dropped, dropped] = 1
+
+    intake = np.zeros(size + 2)
+    intake[0] = params['x']
+    return matrix, intake
+
+
+class TransitionModel:
+    """Modelo lineal de un año: estado' = matriz @ estado + ingresos"""
+
+    def __init__(self, params):
+        self.total_years = int(params['total_years'])
+        self.matrix, self.intake = build_matrix(params)
+        self.repeat_rates = np.diagonal(self.matrix)[:self.total_years].copy()
+
+    def initial_state(self, scenarios=None):
+        """Estado vacío; con scenarios devuelve una columna por escenario"""
+        shape = (self.total_years + 2,) if scenarios is None else (self.total_years + 2, scenarios)
+        return np.zeros(shape)
+
+    def step(self, state, intake=None):
+        """Avanza un año; state puede ser un vector o una matriz (una columna por escenario).
+
+        intake reemplaza los ingresos de los parámetros (cronogramas con crecimiento).
+        """
+        result = self.matrix @ state
+        result[0] += self.intake[0] if intake is None else intake
+        return result
+
+    def advance(self, state, years, intake=None, growth=1.0):
+        """Estado tras varios años, por exponenciación rápida de la matriz aumentada (O(log N)).
+
+        La coordenada extra lleva los ingresos del año, que se multiplican por
+        growth cada año; con growth=1 los ingresos son constantes.
+        """
+        size = self.total_years + 2
+        augmented = np.eye(size + 1)
+        augmented[:size, :size] = self.matrix
+        augmented[0, size] = 1
+        augmented[size, size] = growth
+        power = np.linalg.matrix_power(augmented, years)
+        offset = power[:size, size] * (self.intake[0] if intake is None else intake)
+        return power[:size, :size] @ state + (offset if state.ndim == 1 else offset[:, None])
+
+    def split(self, state):
+        """Separa un estado en (estudiantes por año, graduados, abandonos)"""
+        total_years = self.total_years
+        return state[:total_years], state[total_years], state[total_years + 1]
+
+
+class BatchTransitionModel:
+    """Varios escenarios con parámetros distintos avanzados a la vez.
+
+    Por defecto todos deben tener la misma duración; con pad=True las carreras
+    más cortas se completan con años vacíos hasta la más larga.
+    """
+
+    def __init__(self, params_list, pad=False):
+        durations = {int(params['total_years']) for params in params_list}
+        if len(durations) != 1 and not pad:
+            raise ValueError("Todos los escenarios deben tener la misma duración de carrera")
+        self.total_years = max(durations)
+        built = [build_matrix(params, self.total_years) for params in params_list]
+        self.matrices = np.stack([matrix for matrix, _ in built])
+        self.intakes = np.stack([intake for _, intake in built])
+        self.repeat_rates = np.diagonal(self.matrices, axis1=1, axis2=2)[:, :self.total_years].copy()
+
+    def __len__(self):
+        return len(self.matrices)
+
+    def initial_state(self):
+        return np.zeros(self.intakes.shape)
+
+    def step(self, states):
+        """Avanza un año todos los escenarios; states tiene forma (escenarios, años + 2)"""
+        return np.einsum('sij,sj->si', self.matrices, states) + self.intakes
+
+    def advance(self, states, years):
+        """Estado de todos los escenarios tras varios años (potencias apiladas de la matriz aumentada)"""
+        count, size = self.intakes.shape
+        augmented = np.zeros((count, size + 1, size + 1))
+        augmented[:, :size, :size] = self.matrices
+        augmented[:, :size, size] = self.intakes
+        augmented[:, size, size] = 1
+        power = np.linalg.matrix_power(augmented, years)
+        return np.einsum('sij,sj->si', power[:, :size, :size], states) + power[:, :size, size]
@@ -0,0 +1,190 @@
+"""Simulación en un hilo aparte: el motor avanza fuera del bucle de Tk.
+
+El hilo publica instantáneas del estado en una cola acotada; la interfaz la
+consulta con after(), se queda con la más reciente y descarta las demás. Así
+un paso pesado o un salto de miles de años no congelan la ventana, y pausar
+o reiniciar sólo tienen que esperar a que termine el año en curso.
+"""
+
+import contextlib
+import queue
+import threading
+import time
+
+import numpy as np
+
+from history_store import EXTREMA_BLOCK
+
+
+class HistorySnapshot:
+    """Primeras size filas de un historial (HistoryStore o HistorySubset).
+
+    Las filas ya escritas no cambian, así que se leen sin copiarlas aunque el
+    hilo de simulación siga agregando otras detrás.
+    """
+
+    def __init__(self, history, size):
+        self.history = history
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        return self.history[name][:self.size]
+
+    def __contains__(self, name):
+        return name in self.history
+
+    def keys(self):
+        return self.history.keys()
+
+    def column_index(self, name):
+        return self.history.column_index(name)
+
+    def _window(self, start, stop):
+        start, stop, _ = slice(start, stop).indices(self.size)
+        return start, max(start, stop)
+
+    def rows(self, start=0, stop=None):
+        return self.history.rows(*self._window(start, stop))
+
+    def window_sum(self, name, start, stop=None):
+        return self.history.window_sum(name, *self._window(start, stop))
+
+    def window_extrema(self, name, start, stop=None):
+        return self.history.window_extrema(name, *self._window(start, stop))
+
+    def extreme_rows(self, name, start, stop=None, block=EXTREMA_BLOCK):
+        return self.history.extreme_rows(name, *self._window(start, stop), block)
+
+    @property
+    def nbytes(self):
+        return self.history.nbytes
+
+
+class PopulationSnapshot:
+    """Resumen del modo por estudiante con lo que muestra el panel de análisis"""
+
+    def __init__(self, population):
+        self._repeat_counts = population.enrolled_repeat_counts()
+        self._time_to_degree = population.time_to_degree.copy()
+        self.graduated = population.graduated
+        self.nbytes = population.nbytes
+
+    def enrolled_repeat_counts(self):
+        return self._repeat_counts
+
+    def time_to_degree_percentile(self, p):
+        if self.graduated == 0:
+            return None
+        cumulative = np.cumsum(self._time_to_degree)
+        return int(np.searchsorted(cumulative, p / 100 * cumulative[-1]))
+
+
+class EngineSnapshot:
+    """Copia del estado visible de un motor (FlowEngine o vista de campus) en un año"""
+
+    def __init__(self, engine):
+        self.params = dict(engine.params)
+        self.year = engine.year
+        self.students_per_year = np.array(engine.students_per_year, dtype=float)
+        self.repeaters_per_year = np.array(engine.repeaters_per_year, dtype=float)
+        self.new_students_per_year = np.array(engine.new_students_per_year, dtype=float)
+        self.total_enrolled = engine.total_enrolled
+        self.total_graduated = engine.total_graduated
+        self.total_dropped = engine.total_dropped
+        self.history = HistorySnapshot(engine.history, len(engine.history))
+        self._rooms_per_year = list(engine.rooms_per_year())
+        population = getattr(engine, 'population', None)
+        self.population = PopulationSnapshot(population) if population is not None else None
+
+    def rooms_per_year(self):
+        return self._rooms_per_year
+
+
+class SimulationWorker:
+    """Hilo que avanza el motor año a año (o salta hasta target) y publica instantáneas.
+
+    Mientras corre, el motor pertenece al hilo: la interfaz sólo lee las
+    instantáneas de latest() y, para tocar el motor, primero llama a stop().
+    interval (segundos por año) puede cambiarse en marcha; publish_interval
+    limita las instantáneas al ritmo de cuadros cuando se simulan muchos años
+    por cuadro.
+    """
+
+    def __init__(self, engine, interval, publish_interval=0.033, target=None, history_tail=20,
+                 maxsize=2, profiler=None):
+        self.engine = engine
+        self.interval = interval
+        self.publish_interval = publish_interval
+        self.target = target
+        self.history_tail = history_tail
+        self.profiler = profiler
+        self.snapshots = queue.Queue(maxsize)
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+
+    def start(self):
+        # Primera instantánea antes de ceder el motor al hilo
+        self.publish()
+        self._thread.start()
+
+    def stop(self):
+        """Pide detenerse y espera a que termine el año en curso"""
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def latest(self):
+        """Instantánea más reciente (None si no hay nuevas); descarta las anteriores"""
+        snapshot = None
+        while True:
+            try:
+                snapshot = self.snapshots.get_nowait()
+            except queue.Empty:
+                return snapshot
+
+    def publish(self):
+        snapshot = EngineSnapshot(self.engine)
+        while True:
+            try:
+                self.snapshots.put_nowait(snapshot)
+                return
+            except queue.Full:
+                # Cola llena: la interfaz no alcanzó a mostrar la más vieja, se descarta
+                try:
+                    self.snapshots.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _phase(self, name):
+        return self.profiler.phase(name) if self.profiler is not None else contextlib.nullcontext()
+
+    def _run(self):
+        try:
+            if self.target is not None:
+                with self._phase("jump"):
+                    self.engine.jump_to(self.target, self.history_tail, cancel=self._stop)
+            else:
+                self._run_steps()
+        except Exception as e:
+            self.error = e
+        else:
+            self.publish()
+
+    def _run_steps(self):
+        published = time.monotonic()
+        while not self._stop.is_set():
+            with self._phase("simulate"):
+                self.engine.step()
+            now = time.monotonic()
+            if now - published >= self.publish_interval or self.interval >= self.publish_interval:
+                self.publish()
+                published = now
+            # La espera se corta apenas se pide detener
+            self._stop.wait(self.interval)